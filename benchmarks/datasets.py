@@ -0,0 +1,101 @@
+# app/benchmarks/datasets.py
+"""
+Reproducible benchmark inputs built from data checked into the repo.
+Produces golden-format records for the API sampler and sampled-format records for eval runners.
+"""
+
+import json
+import random
+import re
+from pathlib import Path
+from typing import Any, Dict, List
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+ACRONYM_FILE = APP_ROOT / "data" / "acronyms_list_cleaned.json"
+QUERY_SOURCE_FILE = APP_ROOT / "evaluation_v1" / "results" / "mismatched_outputs_qwen_base.json"
+
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]{1,}\b')
+
+
+def load_acronyms() -> Dict[str, List[str]]:
+    with open(ACRONYM_FILE, "r") as f:
+        return json.load(f)
+
+
+def load_queries() -> List[Dict[str, Any]]:
+    """
+    Load (query, expected output) pairs from the committed mismatch file.
+
+    Returns:
+        List of dicts with "query" and "output" keys
+    """
+    with open(QUERY_SOURCE_FILE, "r") as f:
+        rows = json.load(f)
+    return [{"query": row["Query"], "output": row.get("model_1", {})} for row in rows]
+
+
+def build_records(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build n records with candidates looked up in the acronym dictionary.
+
+    Args:
+        n: Number of records (sampled with replacement beyond the source size)
+        seed: Random seed so every run benchmarks the same inputs
+
+    Returns:
+        Records with "query", "candidate_acronyms" (dict) and "output"
+    """
+    acronyms = load_acronyms()
+    queries = load_queries()
+    rng = random.Random(seed)
+    picks = rng.sample(queries, n) if n <= len(queries) else [rng.choice(queries) for _ in range(n)]
+
+    records = []
+    for row in picks:
+        candidates = {}
+        for word in WORD_PATTERN.findall(row["query"]):
+            if word in acronyms:
+                candidates[word] = acronyms[word]
+        records.append({"query": row["query"], "candidate_acronyms": candidates, "output": row["output"]})
+    return records
+
+
+def to_golden_format(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Convert records to the golden_data_20k.json schema used by the API sampler.
+
+    Args:
+        records: Output of build_records
+
+    Returns:
+        List of {"Query", "Candidate_Acronyms", "Best_Output"} dicts
+    """
+    golden = []
+    for record in records:
+        candidate_section = " ".join(
+            f"({acro}: {', '.join(expansions)})"
+            for acro, expansions in record["candidate_acronyms"].items()
+        )
+        golden.append({
+            "Query": record["query"],
+            "Candidate_Acronyms": candidate_section,
+            "Best_Output": json.dumps(record["output"], ensure_ascii=False),
+        })
+    return golden
+
+
+def write_golden_file(path: Path, n: int = 2000, seed: int = 0) -> Path:
+    """
+    Write a golden-format dataset for the API under test.
+
+    Args:
+        path: Destination JSON file
+        n: Number of records
+        seed: Random seed
+
+    Returns:
+        The written path
+    """
+    with open(path, "w") as f:
+        json.dump(to_golden_format(build_records(n, seed)), f, ensure_ascii=False)
+    return path
@@ -0,0 +1,78 @@
+# app/benchmarks/extract_throughput.py
+"""
+Single-core throughput of bulk acronym extraction (the /acronyms/extract work).
+Texts are committed queries sampled with replacement, plus longer document-like texts built from several queries.
+
+Run from the directory that contains app/:
+    python -m app.benchmarks.extract_throughput --texts 100000 --repeat 3
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List
+from app.benchmarks.datasets import load_queries
+from app.services import json_io
+from app.services.acronyms_service import extract_acronyms
+from app.services.bulk_extract import extract_batch
+from app.services.dictionary_manager import get_dictionary_manager
+
+TARGET_TEXTS_PER_SECOND = 10_000
+
+
+def build_texts(n: int, sentences: int, seed: int = 0) -> List[str]:
+    """n texts of `sentences` joined queries each; sampling keeps a realistic share of repeated texts."""
+    queries = [row["query"] for row in load_queries()]
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(queries) for _ in range(sentences)) for _ in range(n)]
+
+
+def measure(name: str, texts: List[str], repeat: int) -> List[Dict[str, Any]]:
+    dictionary = get_dictionary_manager().current
+    runs = {
+        "extract_acronyms loop": lambda: [extract_acronyms(text) for text in texts],
+        "extract_batch": lambda: extract_batch(texts, dictionary=dictionary),
+        "extract_batch + orjson": lambda: json_io.dumps(extract_batch(texts, dictionary=dictionary)),
+        "extract_batch unique texts": lambda: extract_batch([f"{i} {text}" for i, text in enumerate(texts)],
+                                                            dictionary=dictionary),
+    }
+    rows = []
+    for label, run in runs.items():
+        timings = []
+        for _ in range(repeat):
+            began = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - began)
+        best = min(timings)
+        rows.append({
+            "input": name,
+            "run": label,
+            "best_ms": round(best * 1000, 3),
+            "texts_per_second": round(len(texts) / best),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bulk acronym extraction throughput")
+    parser.add_argument("--texts", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable rows")
+    args = parser.parse_args()
+
+    rows = measure(f"queries ({args.texts})", build_texts(args.texts, 1), args.repeat)
+    rows += measure(f"5-query documents ({args.texts // 10})", build_texts(args.texts // 10, 5), args.repeat)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    for row in rows:
+        flag = "" if row["texts_per_second"] >= TARGET_TEXTS_PER_SECOND else "  (below target)"
+        print(f"{row['input']:<32} {row['run']:<28} {row['best_ms']:>10.1f} ms "
+              f"{row['texts_per_second']:>10} texts/s{flag}")
+
+
+if __name__ == "__main__":
+    main()
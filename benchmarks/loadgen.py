@@ -0,0 +1,257 @@
+# app/benchmarks/loadgen.py
+"""
+Scenario-driven load generator for the inference API and the bulk eval runners.
+Starts the mock model server (and the API when needed), drives load, and writes a JSON report.
+
+Run from the directory that contains app/:
+    python -m app.benchmarks.loadgen app/benchmarks/scenarios/api_interactive.json --out api.json
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from app.benchmarks.datasets import ACRONYM_FILE, build_records, write_golden_file
+from app.benchmarks.report import ResourceMonitor, build_report
+
+EVAL_TARGETS = {
+    "eval_qwen": ("app.evaluation_v1.qwen_base_inference", "call_vllm"),
+    "eval_llama": ("app.evaluation_v1.call_llama", "call_vllm"),
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_process(args: List[str], ready_url: str, env: Optional[Dict[str, str]] = None, timeout: float = 30.0) -> subprocess.Popen:
+    """
+    Start a server subprocess and wait until it answers HTTP requests.
+
+    Args:
+        args: Command line
+        ready_url: URL polled until it returns a non-5xx status
+        env: Extra environment variables
+        timeout: Seconds to wait before giving up
+
+    Returns:
+        The running process
+    """
+    # Inherits the working directory, which must contain the app/ package
+    process = subprocess.Popen(args, env={**os.environ, **(env or {})})
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(args)} exited with code {process.returncode}")
+        try:
+            if httpx.get(ready_url, timeout=1.0).status_code < 500:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise TimeoutError(f"{ready_url} not ready after {timeout}s")
+
+
+def stop_process(process: Optional[subprocess.Popen]):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def mock_environment(mock_url: str) -> Dict[str, str]:
+    """Environment that points every model client at the mock server."""
+    return {
+        "VLLM_API_URL": f"{mock_url}/v1/chat/completions",
+        "TINYLLAMA_API_URL": f"{mock_url}/v1/chat/completions",
+        "AZURE_ENDPOINT": mock_url,
+        "ACRONYM_FILE": str(ACRONYM_FILE),
+    }
+
+
+async def drive_load(send, load: Dict[str, Any]) -> Tuple[List[float], int, float]:
+    """
+    Run a closed-loop (optionally rate-limited) load phase.
+
+    Args:
+        send: Async callable performing one request, returns True on success
+        load: {"concurrency", "requests" | "duration_s", "rate_rps", "warmup_requests"}
+
+    Returns:
+        (latencies in seconds, error count, wall duration)
+    """
+    concurrency = load.get("concurrency", 4)
+    total = load.get("requests")
+    duration = load.get("duration_s")
+    rate = load.get("rate_rps")
+
+    for _ in range(load.get("warmup_requests", 0)):
+        await send()
+
+    latencies: List[float] = []
+    errors = 0
+    issued = 0
+    start = time.perf_counter()
+    deadline = start + duration if duration else None
+
+    async def worker():
+        nonlocal errors, issued
+        while True:
+            if total is not None and issued >= total:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            index = issued
+            issued += 1
+            if rate:
+                delay = start + index / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            began = time.perf_counter()
+            ok = await send()
+            latencies.append(time.perf_counter() - began)
+            if not ok:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run_api_scenario(scenario: Dict[str, Any], api_url: str) -> Tuple[List[float], int, float, Dict[str, Any]]:
+    payload = scenario.get("payload", {"n": 1})
+    load = scenario.get("load", {})
+    model_errors = 0
+    limits = httpx.Limits(max_connections=load.get("concurrency", 4))
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=load.get("timeout_s", 120.0), limits=limits) as client:
+        async def send() -> bool:
+            nonlocal model_errors
+            try:
+                res = await client.post("/inference/generate", json=payload)
+            except httpx.HTTPError:
+                return False
+            if res.status_code != 200:
+                return False
+            model_errors += res.text.count("[Error - ")
+            return True
+
+        latencies, errors, duration = await drive_load(send, load)
+
+    return latencies, errors, duration, {"model_errors": model_errors}
+
+
+def run_api(scenario: Dict[str, Any], mock_url: str, workdir: Path) -> Dict[str, Any]:
+    golden_path = write_golden_file(workdir / "golden.json", scenario.get("dataset_size", 2000), scenario.get("seed", 0))
+    port = free_port()
+    api_url = f"http://127.0.0.1:{port}"
+    env = {**mock_environment(mock_url), "GOLDEN_DATA_FILE": str(golden_path), "TRACING_EXPORTER": "none"}
+    api = start_process(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        f"{api_url}/",
+        env=env,
+        timeout=60.0,
+    )
+    try:
+        with ResourceMonitor(api.pid) as monitor:
+            latencies, errors, duration, extra = asyncio.run(run_api_scenario(scenario, api_url))
+    finally:
+        stop_process(api)
+    return build_report(scenario, latencies, errors, duration, monitor.summary(), extra)
+
+
+def run_eval(scenario: Dict[str, Any], mock_url: str) -> Dict[str, Any]:
+    os.environ.update(mock_environment(mock_url))
+    module_name, call_name = EVAL_TARGETS[scenario["target"]]
+    module = importlib.import_module(module_name)
+
+    options = dict(scenario.get("eval", {}))
+    records = build_records(options.pop("records", 500), scenario.get("seed", 0))
+    original_call = getattr(module, call_name)
+    latencies: List[float] = []
+    errors = 0
+
+    async def timed_call(*args, **kwargs):
+        nonlocal errors
+        began = time.perf_counter()
+        response = await original_call(*args, **kwargs)
+        latencies.append(time.perf_counter() - began)
+        if isinstance(response, str) and response.startswith("[Error"):
+            errors += 1
+        return response
+
+    # The runners resolve the client function from their module globals,
+    # so rebinding it here times every call without changing the runner.
+    setattr(module, call_name, timed_call)
+    try:
+        with ResourceMonitor() as monitor:
+            started = time.perf_counter()
+            asyncio.run(module.process_entries(records, **options))
+            duration = time.perf_counter() - started
+    finally:
+        setattr(module, call_name, original_call)
+
+    return build_report(scenario, latencies, errors, duration, monitor.summary(), {"records": len(records)})
+
+
+def run_scenario(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Execute one scenario end to end against a freshly started mock server.
+
+    Args:
+        scenario: Parsed scenario JSON
+
+    Returns:
+        Benchmark report
+    """
+    mock_port = free_port()
+    mock_url = f"http://127.0.0.1:{mock_port}"
+    mock_config = {"seed": scenario.get("seed", 0), **scenario.get("mock", {})}
+    mock = start_process(
+        [sys.executable, "-m", "app.benchmarks.mock_server", "--port", str(mock_port), "--config", json.dumps(mock_config)],
+        f"{mock_url}/v1/models",
+    )
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            if scenario.get("target", "api") == "api":
+                return run_api(scenario, mock_url, Path(tmp))
+            return run_eval(scenario, mock_url)
+    finally:
+        stop_process(mock)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a benchmark scenario against local mock model servers")
+    parser.add_argument("scenario", help="Path to scenario JSON")
+    parser.add_argument("--out", help="Write the JSON report here (default: stdout)")
+    args = parser.parse_args()
+
+    with open(args.scenario) as f:
+        scenario = json.load(f)
+
+    report = run_scenario(scenario)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+        print(f"Report written to {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
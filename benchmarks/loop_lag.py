@@ -0,0 +1,118 @@
+# app/benchmarks/loop_lag.py
+"""
+Event-loop lag while large extraction batches are processed.
+A 1 ms ticker measures how late the loop wakes up while batches run inline, on a thread, or in the process pool (services/executor.py).
+
+Run from the directory that contains app/:
+    python -m app.benchmarks.loop_lag --batch 5000 --batches 10
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+from app.benchmarks.extract_throughput import build_texts
+from app.services.executor import CpuExecutor
+
+TICK_SECONDS = 0.001
+CALIBRATION_SIZES = (100, 500, 1000, 2000, 5000, 20000)
+
+
+async def _ticker(lags: List[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        began = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - began - TICK_SECONDS)
+
+
+async def measure_mode(mode: str, batches: List[List[str]], workers: int) -> Dict[str, Any]:
+    """Lag percentiles and batch latency of one executor mode (min_items=0: every batch is offloaded)."""
+    executor = CpuExecutor(mode=mode, workers=workers, min_items=0)
+    await executor.start()
+    await executor.extract(batches[0][:10])
+
+    lags: List[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(0)
+    latencies = []
+    began = time.perf_counter()
+    for batch in batches:
+        started = time.perf_counter()
+        await executor.extract(batch)
+        latencies.append(time.perf_counter() - started)
+        # Let the ticker run between batches, as it would between requests
+        await asyncio.sleep(TICK_SECONDS)
+    elapsed = time.perf_counter() - began
+    stop.set()
+    await ticker
+    executor.shutdown()
+
+    lags.sort()
+    return {
+        "mode": mode,
+        "lag_p50_ms": round(lags[len(lags) // 2] * 1000, 3),
+        "lag_p99_ms": round(lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000, 3),
+        "lag_max_ms": round(lags[-1] * 1000, 3),
+        "batch_mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "texts_per_second": round(sum(len(batch) for batch in batches) / elapsed),
+    }
+
+
+async def calibrate(workers: int) -> List[Dict[str, Any]]:
+    """Inline vs process-pool time per batch size, for choosing CPU_OFFLOAD_MIN_ITEMS."""
+    inline = CpuExecutor(mode="inline")
+    pool = CpuExecutor(mode="process", workers=workers, min_items=0)
+    await pool.start()
+    rows = []
+    for size in CALIBRATION_SIZES:
+        texts = build_texts(size, 1, seed=size)
+        texts = [f"{i} {text}" for i, text in enumerate(texts)]
+        row = {"batch": size}
+        for label, executor in (("inline_ms", inline), ("process_ms", pool)):
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                await executor.extract(texts)
+                timings.append(time.perf_counter() - started)
+            row[label] = round(min(timings) * 1000, 3)
+        rows.append(row)
+    pool.shutdown()
+    return rows
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    texts = build_texts(args.batch * args.batches, 1)
+    # Unique texts, so the repeated-text shortcut in extract_batch does not hide the work
+    texts = [f"{i} {text}" for i, text in enumerate(texts)]
+    batches = [texts[i:i + args.batch] for i in range(0, len(texts), args.batch)]
+    modes = [await measure_mode(mode, batches, args.workers) for mode in ("inline", "thread", "process")]
+    return {"modes": modes, "calibration": await calibrate(args.workers)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag of bulk extraction by executor mode")
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--batches", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable rows")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'mode':<8} {'lag p50':>9} {'lag p99':>9} {'lag max':>9} {'batch':>10} {'texts/s':>10}")
+    for row in report["modes"]:
+        print(f"{row['mode']:<8} {row['lag_p50_ms']:>7.2f}ms {row['lag_p99_ms']:>7.2f}ms {row['lag_max_ms']:>7.2f}ms "
+              f"{row['batch_mean_ms']:>8.1f}ms {row['texts_per_second']:>10}")
+    print(f"\n{'batch':>6} {'inline':>10} {'process':>10}")
+    for row in report["calibration"]:
+        print(f"{row['batch']:>6} {row['inline_ms']:>8.2f}ms {row['process_ms']:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
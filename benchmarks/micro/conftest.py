@@ -0,0 +1,61 @@
+# app/benchmarks/micro/conftest.py
+"""
+Shared inputs for the CPU hot-path microbenchmarks.
+Inputs are drawn from acronyms_list_cleaned.json and the committed golden queries so runs are comparable.
+"""
+
+import json
+import os
+import pytest
+from app.benchmarks.datasets import ACRONYM_FILE, QUERY_SOURCE_FILE, build_records, to_golden_format
+
+os.environ.setdefault("ACRONYM_FILE", str(ACRONYM_FILE))
+
+BATCH_SIZE = 500
+
+
+@pytest.fixture(scope="session")
+def records():
+    return build_records(BATCH_SIZE, seed=0)
+
+
+@pytest.fixture(scope="session")
+def queries(records):
+    return [record["query"] for record in records]
+
+
+@pytest.fixture(scope="session")
+def golden_rows(records):
+    return to_golden_format(records)
+
+
+@pytest.fixture(scope="session")
+def found_acronyms(records):
+    return [(record["query"], record["candidate_acronyms"]) for record in records]
+
+
+@pytest.fixture(scope="session")
+def model_outputs():
+    """Raw JSON strings shaped like real model responses (Qwen base outputs)."""
+    with open(QUERY_SOURCE_FILE, "r") as f:
+        rows = json.load(f)[:BATCH_SIZE]
+    return [json.dumps(row["model_2"], ensure_ascii=False) for row in rows]
+
+
+@pytest.fixture(scope="session")
+def response_payload(golden_rows, model_outputs):
+    """A /inference/generate response body with four model results per query."""
+    data = []
+    for row, output in zip(golden_rows, model_outputs):
+        parsed = json.loads(output)
+        data.append({
+            "query": row["Query"],
+            "candidate_acronyms": row["Candidate_Acronyms"],
+            "results": {
+                "qwen_base": parsed,
+                "qwen_lora": parsed,
+                "openai_gpt": parsed,
+                "tinyllama_lora": parsed,
+            },
+        })
+    return {"total_samples": len(data), "data": data}
@@ -0,0 +1,71 @@
+# app/benchmarks/micro/test_hot_path.py
+"""
+Microbenchmarks for the pure-Python work done on every request.
+Each benchmark processes one batch of realistic inputs (see conftest.py).
+"""
+
+import json
+from app.models.prompt import SYSTEM_PROMPT, parse_raw_prompt
+from app.services import json_io
+from app.services.acronyms_service import build_structured_prompt, extract_acronyms
+from app.services.bulk_extract import extract_batch
+from app.services.result_diff import diff_pairs
+
+
+def test_extract_acronyms(benchmark, queries):
+    result = benchmark(lambda: [extract_acronyms(query) for query in queries])
+    assert len(result) == len(queries)
+
+
+def test_build_structured_prompt(benchmark, found_acronyms):
+    result = benchmark(lambda: [build_structured_prompt(query, found) for query, found in found_acronyms])
+    assert all(prompt.startswith('query: "') for prompt in result)
+
+
+def test_build_sampled_prompt(benchmark, golden_rows):
+    def run():
+        return [
+            f'query: "{row["Query"]}", candidate acronyms: "{row["Candidate_Acronyms"]}"'
+            for row in golden_rows
+        ]
+
+    assert len(benchmark(run)) == len(golden_rows)
+
+
+def test_parse_raw_prompt(benchmark):
+    messages = benchmark(parse_raw_prompt, SYSTEM_PROMPT)
+    assert messages[0]["role"] == "system"
+
+
+def test_json_loads_model_outputs(benchmark, model_outputs):
+    result = benchmark(lambda: [json.loads(output) for output in model_outputs])
+    assert len(result) == len(model_outputs)
+
+
+def test_json_dumps_response(benchmark, response_payload):
+    body = benchmark(json.dumps, response_payload, ensure_ascii=False)
+    assert body.startswith('{"total_samples"')
+
+
+def test_orjson_dumps_response(benchmark, response_payload):
+    body = benchmark(json_io.dumps, response_payload)
+    assert body.startswith(b'{"total_samples"')
+
+
+def test_orjson_loads_model_outputs(benchmark, model_outputs):
+    result = benchmark(lambda: [json_io.loads(output) for output in model_outputs])
+    assert len(result) == len(model_outputs)
+
+
+def test_extract_batch(benchmark, queries):
+    result = benchmark(extract_batch, queries)
+    assert result["count"] == len(queries)
+
+
+def test_diff_pairs(benchmark, model_outputs):
+    # Half identical cells, half shifted by one row (mostly mismatches)
+    half = len(model_outputs) // 2
+    right = model_outputs[:half] + model_outputs[half + 1:] + model_outputs[:1]
+    pairs = [(i, "", left, other) for i, (left, other) in enumerate(zip(model_outputs, right))]
+    rows = benchmark(lambda: list(diff_pairs(pairs)))
+    assert len(rows) <= len(pairs) - half
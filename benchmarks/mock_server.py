@@ -0,0 +1,242 @@
+# app/benchmarks/mock_server.py
+"""
+Local OpenAI-compatible mock server for load testing.
+Serves vLLM-style and Azure-style chat completion routes with configurable latency,
+token rate and error injection, so benchmarks never touch the real model hosts.
+
+Run:
+    python -m app.benchmarks.mock_server --port 8100 --latency lognormal --median-ms 400
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+CANDIDATE_GROUP_PATTERN = re.compile(r"\(([^:()]+):\s*([^()]*)\)")
+CANDIDATE_LINE_PATTERN = re.compile(r"^([A-Za-z]+):\s*(.+)$", re.MULTILINE)
+
+
+@dataclass
+class LatencyConfig:
+    """Base latency distribution in milliseconds (before token generation time)."""
+    distribution: str = "fixed"  # fixed | uniform | normal | lognormal | exponential
+    value_ms: float = 50.0       # fixed
+    low_ms: float = 20.0         # uniform
+    high_ms: float = 200.0       # uniform
+    mean_ms: float = 100.0       # normal / exponential
+    std_ms: float = 30.0         # normal
+    median_ms: float = 100.0     # lognormal
+    sigma: float = 0.5           # lognormal
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the mock model server."""
+    latency: LatencyConfig = field(default_factory=LatencyConfig)
+    prefill_tokens_per_second: float = 0.0   # 0 disables prompt-length dependent latency
+    decode_tokens_per_second: float = 0.0    # 0 disables completion-length dependent latency
+    error_rate: float = 0.0
+    error_status: int = 500
+    timeout_rate: float = 0.0
+    hang_seconds: float = 60.0
+    models: List[str] = field(default_factory=lambda: [
+        "Qwen/Qwen3-4B-Instruct-2507-FP8",
+        "TinyLlama/TinyLlama-1.1B-Chat-v1.0",
+        "acronym-lora-qwen",
+        "acronym-lora-tinyllama",
+    ])
+    # Extra LoRA adapters listed by /v1/models with vLLM's parent/root fields, e.g.
+    # {"acronym-lora-v3": {"parent": "Qwen/Qwen3-4B-Instruct-2507-FP8", "root": "/checkpoints/final_3"}}
+    adapters: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MockConfig":
+        data = dict(data or {})
+        latency = LatencyConfig(**data.pop("latency", {}))
+        return cls(latency=latency, **data)
+
+
+def sample_latency_ms(config: LatencyConfig, rng: random.Random) -> float:
+    """
+    Draw one base latency sample.
+
+    Args:
+        config: Latency distribution settings
+        rng: Random generator (seeded for reproducible runs)
+
+    Returns:
+        Latency in milliseconds, never negative
+    """
+    kind = config.distribution
+    if kind == "uniform":
+        value = rng.uniform(config.low_ms, config.high_ms)
+    elif kind == "normal":
+        value = rng.gauss(config.mean_ms, config.std_ms)
+    elif kind == "lognormal":
+        value = rng.lognormvariate(math.log(max(config.median_ms, 1e-3)), config.sigma)
+    elif kind == "exponential":
+        value = rng.expovariate(1.0 / max(config.mean_ms, 1e-3))
+    else:
+        value = config.value_ms
+    return max(value, 0.0)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (~4 characters per token)."""
+    return len(text) // 4 + 1 if text else 0
+
+
+def build_answer(user_message: str) -> Dict[str, List[str]]:
+    """
+    Produce a plausible model answer: the first candidate for every acronym.
+
+    Understands both the API prompt format ("(AI: a, b) (OKR: c)") and the
+    evaluation runner format ("AI: a, b" per line).
+
+    Args:
+        user_message: Last user message of the chat request
+
+    Returns:
+        Dict of acronym to single-element expansion list
+    """
+    answer = {}
+    matches = CANDIDATE_GROUP_PATTERN.findall(user_message) or CANDIDATE_LINE_PATTERN.findall(user_message)
+    for acronym, expansions in matches:
+        acronym = acronym.strip()
+        if acronym.lower() in ("query", "candidate acronyms"):
+            continue
+        first = expansions.split(",")[0].strip()
+        if first:
+            answer[acronym] = [first]
+    return answer
+
+
+def create_mock_app(config: MockConfig) -> FastAPI:
+    """
+    Build the mock FastAPI application.
+
+    Args:
+        config: Latency, token rate and error injection settings
+
+    Returns:
+        FastAPI app exposing /v1/chat/completions, Azure deployment routes and /v1/models
+    """
+    app = FastAPI(title="Mock OpenAI-compatible server")
+    rng = random.Random(config.seed)
+    stats = {"requests": 0, "errors": 0, "timeouts": 0}
+
+    async def complete(payload: Dict[str, Any], model: str) -> JSONResponse:
+        stats["requests"] += 1
+        roll = rng.random()
+        if roll < config.timeout_rate:
+            stats["timeouts"] += 1
+            await asyncio.sleep(config.hang_seconds)
+        elif roll < config.timeout_rate + config.error_rate:
+            stats["errors"] += 1
+            await asyncio.sleep(sample_latency_ms(config.latency, rng) / 1000)
+            return JSONResponse(
+                status_code=config.error_status,
+                content={"error": {"message": "injected error", "type": "mock_error"}},
+            )
+
+        messages = payload.get("messages", [])
+        prompt_text = "".join(str(m.get("content", "")) for m in messages)
+        user_message = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+        content = json.dumps(build_answer(user_message), ensure_ascii=False)
+
+        prompt_tokens = estimate_tokens(prompt_text)
+        completion_tokens = estimate_tokens(content)
+
+        delay = sample_latency_ms(config.latency, rng) / 1000
+        if config.prefill_tokens_per_second > 0:
+            delay += prompt_tokens / config.prefill_tokens_per_second
+        if config.decode_tokens_per_second > 0:
+            delay += completion_tokens / config.decode_tokens_per_second
+        await asyncio.sleep(delay)
+
+        return JSONResponse(content={
+            "id": f"chatcmpl-mock-{stats['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        return await complete(payload, payload.get("model", "mock"))
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def azure_chat_completions(deployment: str, request: Request):
+        payload = await request.json()
+        return await complete(payload, deployment)
+
+    @app.get("/v1/models")
+    async def list_models():
+        data = [{"id": m, "object": "model"} for m in config.models]
+        data += [{"id": m, "object": "model", **spec} for m, spec in config.adapters.items()]
+        return {"object": "list", "data": data}
+
+    @app.get("/mock/stats")
+    async def mock_stats():
+        return {"config": asdict(config), **stats}
+
+    return app
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the mock OpenAI-compatible server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--config", help="JSON MockConfig (inline string or path to file)")
+    parser.add_argument("--latency", default=None, help="Latency distribution name")
+    parser.add_argument("--median-ms", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    return parser.parse_args()
+
+
+def load_config(args: argparse.Namespace) -> MockConfig:
+    data: Dict[str, Any] = {}
+    if args.config:
+        raw = args.config
+        if not raw.lstrip().startswith("{"):
+            with open(raw, "r") as f:
+                raw = f.read()
+        data = json.loads(raw)
+    config = MockConfig.from_dict(data)
+    if args.latency:
+        config.latency.distribution = args.latency
+    if args.median_ms is not None:
+        config.latency.median_ms = args.median_ms
+    if args.error_rate is not None:
+        config.error_rate = args.error_rate
+    if args.seed is not None:
+        config.seed = args.seed
+    return config
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    cli_args = parse_args()
+    uvicorn.run(create_mock_app(load_config(cli_args)), host=cli_args.host, port=cli_args.port, log_level="warning")
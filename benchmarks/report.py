@@ -0,0 +1,222 @@
+# app/benchmarks/report.py
+"""
+Machine-readable benchmark reports and commit-to-commit comparison.
+Summarises latencies into RPS and percentiles and diffs two report files.
+
+Run:
+    python -m app.benchmarks.report base.json new.json --threshold 0.10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import psutil
+
+# Metric path -> True if higher is better
+COMPARED_METRICS = {
+    "rps": True,
+    "latency_ms.p50": False,
+    "latency_ms.p95": False,
+    "latency_ms.p99": False,
+    "error_rate": False,
+    "cpu.utilization": False,
+    "rss_mb.peak": False,
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Ascending values
+        pct: Percentile in [0, 100]
+
+    Returns:
+        Percentile value, or 0.0 for an empty list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+class ResourceMonitor:
+    """Samples CPU time and peak RSS of a process while a benchmark runs."""
+
+    def __init__(self, pid: Optional[int] = None, interval: float = 0.1):
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.peak_rss = 0
+        self.start_rss = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            try:
+                self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+            except psutil.Error:
+                return
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.start_rss = self.process.memory_info().rss
+        self.peak_rss = self.start_rss
+        self._cpu_start = self.process.cpu_times()
+        self._wall_start = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        cpu_end = self.process.cpu_times()
+        self.wall = time.perf_counter() - self._wall_start
+        self.user = cpu_end.user - self._cpu_start.user
+        self.system = cpu_end.system - self._cpu_start.system
+        return False
+
+    def summary(self) -> Dict[str, Any]:
+        busy = self.user + self.system
+        return {
+            "cpu": {
+                "user_s": round(self.user, 4),
+                "system_s": round(self.system, 4),
+                "utilization": round(busy / self.wall, 4) if self.wall else 0.0,
+            },
+            "rss_mb": {
+                "start": round(self.start_rss / 2**20, 2),
+                "peak": round(self.peak_rss / 2**20, 2),
+            },
+        }
+
+
+def build_report(
+    scenario: Dict[str, Any],
+    latencies_s: List[float],
+    errors: int,
+    duration_s: float,
+    resources: Dict[str, Any],
+    extra: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Assemble a benchmark report.
+
+    Args:
+        scenario: Scenario definition that produced the run
+        latencies_s: Per-request latencies in seconds (successful and failed)
+        errors: Failed request count
+        duration_s: Wall time of the measured phase
+        resources: Output of ResourceMonitor.summary()
+        extra: Additional target-specific fields
+
+    Returns:
+        JSON-serialisable report dict
+    """
+    values = sorted(l * 1000 for l in latencies_s)
+    total = len(values)
+    report = {
+        "scenario": scenario.get("name"),
+        "target": scenario.get("target"),
+        "commit": current_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "duration_s": round(duration_s, 4),
+        "rps": round(total / duration_s, 2) if duration_s else 0.0,
+        "latency_ms": {
+            "mean": round(sum(values) / total, 2) if total else 0.0,
+            "p50": round(percentile(values, 50), 2),
+            "p95": round(percentile(values, 95), 2),
+            "p99": round(percentile(values, 99), 2),
+            "max": round(values[-1], 2) if values else 0.0,
+        },
+        **resources,
+        "config": scenario,
+    }
+    if extra:
+        report.update(extra)
+    return report
+
+
+def _lookup(report: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = report
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def compare_reports(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """
+    Compare two reports metric by metric.
+
+    Args:
+        base: Baseline report
+        new: Candidate report
+        threshold: Relative change that counts as a regression
+
+    Returns:
+        One row per metric with base, new, relative change and regression flag
+    """
+    rows = []
+    for path, higher_is_better in COMPARED_METRICS.items():
+        old_value, new_value = _lookup(base, path), _lookup(new, path)
+        if old_value is None or new_value is None:
+            continue
+        change = (new_value - old_value) / old_value if old_value else 0.0
+        regressed = (-change if higher_is_better else change) > threshold
+        rows.append({
+            "metric": path,
+            "base": old_value,
+            "new": new_value,
+            "change": round(change, 4),
+            "regression": regressed,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two benchmark reports")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    rows = compare_reports(base, new, args.threshold)
+    print(f"{base.get('scenario')}: {base.get('commit')} -> {new.get('commit')}")
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"  {row['metric']:<18} {row['base']:>10} -> {row['new']:>10}  ({row['change']:+.1%}) {flag}")
+
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
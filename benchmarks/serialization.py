@@ -0,0 +1,80 @@
+# app/benchmarks/serialization.py
+"""
+Encode-time and output-size comparison of stdlib json vs orjson.
+Uses a committed GPT-judge result file and a /inference/generate-shaped response body.
+
+Run from the directory that contains app/:
+    python -m app.benchmarks.serialization --repeat 5
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+import orjson
+from app.benchmarks.datasets import APP_ROOT, build_records, to_golden_format
+from app.services import json_io
+
+RESULT_FILE = APP_ROOT / "evaluation_v1" / "results" / "mismatched_evaluation_results_gpt_qwen(ft)1.json"
+
+ENCODERS: Dict[str, Callable[[Any], bytes]] = {
+    "stdlib indent=2": lambda obj: json.dumps(obj, indent=2, ensure_ascii=False).encode(),
+    "stdlib compact": lambda obj: json.dumps(obj, ensure_ascii=False).encode(),
+    "orjson pretty": lambda obj: json_io.dumps(obj, pretty=True),
+    "orjson compact": lambda obj: json_io.dumps(obj),
+    "orjson jsonl": lambda rows: b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows),
+}
+
+
+def response_payload(n: int = 500) -> Dict[str, Any]:
+    data = []
+    for row in to_golden_format(build_records(n)):
+        output = json.loads(row["Best_Output"])
+        data.append({
+            "query": row["Query"],
+            "candidate_acronyms": row["Candidate_Acronyms"],
+            "results": {"qwen_base": output, "qwen_lora": output, "openai_gpt": output, "tinyllama_lora": output},
+        })
+    return {"total_samples": len(data), "data": data}
+
+
+def measure(name: str, obj: Any, repeat: int) -> List[Dict[str, Any]]:
+    rows = []
+    for label, encode in ENCODERS.items():
+        target = obj["data"] if label == "orjson jsonl" and isinstance(obj, dict) else obj
+        timings = []
+        for _ in range(repeat):
+            began = time.perf_counter()
+            encoded = encode(target)
+            timings.append(time.perf_counter() - began)
+        rows.append({
+            "input": name,
+            "encoder": label,
+            "best_ms": round(min(timings) * 1000, 3),
+            "bytes": len(encoded),
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoders on result files and API responses")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable rows")
+    args = parser.parse_args()
+
+    with open(RESULT_FILE, "r") as f:
+        results = json.load(f)
+
+    rows = measure(f"{RESULT_FILE.name} ({len(results)} rows)", results, args.repeat)
+    rows += measure("generate response (500 samples)", response_payload(), args.repeat)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    for row in rows:
+        print(f"{row['input']:<55} {row['encoder']:<16} {row['best_ms']:>9.3f} ms {row['bytes'] / 1024:>10.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
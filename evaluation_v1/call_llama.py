@@ -6,16 +6,24 @@ Processes 20K queries through TinyLlama LoRA adapter and exports results to Exce
 
 import asyncio
 import json
-import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from tqdm.asyncio import tqdm
 import re
 import httpx
 import sys
 import os
+import time
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from app.models.registry import get_registry
+from app.services.candidate_index import load_eval_records
+from app.services.json_io import dumps, read_json
+from app.services.result_store import StoredCalls, get_result_store
+from app.services.sinks import ResultSink, export_excel, open_sink
+from app.services.usage import format_report, usage_tracker
 
 SYSTEM_PROMPT = """You are a precise assistant tasked with selecting only the **most relevant acronym expansions** from a given list, based strictly on the user's query.
 
@@ -86,10 +94,17 @@ def parse_raw_prompt(raw_prompt_string):
 
 
 SYSTEM_PROMPT = parse_raw_prompt(SYSTEM_PROMPT)
+# Few-shot messages differ from app.models.prompt, so stored answers get their own prompt version
+SYSTEM_PROMPT_TEXT = dumps(SYSTEM_PROMPT).decode()
+
+# Server and adapter of the tinyllama_lora entry in models/registry.json
+VARIANT = get_registry().models["tinyllama_lora"]
+VLLM_API_URL = get_registry().endpoint(VARIANT)
+BASE_MODEL_NAME = VARIANT.base_model
+LORA_ADAPTER_NAME = VARIANT.adapter
 
-VLLM_API_URL = "http://98.89.19.168:8000/v1/chat/completions"
-BASE_MODEL_NAME = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
-LORA_ADAPTER_NAME = "acronym-lora"
+# Results stream to a sink; set to True to also write an .xlsx copy once the run finishes
+EXPORT_EXCEL = False
 
 def extract_json(text: str) -> str:
     """Extract valid JSON dict from model output"""
@@ -114,8 +129,8 @@ def extract_json(text: str) -> str:
 
     return "{}"
 
-async def call_vllm(user_query: str) -> str:
-    """Call TinyLlama LoRA model via vLLM"""
+async def call_vllm(user_query: str, usage: Optional[Dict[str, Any]] = None) -> str:
+    """Call TinyLlama LoRA model via vLLM, filling usage with the reported token counts"""
     messages = SYSTEM_PROMPT + [{"role": "user", "content": user_query}]
     
     payload = {
@@ -130,6 +145,8 @@ async def call_vllm(user_query: str) -> str:
             res = await client.post(VLLM_API_URL, json=payload)
             res.raise_for_status()
             response_json = res.json()
+            if usage is not None and response_json.get("usage"):
+                usage.update(response_json["usage"])
             raw_output = response_json["choices"][0]["message"]["content"]
             return extract_json(raw_output)
 
@@ -137,10 +154,14 @@ async def call_vllm(user_query: str) -> str:
         return f"[Error - vLLM LoRA]: {e}"
 
 def load_json(input_path: str) -> List[Dict[str, Any]]:
-    with open(input_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # A .parquet candidate index carries prebuilt prompts (python -m app.services.candidate_index)
+    if input_path.endswith(".parquet"):
+        return load_eval_records(input_path)
+    return read_json(input_path)
 
 def construct_user_query(entry: Dict[str, Any]) -> str:
+    if entry.get("eval_prompt"):
+        return entry["eval_prompt"]
     query = entry["query"]
     candidate_acronyms = entry.get("candidate_acronyms", {})
 
@@ -152,40 +173,67 @@ def construct_user_query(entry: Dict[str, Any]) -> str:
     full_query = f"Query: {query}\nCandidate Acronyms:\n{acronyms_text}"
     return full_query
 
-async def process_entry(entry: Dict[str, Any], semaphore: asyncio.Semaphore) -> Dict[str, Any]:
-    async with semaphore:
-        user_query = construct_user_query(entry)
-        response = await call_vllm(user_query)
+async def process_entry(entry: Dict[str, Any], semaphore: asyncio.Semaphore,
+                        sink: Optional[ResultSink] = None, stored: Optional[StoredCalls] = None,
+                        index: Optional[int] = None) -> Dict[str, Any]:
+    async def infer() -> str:
+        async with semaphore:
+            user_query = construct_user_query(entry)
+            usage: Dict[str, Any] = {}
+            started = time.perf_counter()
+            response = await call_vllm(user_query, usage=usage)
+            usage_tracker.record_call("tinyllama_lora", user_query, response, usage,
+                                      time.perf_counter() - started, endpoint="eval_call_llama")
+            return response
+
+    # Answers already in the result store are reused; only missing cells call the model
+    if stored is None:
+        response = await infer()
+    else:
+        response = await stored.get_or_call(entry["query"], entry["candidate_acronyms"], infer,
+                                            expected=entry["output"], source_index=index)
+
+    result = {
+        "query": entry["query"],
+        "candidate_acronyms": entry["candidate_acronyms"],
+        "expected_output": entry["output"],
+        "llama_lora_response": response
+    }
 
-        return {
-            "query": entry["query"],
-            "candidate_acronyms": entry["candidate_acronyms"],
-            "expected_output": entry["output"],
-            "llama_lora_response": response
-        }
+    # Written as each entry completes (completion order), outside the semaphore
+    if sink is not None:
+        await sink.write(result)
+    return result
 
-async def process_entries(data: List[Dict[str, Any]], concurrency_limit: int = 20) -> List[Dict[str, Any]]:
+async def process_entries(data: List[Dict[str, Any]], concurrency_limit: int = 20,
+                          sink: Optional[ResultSink] = None) -> List[Dict[str, Any]]:
     semaphore = asyncio.Semaphore(concurrency_limit)
-
-    tasks = [
-        process_entry(entry, semaphore)
-        for entry in data
-    ]
-    return await tqdm.gather(*tasks, desc="Processing queries")
-
-def save_to_excel(results: List[Dict[str, Any]], output_path: str):
-    df = pd.DataFrame(results)
-    df.to_excel(output_path, index=False)
+    store = get_result_store()
+    if store is None:
+        return await tqdm.gather(*(process_entry(entry, semaphore, sink=sink) for entry in data),
+                                 desc="Processing queries")
+
+    async with StoredCalls(store, "tinyllama_lora", "eval", system_prompt=SYSTEM_PROMPT_TEXT) as stored:
+        found = await stored.preload((entry["query"], entry["candidate_acronyms"]) for entry in data)
+        print(f"Result store: {found}/{len(data)} answers already stored")
+        tasks = [
+            process_entry(entry, semaphore, sink=sink, stored=stored, index=index)
+            for index, entry in enumerate(data)
+        ]
+        return await tqdm.gather(*tasks, desc="Processing queries")
 
 async def main():
     input_path = "/Users/rishabh.singh/Desktop/ai-search-retrieval-pipeline-poc-2/Notebooks/sampled_20000_queries.json"
-    output_path = "llama1B_results_20_lora.xlsx"
+    output_path = "llama1B_results_20_lora.parquet"  # .parquet, .jsonl or .csv
 
     json_data = load_json(input_path)
     # json_data = json_data[:5]
-    results = await process_entries(json_data, concurrency_limit=20)
-    save_to_excel(results, output_path)
+    async with open_sink(output_path) as sink:
+        await process_entries(json_data, concurrency_limit=20, sink=sink)
     print(f"✅ Results saved to {output_path}")
+    if EXPORT_EXCEL:
+        export_excel(output_path, str(Path(output_path).with_suffix(".xlsx")))
+    print(format_report(usage_tracker.snapshot()))
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -10,7 +10,13 @@ import json
 from tqdm.asyncio import tqdm_asyncio
 from openai import AsyncAzureOpenAI
 from dotenv import load_dotenv
+from pathlib import Path
 import os
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from app.services.json_io import read_results, write_results
 
 load_dotenv()
 
@@ -47,6 +53,9 @@ Output Format (JSON):
 
 SEMAPHORE = 20
 
+# Results are written as compact JSONL; set to True for an indented JSON array
+PRETTY_OUTPUT = False
+
 def safe_parse_dict(value):
     """Safely parse a string to a dictionary if needed"""
     if isinstance(value, dict):
@@ -121,10 +130,9 @@ Based on the query and the outputs, evaluate which model performed better and re
 # === 🔁 Main Execution ===
 async def main():
     input_path = "/Users/rishabh.singh/Desktop/ai-search-retrieval-pipeline-poc-2/app/evaluation_v1/mismatched_outputs_llama_2nd.json"
-    output_path = "mismatched_evaluation_results_gpt_llama_nano_2nd_call.json"
+    output_path = "mismatched_evaluation_results_gpt_llama_nano_2nd_call.jsonl"
 
-    with open(input_path, 'r') as f:
-        data = json.load(f)
+    data = read_results(input_path)
     # data = data[:50]
     
     semaphore = asyncio.Semaphore(SEMAPHORE)
@@ -136,8 +144,7 @@ async def main():
     results = await tqdm_asyncio.gather(*tasks)
 
     # Save the results
-    with open(output_path, "w") as f:
-        json.dump(results, f, indent=2)
+    output_path = write_results(output_path, results, pretty=PRETTY_OUTPUT)
 
     # Summary - Fixed: Use correct case for summary keys
     summary = {"Model 1": 0, "Model 2": 0, "Tie": 0, "invalid": 0, "error": 0}
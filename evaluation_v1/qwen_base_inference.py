@@ -6,25 +6,36 @@ It will call the base model if use_lora is False, otherwise it will call the LoR
 """
 
 import asyncio
-import json
-import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from tqdm.asyncio import tqdm
 import os
 import sys
+import time
 
 sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 from app.models.vllm_client import call_vllm
+from app.services.candidate_index import load_eval_records
+from app.services.json_io import read_json
+from app.services.result_store import StoredCalls, get_result_store
+from app.services.sinks import ResultSink, export_excel, open_sink
+from app.services.usage import format_report, usage_tracker
+
+# Results stream to a sink; set to True to also write an .xlsx copy once the run finishes
+EXPORT_EXCEL = False
 
 
 def load_json(input_path: str) -> List[Dict[str, Any]]:
-    with open(input_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # A .parquet candidate index carries prebuilt prompts (python -m app.services.candidate_index)
+    if input_path.endswith(".parquet"):
+        return load_eval_records(input_path)
+    return read_json(input_path)
 
 
 def construct_user_query(entry: Dict[str, Any]) -> str:
+    if entry.get("eval_prompt"):
+        return entry["eval_prompt"]
     query = entry["query"]
     candidate_acronyms = entry.get("candidate_acronyms", {})
 
@@ -38,42 +49,70 @@ def construct_user_query(entry: Dict[str, Any]) -> str:
     return full_query
 
 
-async def process_entry(entry: Dict[str, Any], semaphore: asyncio.Semaphore, use_lora: bool = False) -> Dict[str, Any]:
-    async with semaphore:
-        user_query = construct_user_query(entry)
-        response = await call_vllm(user_query, use_lora=use_lora)
-
-        return {
-            "query": entry["query"],
-            "candidate_acronyms": entry["candidate_acronyms"],
-            "expected_output": entry["output"],
-            "qwen_lora_response": response
-        }
-
-
-async def process_entries(data: List[Dict[str, Any]], use_lora: bool = False, concurrency_limit: int = 20) -> List[Dict[str, Any]]:
+async def process_entry(entry: Dict[str, Any], semaphore: asyncio.Semaphore, use_lora: bool = False,
+                        sink: Optional[ResultSink] = None, stored: Optional[StoredCalls] = None,
+                        index: Optional[int] = None) -> Dict[str, Any]:
+    model_name = "qwen_lora" if use_lora else "qwen_base"
+
+    async def infer() -> str:
+        async with semaphore:
+            user_query = construct_user_query(entry)
+            usage: Dict[str, Any] = {}
+            started = time.perf_counter()
+            response = await call_vllm(user_query, use_lora=use_lora, usage=usage)
+            usage_tracker.record_call(model_name, user_query, response, usage,
+                                      time.perf_counter() - started, endpoint="eval_qwen_inference")
+            return response
+
+    # Answers already in the result store are reused; only missing cells call the model
+    if stored is None:
+        response = await infer()
+    else:
+        response = await stored.get_or_call(entry["query"], entry["candidate_acronyms"], infer,
+                                            expected=entry["output"], source_index=index)
+
+    result = {
+        "query": entry["query"],
+        "candidate_acronyms": entry["candidate_acronyms"],
+        "expected_output": entry["output"],
+        "qwen_lora_response": response
+    }
+
+    # Written as each entry completes (completion order), outside the semaphore
+    if sink is not None:
+        await sink.write(result)
+    return result
+
+
+async def process_entries(data: List[Dict[str, Any]], use_lora: bool = False, concurrency_limit: int = 20,
+                          sink: Optional[ResultSink] = None) -> List[Dict[str, Any]]:
     semaphore = asyncio.Semaphore(concurrency_limit)
+    store = get_result_store()
+    if store is None:
+        return await tqdm.gather(*(process_entry(entry, semaphore, use_lora=use_lora, sink=sink) for entry in data),
+                                 desc="Processing queries")
 
-    tasks = [
-        process_entry(entry, semaphore, use_lora=use_lora)
-        for entry in data
-    ]
-    return await tqdm.gather(*tasks, desc="Processing queries")
-
-
-def save_to_excel(results: List[Dict[str, Any]], output_path: str):
-    df = pd.DataFrame(results)
-    df.to_excel(output_path, index=False)
+    async with StoredCalls(store, "qwen_lora" if use_lora else "qwen_base", "eval") as stored:
+        found = await stored.preload((entry["query"], entry["candidate_acronyms"]) for entry in data)
+        print(f"Result store: {found}/{len(data)} answers already stored")
+        tasks = [
+            process_entry(entry, semaphore, use_lora=use_lora, sink=sink, stored=stored, index=index)
+            for index, entry in enumerate(data)
+        ]
+        return await tqdm.gather(*tasks, desc="Processing queries")
 
 
 async def main():
     input_path = "/Users/rishabh.singh/Desktop/ai-search-retrieval-pipeline-poc-2/Notebooks/sampled_20000_queries.json"  # Change this to your actual input file path
-    output_path = "base_results_20000.xlsx"
+    output_path = "base_results_20000.parquet"  # .parquet, .jsonl or .csv
 
     json_data = load_json(input_path)
-    results = await process_entries(json_data, use_lora=False, concurrency_limit=20)  # Set to False to skip LoRA
-    save_to_excel(results, output_path)
+    async with open_sink(output_path) as sink:
+        await process_entries(json_data, use_lora=False, concurrency_limit=20, sink=sink)  # Set to False to skip LoRA
     print(f"Results saved to {output_path}")
+    if EXPORT_EXCEL:
+        export_excel(output_path, str(Path(output_path).with_suffix(".xlsx")))
+    print(format_report(usage_tracker.snapshot()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,151 @@
+#app/evaluation_v1/ranker_evaluation.py
+"""
+CPU ranker evaluation script.
+Measures agreement of the learned ranker with Qwen LoRA outputs (and the expected labels) plus its latency.
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from app.services.candidate_index import parse_candidate_string
+from app.services.json_io import loads, read_results, write_json
+from app.services.ranker import RANKER_MODEL_FILE, AcronymRanker
+from app.services.sinks import SINKS, read_rows
+
+
+def load_rows(path: str) -> List[Dict[str, Any]]:
+    """Read Qwen LoRA runner output (.parquet/.jsonl/.csv sink or a .json array)."""
+    if Path(path).suffix in SINKS:
+        return list(read_rows(path))
+    return read_results(path)
+
+
+def as_answer(value: Any) -> Any:
+    """Parse a response cell into a dict; anything else (errors, bad JSON) is returned unchanged."""
+    if isinstance(value, str):
+        try:
+            return loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def normalize(answer: Dict[str, List[str]]) -> Dict[str, set]:
+    return {
+        str(acronym).lower(): {str(e).strip().lower() for e in expansions}
+        for acronym, expansions in answer.items() if isinstance(expansions, list) and expansions
+    }
+
+
+def compare(predicted: Dict[str, List[str]], reference: Dict[str, List[str]], counts: Dict[str, int]) -> None:
+    """Accumulate exact, key-level and expansion-level agreement of one answer pair."""
+    predicted, reference = normalize(predicted), normalize(reference)
+    counts["rows"] += 1
+    counts["exact"] += predicted == reference
+    counts["same_keys"] += predicted.keys() == reference.keys()
+    for acronym in predicted.keys() | reference.keys():
+        ours, theirs = predicted.get(acronym, set()), reference.get(acronym, set())
+        counts["tp"] += len(ours & theirs)
+        counts["fp"] += len(ours - theirs)
+        counts["fn"] += len(theirs - ours)
+
+
+def summarize(counts: Dict[str, int]) -> Dict[str, float]:
+    precision = counts["tp"] / (counts["tp"] + counts["fp"]) if counts["tp"] + counts["fp"] else 0.0
+    recall = counts["tp"] / (counts["tp"] + counts["fn"]) if counts["tp"] + counts["fn"] else 0.0
+    return {
+        "rows": counts["rows"],
+        "exact_match": counts["exact"] / counts["rows"] if counts["rows"] else 0.0,
+        "key_agreement": counts["same_keys"] / counts["rows"] if counts["rows"] else 0.0,
+        "expansion_precision": precision,
+        "expansion_recall": recall,
+        "expansion_f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+    }
+
+
+def new_counts() -> Dict[str, int]:
+    return {"rows": 0, "exact": 0, "same_keys": 0, "tp": 0, "fp": 0, "fn": 0}
+
+
+def evaluate(ranker: AcronymRanker, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Score every row with the ranker and compare it with Qwen LoRA and the expected output.
+
+    Rows where Qwen LoRA returned an error or unparsable text are skipped for the
+    Qwen comparison but still count towards the expected-output comparison.
+
+    Args:
+        ranker: Loaded ranker
+        rows: Runner rows with query, candidate_acronyms, expected_output and qwen_lora_response
+
+    Returns:
+        Summary dict with agreement metrics and latency
+    """
+    items: List[Tuple[str, Dict[str, List[str]]]] = [
+        (row["query"], parse_candidate_string(row.get("candidate_acronyms") or "", row["query"])) for row in rows
+    ]
+
+    latencies = []
+    predictions = []
+    for query, candidates in items:
+        started = time.perf_counter()
+        predictions.append(ranker.predict(query, candidates))
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    ranker.predict_batch(items)
+    batch_seconds = time.perf_counter() - started
+
+    vs_qwen, vs_expected = new_counts(), new_counts()
+    skipped = 0
+    for row, predicted in zip(rows, predictions):
+        qwen = as_answer(row.get("qwen_lora_response"))
+        if isinstance(qwen, dict):
+            compare(predicted, qwen, vs_qwen)
+        else:
+            skipped += 1
+        expected = as_answer(row.get("expected_output"))
+        if isinstance(expected, dict):
+            compare(predicted, expected, vs_expected)
+
+    latencies.sort()
+    return {
+        "vs_qwen_lora": summarize(vs_qwen),
+        "vs_expected": summarize(vs_expected),
+        "qwen_lora_unusable_rows": skipped,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) * 1000,
+            "p50": latencies[len(latencies) // 2] * 1000,
+            "p99": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        },
+        "batch_queries_per_second": len(items) / batch_seconds if batch_seconds else 0.0,
+    }
+
+
+def main():
+    input_path = "lora_results_20000.parquet"  # Output of qwen_base_inference.py with use_lora=True
+    model_path = RANKER_MODEL_FILE
+    output_path = "ranker_evaluation_summary.json"
+
+    rows = load_rows(input_path)
+    ranker = AcronymRanker.load(model_path)
+    summary = evaluate(ranker, rows)
+    write_json(output_path, summary, pretty=True)
+
+    for name in ("vs_qwen_lora", "vs_expected"):
+        metrics = summary[name]
+        print(f"{name}: exact {metrics['exact_match']:.1%}, keys {metrics['key_agreement']:.1%}, "
+              f"P/R/F1 {metrics['expansion_precision']:.3f}/{metrics['expansion_recall']:.3f}/{metrics['expansion_f1']:.3f}")
+    latency = summary["latency_ms"]
+    print(f"latency: p50 {latency['p50']:.3f} ms, p99 {latency['p99']:.3f} ms, "
+          f"batch {summary['batch_queries_per_second']:.0f} queries/s")
+    print(f"Summary saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,19 +3,70 @@ FastAPI application entry point for the Acronym Expansion API.
 Provides endpoints for context-aware acronym expansion using multiple AI models.
 """
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
+from app.models.registry import DISCOVER_ON_STARTUP
 from app.routes.run_inference import router as inference_router
+from app.routes.metrics import router as metrics_router
+from app.routes.health import router as health_router
+from app.routes.admin import router as admin_router
+from app.routes.acronyms import router as acronyms_router
+from app.routes.jobs import router as jobs_router
+from app.services.dictionary_manager import get_dictionary_manager
+from app.services.engine import get_engine
+from app.services.executor import get_executor
+from app.services.health import WARMUP_ON_STARTUP, get_monitor
+from app.services.jobs import get_job_manager
+from app.services.model_dispatch import discover_models
+from app.services.scheduler import Overloaded
+from app.services.tracing import configure_tracing
+
+configure_tracing()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Discover served adapters, warm up backends, spawn CPU workers, resume jobs and watch the dictionary in the background; close pools on shutdown"""
+    discovery = asyncio.create_task(discover_models(get_engine().clients.http)) if DISCOVER_ON_STARTUP else None
+    warmup = get_monitor().start_warm_up() if WARMUP_ON_STARTUP else None
+    watcher = get_dictionary_manager().start_watching()
+    workers = asyncio.create_task(get_executor().start())
+    await get_job_manager().start()
+    yield
+    for task in (discovery, warmup, watcher, workers):
+        if task is not None and not task.done():
+            task.cancel()
+    await get_job_manager().stop()
+    get_executor().shutdown()
+    await get_engine().close()
 
 app = FastAPI(
     title="Acronym Explanation API",
     description="An API to extract acronyms and call multiple LLMs (vLLM base, LoRA, OpenAI) for expanded understanding.",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
     port=8090
 )
 
+@app.exception_handler(Overloaded)
+async def overloaded(request: Request, exc: Overloaded):
+    """Load shedding by the scheduler: 429 with the estimated wait"""
+    return ORJSONResponse(
+        {"detail": f"[Error - Overloaded]: {exc}", "reason": exc.reason},
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {"message": "Acronym Explanation API is up and running!"}
 
 app.include_router(inference_router, prefix="/inference", tags=["Inference"])
+app.include_router(jobs_router, prefix="/inference", tags=["Jobs"])
+app.include_router(acronyms_router, prefix="/acronyms", tags=["Acronyms"])
+app.include_router(metrics_router, tags=["Monitoring"])
+app.include_router(health_router, tags=["Monitoring"])
+app.include_router(admin_router, prefix="/admin", tags=["Admin"])
@@ -4,28 +4,49 @@ Azure OpenAI client for GPT-4o-mini model inference.
 Used as baseline comparison for acronym expansion accuracy.
 """
 
+import os
+from typing import Any, Dict, Optional
 from openai import AsyncAzureOpenAI
 from config import AZURE_API_KEY, AZURE_ENDPOINT, AZURE_API_VERSION
 from app.models.prompt import SYSTEM_PROMPT
 
+# Allows pointing the client at a local mock (see app/benchmarks/mock_server.py)
+AZURE_ENDPOINT = os.getenv("AZURE_ENDPOINT", AZURE_ENDPOINT)
+
 OPENAI_MODEL = "gpt-4o-mini"
 
-async def call_openai(user_query: str) -> str:
+def create_openai_client(**kwargs) -> AsyncAzureOpenAI:
+    """
+    Build an Azure OpenAI client from config.
+    
+    Args:
+        kwargs: Extra AsyncAzureOpenAI options (e.g. http_client, max_retries)
+    
+    Returns:
+        Configured AsyncAzureOpenAI client
+    """
+    return AsyncAzureOpenAI(
+        api_key=AZURE_API_KEY,
+        azure_endpoint=AZURE_ENDPOINT,
+        api_version=AZURE_API_VERSION,
+        **kwargs
+    )
+
+async def call_openai(user_query: str, client: Optional[AsyncAzureOpenAI] = None,
+                      usage: Optional[Dict[str, Any]] = None) -> str:
     """
     Call Azure OpenAI GPT model.
     
     Args:
         user_query: Formatted query with candidate acronyms
+        client: Shared client; a new one is created when omitted
+        usage: Dict filled in place with the response's token usage
         
     Returns:
         Model response as JSON string or error message
     """
     try:
-        client = AsyncAzureOpenAI(
-            api_key=AZURE_API_KEY,
-            azure_endpoint=AZURE_ENDPOINT,
-            api_version=AZURE_API_VERSION,
-        )
+        client = client or create_openai_client()
 
         response = await client.chat.completions.create(
             model=OPENAI_MODEL,
@@ -36,6 +57,9 @@ async def call_openai(user_query: str) -> str:
             temperature=0.0,
             max_tokens=512
         )
+        if usage is not None and response.usage is not None:
+            usage.update(prompt_tokens=response.usage.prompt_tokens,
+                         completion_tokens=response.usage.completion_tokens)
         return response.choices[0].message.content
     except Exception as e:
         return f"[Error - OpenAI]: {e}"
\ No newline at end of file
@@ -69,3 +69,20 @@ def parse_raw_prompt(raw_prompt_string):
 
     return messages
 
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate for prompts and responses (~4 characters per token).
+    
+    Args:
+        text: Prompt or response text
+    
+    Returns:
+        Approximate token count
+    """
+    if not text:
+        return 0
+    return len(text) // 4 + 1
+
+
+SYSTEM_PROMPT_TOKENS = estimate_tokens(SYSTEM_PROMPT)
@@ -0,0 +1,215 @@
+# app/models/registry.py
+"""
+Registry of vLLM-served model variants (models/registry.json).
+Maps logical model ids to a backend endpoint, base model, LoRA adapter and limits; startup discovery checks each server's /v1/models and registers adapters it serves that the file does not list.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import httpx
+
+REGISTRY_FILE = os.getenv("MODEL_REGISTRY_FILE", str(Path(__file__).with_name("registry.json")))
+DISCOVERY_TIMEOUT = float(os.getenv("MODEL_DISCOVERY_TIMEOUT", "5"))
+# Query each server's /v1/models when the API starts
+DISCOVER_ON_STARTUP = os.getenv("MODEL_DISCOVERY_ON_STARTUP", "1") == "1"
+DEFAULT_MAX_TOKENS = 400
+
+# Variant status after discovery
+UNKNOWN = "unknown"        # server not reached (yet); calls go ahead
+SERVED = "served"          # server lists the adapter / base model
+MISSING = "missing"        # server reached but does not list it
+WRONG_BASE = "wrong_base"  # adapter is loaded on a different base model; calls are refused
+
+
+@dataclass
+class Backend:
+    """One OpenAI-compatible vLLM server; concurrency is limited per backend."""
+    name: str
+    label: str
+    endpoint: str
+    max_concurrency: int
+    # Served model id -> /v1/models entry, filled by discovery
+    served: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def models_url(self) -> str:
+        base = self.endpoint.rsplit("/chat/completions", 1)[0]
+        return f"{base}/models"
+
+
+@dataclass
+class ModelVariant:
+    """A logical model id: base model plus optional LoRA adapter on one backend."""
+    id: str
+    backend: str
+    base_model: str
+    adapter: Optional[str] = None
+    adapter_version: str = ""
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    discovered: bool = False
+    status: str = UNKNOWN
+    detail: Optional[str] = None
+
+    @property
+    def served_name(self) -> str:
+        """Value of the request's "model" field."""
+        return self.adapter or self.base_model
+
+    def base(self) -> "ModelVariant":
+        """Same backend and base model without the adapter."""
+        return replace(self, id=f"{self.id}:base", adapter=None, adapter_version="", status=UNKNOWN, detail=None)
+
+
+def load_registry(path: str = REGISTRY_FILE) -> "ModelRegistry":
+    """
+    Read a registry file.
+
+    Backend endpoints can be overridden by the environment variable named in
+    endpoint_env (VLLM_API_URL, TINYLLAMA_API_URL).
+
+    Args:
+        path: JSON file with "backends" and "models" objects
+
+    Returns:
+        ModelRegistry
+    """
+    with open(path, "r") as f:
+        config = json.load(f)
+    backends = {
+        name: Backend(
+            name=name,
+            label=spec.get("label", name),
+            endpoint=os.getenv(spec["endpoint_env"], spec["endpoint"]) if spec.get("endpoint_env") else spec["endpoint"],
+            max_concurrency=int(spec.get("max_concurrency", 16)),
+        )
+        for name, spec in config["backends"].items()
+    }
+    models = {}
+    for model_id, spec in config["models"].items():
+        if spec["backend"] not in backends:
+            raise ValueError(f"Model '{model_id}' uses unknown backend '{spec['backend']}'")
+        models[model_id] = ModelVariant(
+            id=model_id,
+            backend=spec["backend"],
+            base_model=spec["base_model"],
+            adapter=spec.get("adapter"),
+            adapter_version=spec.get("adapter_version", ""),
+            max_tokens=int(spec.get("max_tokens", DEFAULT_MAX_TOKENS)),
+        )
+    return ModelRegistry(backends, models)
+
+
+class ModelRegistry:
+    """Backends and model variants; discovery updates statuses and adds served adapters."""
+
+    def __init__(self, backends: Dict[str, Backend], models: Dict[str, ModelVariant]):
+        self.backends = backends
+        self.models = models
+
+    def endpoint(self, variant: ModelVariant) -> str:
+        return self.backends[variant.backend].endpoint
+
+    def label(self, variant: ModelVariant) -> str:
+        """Error-string source, e.g. "vLLM LoRA" in "[Error - vLLM LoRA]: ..."."""
+        return f"{self.backends[variant.backend].label} {'LoRA' if variant.adapter else 'Base'}"
+
+    async def _fetch(self, http: httpx.AsyncClient, url: str) -> List[Dict[str, Any]]:
+        res = await http.get(url, timeout=DISCOVERY_TIMEOUT)
+        res.raise_for_status()
+        return res.json().get("data", [])
+
+    def _check(self, variant: ModelVariant) -> None:
+        backend = self.backends[variant.backend]
+        if backend.error is not None:
+            variant.status, variant.detail = UNKNOWN, backend.error
+            return
+        entry = backend.served.get(variant.served_name)
+        if entry is None:
+            variant.status = MISSING
+            variant.detail = f"'{variant.served_name}' not served by {backend.models_url}"
+            return
+        parent = entry.get("parent")
+        if variant.adapter and parent and parent != variant.base_model:
+            variant.status = WRONG_BASE
+            variant.detail = f"adapter '{variant.adapter}' is loaded on '{parent}', expected '{variant.base_model}'"
+            return
+        variant.status, variant.detail = SERVED, None
+        if variant.adapter and not variant.adapter_version and entry.get("root"):
+            # Checkpoint directory, e.g. .../checkpoints/final_2 -> final_2
+            variant.adapter_version = Path(str(entry["root"])).name
+
+    async def discover(self, http: httpx.AsyncClient) -> List[ModelVariant]:
+        """
+        Query every backend's /v1/models and update variant statuses.
+
+        Adapters a server serves that no variant references are registered as
+        "<backend>:<adapter>" so requests can select them without a config change.
+
+        Args:
+            http: Pooled client
+
+        Returns:
+            Newly registered variants
+        """
+        fetched: Dict[str, Any] = {}
+        for backend in self.backends.values():
+            url = backend.models_url
+            if url not in fetched:
+                try:
+                    fetched[url] = await self._fetch(http, url)
+                except Exception as e:
+                    fetched[url] = f"[Error - Model discovery]: {e}"
+            result = fetched[url]
+            backend.error = result if isinstance(result, str) else None
+            backend.served = {} if isinstance(result, str) else {str(item["id"]): item for item in result}
+
+        added = []
+        for backend in self.backends.values():
+            referenced = {v.served_name for v in self.models.values() if v.backend == backend.name}
+            for served_id, entry in backend.served.items():
+                parent = entry.get("parent")
+                model_id = f"{backend.name}:{served_id}"
+                # Only adapters (entries with a parent) become new variants; base models must be registered
+                if not parent or served_id in referenced or model_id in self.models:
+                    continue
+                # Servers shared by several backends: keep adapters with the backend whose base model they extend
+                bases = {v.base_model for v in self.models.values() if v.backend == backend.name}
+                if bases and parent not in bases:
+                    continue
+                variant = ModelVariant(id=model_id, backend=backend.name, base_model=parent, adapter=served_id,
+                                       discovered=True)
+                self.models[model_id] = variant
+                added.append(variant)
+        for variant in self.models.values():
+            self._check(variant)
+        return added
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "backends": {
+                name: {"endpoint": backend.endpoint, "max_concurrency": backend.max_concurrency,
+                       "served": sorted(backend.served), "error": backend.error}
+                for name, backend in self.backends.items()
+            },
+            "models": {
+                model_id: {"backend": v.backend, "base_model": v.base_model, "adapter": v.adapter,
+                           "adapter_version": v.adapter_version, "max_tokens": v.max_tokens,
+                           "discovered": v.discovered, "status": v.status, "detail": v.detail}
+                for model_id, v in self.models.items()
+            },
+        }
+
+
+_registry: Optional[ModelRegistry] = None
+
+
+def get_registry() -> ModelRegistry:
+    """Process-wide registry loaded from MODEL_REGISTRY_FILE."""
+    global _registry
+    if _registry is None:
+        _registry = load_registry()
+    return _registry
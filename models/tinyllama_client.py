@@ -1,47 +1,27 @@
 # app/models/tinyllama_client.py
 """
 TinyLlama client for lightweight model inference via vLLM.
-Supports both base model and LoRA adapter for resource-efficient acronym expansion.
+Supports both base model and LoRA adapter for resource-efficient acronym expansion; the tinyllama_lora registry entry names the server and adapter.
 """
 
+from typing import Any, Dict, Optional
 import httpx
-from app.models.prompt import SYSTEM_PROMPT
+from app.models.registry import get_registry
+from app.models.vllm_client import call_model_variant
 
-TINYLLAMA_API_URL = "http://98.89.19.168:8000/v1/chat/completions"
-TINYLLAMA_BASE_MODEL_NAME = "TinyLlama/TinyLlama-1.1B-Chat-v1.0"
-TINYLLAMA_LORA_ADAPTER_NAME = "acronym-lora"
-
-async def call_tinyllama(user_query: str, use_lora: bool = False) -> str:
+async def call_tinyllama(user_query: str, use_lora: bool = False, client: Optional[httpx.AsyncClient] = None,
+                         usage: Optional[Dict[str, Any]] = None) -> str:
     """
     Call TinyLlama model via vLLM API.
     
     Args:
         user_query: Formatted query with candidate acronyms
-        use_lora: If True, uses fine-tuned LoRA adapter; otherwise base model
+        use_lora: If True, uses the tinyllama_lora adapter; otherwise its base model
+        client: Shared pooled client; a short-lived client is created when omitted
+        usage: Dict filled in place with the response's token usage, when reported
     
     Returns:
         Model response as JSON string or error message
     """
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": user_query}
-    ]
-    
-    model_name = TINYLLAMA_LORA_ADAPTER_NAME if use_lora else TINYLLAMA_BASE_MODEL_NAME
-    
-    payload = {
-        "model": model_name,
-        "messages": messages,
-        "temperature": 0.0,
-        "top_p": 0.9,
-        "max_tokens": 400
-    }
-    
-    try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            res = await client.post(TINYLLAMA_API_URL, json=payload)
-            res.raise_for_status()
-            return res.json()["choices"][0]["message"]["content"]
-    except Exception as e:
-        return f"[Error - TinyLlama {'LoRA' if use_lora else 'Base'}]: {e}"
-
+    variant = get_registry().models["tinyllama_lora"]
+    return await call_model_variant(user_query, variant if use_lora else variant.base(), client=client, usage=usage)
@@ -1,47 +1,74 @@
 # app/models/vllm_client.py
 """
 vLLM client for Qwen model inference.
-Supports both base model and LoRA adapter fine-tuned for acronym expansion.
+Supports both base model and LoRA adapter fine-tuned for acronym expansion; endpoints, base models and adapter names come from models/registry.json.
 """
 
+from typing import Any, Dict, Optional
 import httpx
 from app.models.prompt import SYSTEM_PROMPT
+from app.models.registry import WRONG_BASE, ModelVariant, get_registry
 
-VLLM_API_URL = "http://98.89.19.168:8000/v1/chat/completions"
-BASE_MODEL_NAME = "Qwen/Qwen3-4B-Instruct-2507-FP8"
-LORA_ADAPTER_NAME = "acronym-lora"
-
-async def call_vllm(user_query: str, use_lora: bool = False) -> str:
+async def call_model_variant(user_query: str, variant: ModelVariant, client: Optional[httpx.AsyncClient] = None,
+                             usage: Optional[Dict[str, Any]] = None) -> str:
     """
-    Call Qwen model via vLLM API.
+    Call a registered model variant via its backend's chat completions API.
     
     Args:
         user_query: Formatted query with candidate acronyms
-        use_lora: If True, uses fine-tuned LoRA adapter; otherwise base model
+        variant: Registry entry (base model or base model + LoRA adapter)
+        client: Shared pooled client; a short-lived client is created when omitted
+        usage: Dict filled in place with the response's token usage, when reported
     
     Returns:
         Model response as JSON string or error message
     """
+    registry = get_registry()
+    if variant.status == WRONG_BASE:
+        # The server would answer with an adapter trained for another base model
+        return f"[Error - {registry.label(variant)}]: {variant.detail}"
+
     messages = [
         {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": user_query}
     ]
     
-    model_name = LORA_ADAPTER_NAME if use_lora else BASE_MODEL_NAME
-    
     payload = {
-        "model": model_name,
+        "model": variant.served_name,
         "messages": messages,
         "temperature": 0.0,
         "top_p": 0.9,
-        "max_tokens": 400
+        "max_tokens": variant.max_tokens
     }
     
+    api_url = registry.endpoint(variant)
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            res = await client.post(VLLM_API_URL, json=payload)
-            res.raise_for_status()
-            return res.json()["choices"][0]["message"]["content"]
+        if client is not None:
+            res = await client.post(api_url, json=payload)
+        else:
+            async with httpx.AsyncClient(timeout=30.0) as new_client:
+                res = await new_client.post(api_url, json=payload)
+        res.raise_for_status()
+        body = res.json()
+        if usage is not None and body.get("usage"):
+            usage.update(body["usage"])
+        return body["choices"][0]["message"]["content"]
     except Exception as e:
-        return f"[Error - vLLM {'LoRA' if use_lora else 'Base'}]: {e}"
+        return f"[Error - {registry.label(variant)}]: {e}"
 
+async def call_vllm(user_query: str, use_lora: bool = False, client: Optional[httpx.AsyncClient] = None,
+                    usage: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Call Qwen model via vLLM API.
+    
+    Args:
+        user_query: Formatted query with candidate acronyms
+        use_lora: If True, uses the qwen_lora adapter; otherwise the qwen_base model
+        client: Shared pooled client; a short-lived client is created when omitted
+        usage: Dict filled in place with the response's token usage, when reported
+    
+    Returns:
+        Model response as JSON string or error message
+    """
+    variant = get_registry().models["qwen_lora" if use_lora else "qwen_base"]
+    return await call_model_variant(user_query, variant, client=client, usage=usage)
@@ -0,0 +1,43 @@
+# app/routes/acronyms.py
+"""
+Model-free acronym endpoints.
+Bulk extraction for downstream services that only need which acronyms appear and their candidates.
+"""
+
+from pydantic import BaseModel
+from typing import List
+from fastapi import APIRouter, HTTPException
+from app.services.bulk_extract import BULK_EXTRACT_MAX_TEXTS
+from app.services.executor import get_executor
+from app.services.metrics import IN_FLIGHT_REQUESTS, time_stage
+from app.services.tracing import tracer
+
+class ExtractRequest(BaseModel):
+    """Request model for bulk extraction"""
+    texts: List[str]
+    include_candidates: bool = True
+
+router = APIRouter()
+
+@router.post("/extract")
+async def extract(request: ExtractRequest):
+    """
+    Find dictionary acronyms in a batch of texts, without calling any model.
+
+    Args:
+        request: ExtractRequest with the texts and whether to include candidates
+
+    Returns:
+        Dict with count, matches (per text: [start, end, acronym] with character offsets)
+        and candidates (acronym -> expansions, once per acronym)
+    """
+    if len(request.texts) > BULK_EXTRACT_MAX_TEXTS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_EXTRACT_MAX_TEXTS} texts per request")
+    with tracer.start_as_current_span("acronyms.extract") as span, \
+            IN_FLIGHT_REQUESTS.labels("/acronyms/extract").track_inprogress(), time_stage("bulk_extract"):
+        span.set_attribute("request.texts", len(request.texts))
+        try:
+            # Large batches go to the process pool (services/executor.py), small ones run inline
+            return await get_executor().extract(request.texts, request.include_candidates)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"[Error - Extract]: {e}")
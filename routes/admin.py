@@ -0,0 +1,80 @@
+# app/routes/admin.py
+"""
+Admin endpoints for the acronym dictionary, the request scheduler and model discovery.
+Reload swaps in a new dictionary version without a restart and invalidates only the affected cached responses.
+"""
+
+import hmac
+import os
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from app.models.registry import get_registry
+from app.services.dictionary_manager import get_dictionary_manager
+from app.services.engine import get_engine
+from app.services.model_dispatch import discover_models
+from app.services.scheduler import get_scheduler
+
+# Admin calls must send it in the X-Admin-Token header; while unset the admin routes are disabled
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+router = APIRouter()
+
+def _authorize(token: Optional[str]) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if token is None or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@router.get("/dictionary")
+async def dictionary_status(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Current dictionary version.
+    
+    Returns:
+        Dict with path, version, loaded_at, acronym/alias counts and watcher state
+    """
+    _authorize(x_admin_token)
+    return get_dictionary_manager().status()
+
+@router.post("/dictionary/reload")
+async def reload_dictionary(force: bool = False, x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Reload ACRONYM_FILE now instead of waiting for the watcher.
+    
+    Args:
+        force: Reload even if the file is unchanged
+    
+    Returns:
+        Dict with reloaded, version, changed_acronyms and invalidated_cache_entries
+    """
+    _authorize(x_admin_token)
+    try:
+        return await get_dictionary_manager().reload(force=force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"[Error - Dictionary]: {e}")
+
+@router.get("/scheduler")
+async def scheduler_status(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Admission state per priority class.
+    
+    Returns:
+        Dict of class to active, queued, limits and average request seconds
+    """
+    _authorize(x_admin_token)
+    return get_scheduler().status()
+
+@router.post("/models/discover")
+async def rediscover_models(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Re-read the vLLM servers' /v1/models, e.g. after loading a new adapter.
+    
+    Returns:
+        Dict with added (newly callable model ids) and the status of every registered variant
+    """
+    _authorize(x_admin_token)
+    added = await discover_models(get_engine().clients.http)
+    return {
+        "added": [variant.id for variant in added],
+        "status": {model_id: v["status"] for model_id, v in get_registry().describe()["models"].items()},
+    }
@@ -0,0 +1,34 @@
+# app/routes/health.py
+"""
+Readiness and backend health endpoints.
+/ready gates traffic on warm-up; /health/backends reports per-model latency and availability.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+from app.services.health import get_monitor
+
+router = APIRouter()
+
+@router.get("/ready")
+async def ready():
+    """
+    Readiness probe.
+    
+    Returns:
+        200 once warm-up finished and every warm-up model is available, else 503
+    """
+    status = await get_monitor().readiness()
+    return ORJSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@router.get("/health/backends")
+async def backends():
+    """
+    Probe the warm-up models plus HEALTH_EXTRA_MODELS with a tiny request.
+    
+    Results are cached for 5 s (HEALTH_CACHE_SECONDS); concurrent callers share one probe round.
+    
+    Returns:
+        Dict of model name to backend, available, latency_ms and error
+    """
+    return await get_monitor().check_backends()
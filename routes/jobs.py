@@ -0,0 +1,76 @@
+# app/routes/jobs.py
+"""
+Async job endpoints for long-running evaluation batches.
+Submitting returns a job id at once; progress, throughput and partial results are polled instead of holding a connection open.
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+from app.routes.run_inference import QueryRequest, check_models
+from app.services.jobs import get_job_manager
+from app.services.scheduler import classify_request
+
+router = APIRouter()
+
+@router.post("/jobs", status_code=202)
+async def submit_job(request: QueryRequest, http_request: Request):
+    """
+    Queue n random queries for the selected models as a background job.
+
+    Args:
+        request: QueryRequest with n and model selection flags or ids
+        http_request: Raw request (X-Client-Id header)
+
+    Returns:
+        Dict with job_id, status and total samples
+    """
+    check_models(request.models)
+    client, _ = classify_request(http_request.headers, http_request.client.host if http_request.client else None)
+    job = await get_job_manager().submit(request.model_dump(), client)
+    return ORJSONResponse(
+        {"job_id": job["id"], "status": job["status"], "total": job["total"]},
+        status_code=202,
+        headers={"Location": f"/inference/jobs/{job['id']}"},
+    )
+
+@router.get("/jobs")
+async def list_jobs(limit: int = 50):
+    """
+    Most recent jobs, newest first (without result rows).
+
+    Args:
+        limit: Maximum jobs to return
+    """
+    return await get_job_manager().list(limit)
+
+@router.get("/jobs/{job_id}")
+async def job_status(job_id: str, offset: int = 0, limit: int = 100):
+    """
+    Job status with progress, throughput and a page of its results.
+
+    Args:
+        job_id: Id returned by POST /inference/jobs
+        offset: First result row (in sample order)
+        limit: Maximum result rows; 0 returns status only
+
+    Returns:
+        Dict with status, total, completed, failed, progress, throughput_samples_per_second,
+        eta_seconds and results
+    """
+    job = await get_job_manager().status(job_id, offset, limit)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return job
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job; results stored so far are kept.
+
+    Args:
+        job_id: Job to cancel
+    """
+    job = await get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return {"job_id": job["id"], "status": job["status"]}
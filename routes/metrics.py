@@ -0,0 +1,21 @@
+# app/routes/metrics.py
+"""
+Prometheus scrape endpoint.
+Exposes stage latency, model latency, error and in-flight metrics in text format.
+"""
+
+from fastapi import APIRouter, Response
+from app.services.metrics import render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def metrics():
+    """
+    Return all registered metrics in Prometheus exposition format.
+    
+    Returns:
+        Plain text response for Prometheus scrapers
+    """
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
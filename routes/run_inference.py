@@ -5,9 +5,20 @@ Handles random query generation and acronym expansion across multiple AI models.
 """
 
 from pydantic import BaseModel
-from typing import Optional
-from fastapi import APIRouter
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from app.models.registry import get_registry
+from app.services.acronyms_service import get_routed_response
 from app.services.input_query import get_all_model_responses_random
+from app.services.json_io import dumps
+from app.services.model_dispatch import MODEL_CALLS
+from app.services.speculative import stream_expansion
+from app.services.metrics import IN_FLIGHT_REQUESTS, time_stage
+from app.services.scheduler import CURRENT_PRIORITY, Ticket, classify_request, get_scheduler
+from app.services.tracing import tracer
+from app.services.usage import usage_endpoint, usage_tracker
 
 class QueryRequest(BaseModel):
     """Request model for inference endpoint"""
@@ -16,24 +27,161 @@ class QueryRequest(BaseModel):
     use_qwen_lora: Optional[bool] = True
     use_openai_gpt: Optional[bool] = True
     use_tiny_llama_lora: Optional[bool] = False
+    use_ranker: Optional[bool] = False
+    use_embedding: Optional[bool] = False
+    use_routing: Optional[bool] = False
+    # Registered model ids (GET /inference/models); overrides the use_* flags when set
+    models: Optional[List[str]] = None
+
+class StreamRequest(BaseModel):
+    """Request model for the speculative streaming endpoint"""
+    query: str
+    model: Optional[str] = None
+
+class RouteRequest(BaseModel):
+    """Request model for the routed single-query endpoint"""
+    query: str
+    chain: Optional[List[str]] = None
 
 router = APIRouter()
 
+def _client_host(http_request: Request) -> Optional[str]:
+    return http_request.client.host if http_request.client else None
+
+def check_models(models: Optional[List[str]]) -> None:
+    """Reject ids that are not registered (400), before the request is admitted."""
+    unknown = [name for name in models or () if name not in MODEL_CALLS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown model(s): {', '.join(unknown)}")
+
 @router.post("/generate")
-async def generate(request: QueryRequest):
+async def generate(request: QueryRequest, http_request: Request):
     """
     Generate acronym expansions for n random queries using selected models.
     
+    Requests with n >= BULK_MIN_SAMPLES are always scheduled as bulk; "X-Priority: bulk" can
+    demote a smaller request, but never promotes a large one. See services/scheduler.py.
+    
     Args:
-        request: QueryRequest with model selection flags
+        request: QueryRequest with model selection flags or explicit model ids
+        http_request: Raw request (X-Client-Id / X-Priority headers)
     
     Returns:
         Dict with total_samples and data list containing results per query
     """
-    return await get_all_model_responses_random(
-        n=request.n,
-        use_qwen_base=request.use_qwen_base,
-        use_qwen_lora=request.use_qwen_lora,
-        use_openai_gpt=request.use_openai_gpt,
-        use_tiny_llama_lora=request.use_tiny_llama_lora
-    )
\ No newline at end of file
+    check_models(request.models)
+    client, priority = classify_request(http_request.headers, _client_host(http_request), request.n)
+    models = len(request.models) if request.models else sum(bool(flag) for flag in (
+        request.use_qwen_base, request.use_qwen_lora, request.use_openai_gpt,
+        request.use_tiny_llama_lora, request.use_ranker, request.use_embedding,
+    ))
+    with tracer.start_as_current_span("inference.generate") as span, \
+            IN_FLIGHT_REQUESTS.labels("/inference/generate").track_inprogress(), time_stage("request"), \
+            usage_endpoint("/inference/generate"):
+        span.set_attribute("request.n", request.n)
+        span.set_attribute("request.priority", priority)
+        async with get_scheduler().admit(client, priority, cost=request.n * max(1, models)):
+            return await get_all_model_responses_random(
+                n=request.n,
+                use_qwen_base=request.use_qwen_base,
+                use_qwen_lora=request.use_qwen_lora,
+                use_openai_gpt=request.use_openai_gpt,
+                use_tiny_llama_lora=request.use_tiny_llama_lora,
+                use_ranker=request.use_ranker,
+                use_embedding=request.use_embedding,
+                use_routing=request.use_routing,
+                models=request.models
+            )
+
+
+@router.post("/route")
+async def route(request: RouteRequest, http_request: Request):
+    """
+    Expand one query with a single answer: cheapest model first, escalating on validation failure.
+    
+    Args:
+        request: RouteRequest with the query and optional escalation chain
+    
+    Returns:
+        Dict with acronyms found, answering model, result and routing attempts
+    """
+    check_models(request.chain)
+    with tracer.start_as_current_span("inference.route"), \
+            IN_FLIGHT_REQUESTS.labels("/inference/route").track_inprogress(), time_stage("request"), \
+            usage_endpoint("/inference/route"):
+        client, priority = classify_request(http_request.headers, _client_host(http_request))
+        async with get_scheduler().admit(client, priority):
+            return await get_routed_response(request.query, request.chain)
+
+
+@router.get("/models")
+async def models():
+    """
+    Callable model ids and the vLLM backends/variants behind them (models/registry.json plus
+    adapters found on the servers' /v1/models at startup).
+    
+    Returns:
+        Dict with models (all ids), backends and variants (registry entries with discovery status)
+    """
+    registry = get_registry().describe()
+    return {"models": list(MODEL_CALLS), "backends": registry["backends"], "variants": registry["models"]}
+
+
+@router.get("/usage")
+async def usage():
+    """
+    Token usage, throughput and cost per model and per endpoint since start or last reset.
+    
+    Returns:
+        Dict with window_seconds, by_model and by_endpoint rows
+    """
+    return usage_tracker.snapshot()
+
+
+@router.delete("/usage")
+async def reset_usage():
+    """Reset the usage totals (e.g. before a benchmark run)."""
+    usage_tracker.reset()
+    return {"status": "reset"}
+
+
+async def _sse_events(request: StreamRequest, ticket: Ticket):
+    token = CURRENT_PRIORITY.set(ticket.priority)
+    try:
+        with IN_FLIGHT_REQUESTS.labels("/inference/stream").track_inprogress(), \
+                usage_endpoint("/inference/stream"):
+            try:
+                async for event, payload in stream_expansion(request.query, request.model):
+                    yield b"event: " + event.encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+            except Exception as e:
+                yield b"event: error\ndata: " + dumps({"error": f"[Error - Stream]: {e}"}) + b"\n\n"
+            yield b"event: done\ndata: {}\n\n"
+    finally:
+        CURRENT_PRIORITY.reset(token)
+        get_scheduler().release(ticket)
+
+
+@router.post("/stream")
+async def stream(request: StreamRequest, http_request: Request):
+    """
+    Server-sent events: an instant provisional answer ranked from the dictionary,
+    then the refined model answer on the same stream.
+    
+    Args:
+        request: StreamRequest with the query and optional model (default: routed)
+    
+    Returns:
+        text/event-stream with "provisional", "refined" and "done" events
+    """
+    if request.model is not None and request.model not in MODEL_CALLS:
+        raise HTTPException(status_code=400, detail=f"Unknown model '{request.model}'")
+    # Admitted before the stream starts, so an overloaded server can still answer 429
+    client, priority = classify_request(http_request.headers, _client_host(http_request))
+    ticket = await get_scheduler().acquire(client, priority)
+    return StreamingResponse(
+        _sse_events(request, ticket),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also released here in case the client disconnects before the stream starts (release is idempotent)
+        background=BackgroundTask(get_scheduler().release, ticket),
+    )
@@ -3,16 +3,17 @@ Acronym extraction and multi-model inference service.
 Extracts acronyms from queries, matches against dictionary, and dispatches to AI models.
 """
 
-import json
 import re
-from typing import Dict, List
-from app.models.vllm_client import call_vllm
-from app.models.openai_client import call_openai
+from typing import Dict, List, Optional
+from app.services.dictionary_manager import get_dictionary_manager
+from app.services.metrics import time_stage
+from app.services.engine import get_engine
+from app.services.pruning import prune_candidates, pruning_enabled
+from app.services.tracing import ATTR_ACRONYM_COUNT, ATTR_PROMPT_TOKENS, tracer
+from app.models.prompt import estimate_tokens
 
-ACRONYM_FILE = "/Users/rishabh.singh/Desktop/ai-search-retrieval-pipeline-poc-2/app/acronyms_list_cleaned.json"
-
-with open(ACRONYM_FILE, "r") as f:
-    ACRONYMS = json.load(f)
+# Loaded (and hot-reloaded) by app/services/dictionary_manager.py from ACRONYM_FILE
+get_dictionary_manager()
 
 def extract_acronyms(query: str) -> Dict[str, List[str]]:
     """
@@ -24,12 +25,17 @@ def extract_acronyms(query: str) -> Dict[str, List[str]]:
     Returns:
         Dict mapping found acronyms to their possible expansions
     """
-    found = {}
-    words = re.findall(r'\b[a-zA-Z]{1,}\b', query)
-    for word in words:
-        if word in ACRONYMS:
-            found[word] = ACRONYMS[word]
-    return found
+    with tracer.start_as_current_span("extract_acronyms") as span:
+        found = {}
+        # One reference per call, so a concurrent reload cannot mix two versions
+        dictionary = get_dictionary_manager().current
+        words = re.findall(r'\b[a-zA-Z]{1,}\b', query)
+        for word in words:
+            expansions = dictionary.lookup(word)
+            if expansions is not None:
+                found[word] = expansions
+        span.set_attribute(ATTR_ACRONYM_COUNT, len(found))
+        return found
 
 def build_structured_prompt(query: str, found_acronyms: Dict[str, List[str]]) -> str:
     """
@@ -42,12 +48,15 @@ def build_structured_prompt(query: str, found_acronyms: Dict[str, List[str]]) ->
     Returns:
         Formatted prompt string
     """
-    candidate_strs = [
-        f"({acro}: {', '.join(expansions)})"
-        for acro, expansions in found_acronyms.items()
-    ]
-    candidate_section = " ".join(candidate_strs)
-    return f'query: "{query}", candidate acronyms: "{candidate_section}"'
+    with tracer.start_as_current_span("build_structured_prompt") as span:
+        candidate_strs = [
+            f"({acro}: {', '.join(expansions)})"
+            for acro, expansions in found_acronyms.items()
+        ]
+        candidate_section = " ".join(candidate_strs)
+        prompt = f'query: "{query}", candidate acronyms: "{candidate_section}"'
+        span.set_attribute(ATTR_PROMPT_TOKENS, estimate_tokens(prompt))
+        return prompt
 
 async def get_all_model_responses(
     query: str,
@@ -67,7 +76,8 @@ async def get_all_model_responses(
     Returns:
         Dict with query, found acronyms, and model results
     """
-    found_acronyms = extract_acronyms(query)
+    with time_stage("extraction"):
+        found_acronyms = extract_acronyms(query)
 
     if not found_acronyms:
         return {
@@ -80,32 +90,57 @@ async def get_all_model_responses(
             }
         }
 
-    user_query = build_structured_prompt(query, found_acronyms)
-    results = {}
-
-    if use_qwen_base:
-        base_resp = await call_vllm(user_query, use_lora=False)
-        try:
-            results["qwen_base"] = json.loads(base_resp)
-        except Exception:
-            results["qwen_base"] = base_resp
+    if pruning_enabled():
+        with time_stage("pruning"):
+            found_acronyms = prune_candidates(query, found_acronyms)
 
-    if use_qwen_lora:
-        lora_resp = await call_vllm(user_query, use_lora=True)
-        try:
-            results["qwen_lora"] = json.loads(lora_resp)
-        except Exception:
-            results["qwen_lora"] = lora_resp
+    with time_stage("prompt_build"):
+        user_query = build_structured_prompt(query, found_acronyms)
 
-    if use_openai_gpt:
-        openai_resp = await call_openai(user_query)
-        try:
-            results["openai_gpt"] = json.loads(openai_resp)
-        except Exception:
-            results["openai_gpt"] = openai_resp
+    selected = {
+        "qwen_base": use_qwen_base,
+        "qwen_lora": use_qwen_lora,
+        "openai_gpt": use_openai_gpt
+    }
+    model_names = [name for name, enabled in selected.items() if enabled]
+    results = await get_engine().run_models(user_query, model_names)
 
     return {
         "query": query,
         "acronyms_found": found_acronyms,
         "results": results
     }
+
+async def get_routed_response(query: str, chain: Optional[List[str]] = None) -> Dict:
+    """
+    Answer a query with the cheapest model whose output validates.
+    
+    Args:
+        query: User query text
+        chain: Model result keys in escalation order (default ROUTING_CHAIN)
+    
+    Returns:
+        Dict with query, found acronyms, answering model, result and routing attempts
+    """
+    with time_stage("extraction"):
+        found_acronyms = extract_acronyms(query)
+
+    if not found_acronyms:
+        return {"query": query, "acronyms_found": {}, "model": None, "result": {}, "attempts": []}
+
+    if pruning_enabled():
+        with time_stage("pruning"):
+            found_acronyms = prune_candidates(query, found_acronyms)
+
+    with time_stage("prompt_build"):
+        user_query = build_structured_prompt(query, found_acronyms)
+
+    routed = await get_engine().route(user_query, found_acronyms, chain)
+    return {
+        "query": query,
+        "acronyms_found": found_acronyms,
+        "model": routed["model"],
+        "result": routed["output"],
+        "confidence": routed["confidence"],
+        "attempts": routed["attempts"]
+    }
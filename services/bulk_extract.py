@@ -0,0 +1,81 @@
+# app/services/bulk_extract.py
+"""
+Bulk acronym extraction without any model call.
+Runs the extract_acronyms lookup over a batch of texts and returns compact per-text matches with character offsets.
+
+Benchmark:
+    python -m app.benchmarks.extract_throughput --texts 100000
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence
+from app.services.dictionary import CompiledDictionary
+from app.services.dictionary_manager import get_dictionary_manager
+
+# Same word definition as extract_acronyms, so both paths find the same acronyms
+WORD_PATTERN = re.compile(r"\b[a-zA-Z]+\b")
+# Upper bound on texts per /acronyms/extract request
+BULK_EXTRACT_MAX_TEXTS = int(os.getenv("BULK_EXTRACT_MAX_TEXTS", "100000"))
+
+# [start, end, acronym]: text[start:end] is the word as written, acronym the canonical dictionary key
+Match = List[Any]
+
+
+def extract_matches(text: str, aliases: Dict[str, str]) -> List[Match]:
+    """
+    Every dictionary word in one text, in order of appearance.
+
+    Args:
+        text: Query or document text
+        aliases: Word as written -> canonical key (CompiledDictionary.aliases)
+
+    Returns:
+        [start, end, acronym] per occurrence
+    """
+    get = aliases.get
+    matches = []
+    for m in WORD_PATTERN.finditer(text):
+        canonical = get(m.group())
+        if canonical is not None:
+            matches.append([m.start(), m.end(), canonical])
+    return matches
+
+
+def extract_batch(
+    texts: Sequence[str],
+    include_candidates: bool = True,
+    dictionary: Optional[CompiledDictionary] = None,
+) -> Dict[str, Any]:
+    """
+    Extract acronyms from many texts in one pass.
+
+    The dictionary is taken once for the whole batch, so a concurrent reload
+    cannot mix two versions. Repeated texts are matched once. Candidates are
+    returned once per acronym in a shared table instead of per match.
+
+    Args:
+        texts: Texts to scan
+        include_candidates: Also return the expansions of every matched acronym
+        dictionary: Dictionary to use (default: the current hot-reloaded one)
+
+    Returns:
+        Dict with count, matches (one list per text) and, optionally, candidates
+    """
+    if dictionary is None:
+        dictionary = get_dictionary_manager().current
+    aliases = dictionary.aliases
+
+    seen: Dict[str, List[Match]] = {}
+    results = []
+    for text in texts:
+        matches = seen.get(text)
+        if matches is None:
+            matches = seen[text] = extract_matches(text, aliases)
+        results.append(matches)
+
+    response: Dict[str, Any] = {"count": len(results), "matches": results}
+    if include_candidates:
+        found = {match[2] for matches in seen.values() for match in matches}
+        response["candidates"] = {acronym: dictionary.acronyms[acronym] for acronym in sorted(found)}
+    return response
@@ -0,0 +1,248 @@
+# app/services/candidate_index.py
+"""
+Precomputed candidate-acronym index for the golden and sampled datasets.
+A one-time build parses candidates and prebuilds prompts into a Parquet file,
+so the sampler, UIs and eval runners never re-parse candidate strings per request.
+
+Build:
+    python -m app.services.candidate_index data/golden_data_20k.json data/golden_data_20k.parquet
+"""
+
+import argparse
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from app.models.prompt import SYSTEM_PROMPT_TOKENS, estimate_tokens
+from app.services.json_io import dumps, loads, read_json
+
+# Groups are "(acro: ...)" joined by spaces; expansions can hold unbalanced parentheses
+# ("artificial intelligence (contextual"), so split on ") (acro:" rather than matching pairs
+GROUP_SEPARATOR_PATTERN = re.compile(r"\)\s*\((?=\s*[A-Za-z]+:)")
+ACRONYM_PREFIX_PATTERN = re.compile(r"^([A-Za-z]+):\s*(.*)$")
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]{1,}\b')
+PROMPT_PATTERN = re.compile(r'^query: "(.*)", candidate acronyms: "(.*)"$', re.DOTALL)
+
+
+def parse_candidate_string(candidate_acronyms: str, query: str = "") -> Dict[str, List[str]]:
+    """
+    Parse a preformatted "(AI: a, b) (OKR: c)" candidate string.
+
+    Some golden rows pack several acronyms into one group
+    ("(ai: x, y, quantexa: z)") and some expansions contain a colon
+    ("ca: a cancer journal"). An item only starts a new acronym when its
+    prefix is a word from the query (case-insensitive), which resolves both.
+
+    Args:
+        candidate_acronyms: Serialized candidates from golden_data_20k.json
+        query: Query the candidates were extracted from
+
+    Returns:
+        Dict mapping acronym to its expansions, in source order
+    """
+    query_words = {word.lower() for word in WORD_PATTERN.findall(query)}
+    parsed: Dict[str, List[str]] = {}
+    text = candidate_acronyms.strip()
+    if text.startswith("(") and text.endswith(")"):
+        text = text[1:-1]
+    groups = GROUP_SEPARATOR_PATTERN.split(text)
+
+    for group in groups:
+        current: Optional[str] = None
+        for item in group.split(","):
+            item = item.strip()
+            if not item:
+                continue
+            match = ACRONYM_PREFIX_PATTERN.match(item)
+            prefix = match.group(1).lower() if match else None
+            starts_acronym = match is not None and (
+                current is None
+                or (prefix != current.lower() and (not query_words or prefix in query_words))
+            )
+            if starts_acronym:
+                current = match.group(1)
+                parsed.setdefault(current, [])
+                item = match.group(2).strip()
+                if not item:
+                    continue
+            if current is None:
+                continue
+            parsed[current].append(item)
+    return parsed
+
+
+def format_api_prompt(query: str, candidates: Dict[str, List[str]]) -> str:
+    """Prompt in the API format (same as build_structured_prompt)."""
+    candidate_section = " ".join(
+        f"({acro}: {', '.join(expansions)})" for acro, expansions in candidates.items()
+    )
+    return f'query: "{query}", candidate acronyms: "{candidate_section}"'
+
+
+def parse_prompt(user_query: str) -> Tuple[str, Dict[str, List[str]]]:
+    """Recover the query and candidates from an API-format prompt."""
+    match = PROMPT_PATTERN.match(user_query)
+    if not match:
+        raise ValueError("prompt is not in the 'query: \"...\", candidate acronyms: \"...\"' format")
+    query, candidate_text = match.groups()
+    return query, parse_candidate_string(candidate_text, query)
+
+
+def format_eval_prompt(query: str, candidates: Dict[str, List[str]]) -> str:
+    """Prompt in the eval runner format (same as construct_user_query)."""
+    acronyms_text = "\n".join(
+        f"{acronym}: {', '.join(expansions)}" for acronym, expansions in candidates.items()
+    )
+    return f"Query: {query}\nCandidate Acronyms:\n{acronyms_text}"
+
+
+def build_rows(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """
+    Convert golden or sampled records into index columns.
+
+    Golden rows ("Query", "Candidate_Acronyms" string) keep their exact
+    original prompt; sampled rows ("query", "candidate_acronyms" dict)
+    get the API prompt built from the dict.
+
+    Args:
+        records: Rows from golden_data_20k.json or sampled_20000_queries.json
+
+    Returns:
+        Column name to list of values
+    """
+    columns: Dict[str, List[Any]] = {
+        "query": [], "candidate_text": [], "acronyms": [], "expansions": [],
+        "prompt": [], "eval_prompt": [], "prompt_tokens": [], "eval_prompt_tokens": [], "expected": [],
+    }
+    for record in records:
+        if "Query" in record:
+            query = record.get("Query", "")
+            candidate_text = record.get("Candidate_Acronyms", "")
+            candidates = parse_candidate_string(candidate_text, query)
+            prompt = f'query: "{query}", candidate acronyms: "{candidate_text}"'
+            expected = record.get("Best_Output", "")
+        else:
+            query = record.get("query", "")
+            candidates = record.get("candidate_acronyms", {}) or {}
+            candidate_text = " ".join(f"({a}: {', '.join(e)})" for a, e in candidates.items())
+            prompt = format_api_prompt(query, candidates)
+            expected = record.get("output", {})
+
+        eval_prompt = format_eval_prompt(query, candidates)
+        columns["query"].append(query)
+        columns["candidate_text"].append(candidate_text)
+        columns["acronyms"].append(list(candidates.keys()))
+        columns["expansions"].append(list(candidates.values()))
+        columns["prompt"].append(prompt)
+        columns["eval_prompt"].append(eval_prompt)
+        columns["prompt_tokens"].append(SYSTEM_PROMPT_TOKENS + estimate_tokens(prompt))
+        columns["eval_prompt_tokens"].append(SYSTEM_PROMPT_TOKENS + estimate_tokens(eval_prompt))
+        columns["expected"].append(expected if isinstance(expected, str) else dumps(expected).decode())
+    return columns
+
+
+def build_index(input_path: str, output_path: str) -> int:
+    """
+    Build the Parquet index from a JSON dataset.
+
+    Args:
+        input_path: golden_data_20k.json or sampled_20000_queries.json
+        output_path: Destination .parquet file
+
+    Returns:
+        Number of rows written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = build_rows(read_json(input_path))
+    table = pa.table({
+        "query": pa.array(columns["query"], pa.string()),
+        "candidate_text": pa.array(columns["candidate_text"], pa.string()),
+        "acronyms": pa.array(columns["acronyms"], pa.list_(pa.string())),
+        "expansions": pa.array(columns["expansions"], pa.list_(pa.list_(pa.string()))),
+        "prompt": pa.array(columns["prompt"], pa.string()),
+        "eval_prompt": pa.array(columns["eval_prompt"], pa.string()),
+        "prompt_tokens": pa.array(columns["prompt_tokens"], pa.int32()),
+        "eval_prompt_tokens": pa.array(columns["eval_prompt_tokens"], pa.int32()),
+        "expected": pa.array(columns["expected"], pa.string()),
+    })
+    pq.write_table(table, output_path, compression="zstd")
+    return table.num_rows
+
+
+def read_columns(index_path: str) -> Dict[str, List[Any]]:
+    """Read every index column into Python lists."""
+    import pyarrow.parquet as pq
+
+    return pq.read_table(index_path).to_pydict()
+
+
+def _records_from_columns(columns: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    records = []
+    for i, query in enumerate(columns["query"]):
+        records.append({
+            "Query": query,
+            "Candidate_Acronyms": columns["candidate_text"][i],
+            "Best_Output": columns["expected"][i],
+            "candidates": dict(zip(columns["acronyms"][i], columns["expansions"][i])),
+            "prompt": columns["prompt"][i],
+            "prompt_tokens": columns["prompt_tokens"][i],
+        })
+    return records
+
+
+def load_golden_records(index_path: str) -> List[Dict[str, Any]]:
+    """
+    Load index rows in the golden schema used by the API sampler.
+
+    Returns:
+        Records with Query/Candidate_Acronyms/Best_Output plus parsed
+        "candidates", prebuilt "prompt" and "prompt_tokens"
+    """
+    return _records_from_columns(read_columns(index_path))
+
+
+def load_golden_json(data_path: str) -> List[Dict[str, Any]]:
+    """
+    Load golden JSON and attach the same derived fields as the index, once.
+
+    Fallback for when the Parquet index has not been built yet.
+    """
+    return _records_from_columns(build_rows(read_json(data_path)))
+
+
+def load_eval_records(index_path: str) -> List[Dict[str, Any]]:
+    """
+    Load index rows in the sampled schema used by the eval runners.
+
+    Returns:
+        Records with query/candidate_acronyms/output plus prebuilt "eval_prompt"
+    """
+    columns = read_columns(index_path)
+    records = []
+    for i, query in enumerate(columns["query"]):
+        expected = columns["expected"][i]
+        try:
+            output = loads(expected) if expected else {}
+        except ValueError:
+            output = expected
+        records.append({
+            "query": query,
+            "candidate_acronyms": dict(zip(columns["acronyms"][i], columns["expansions"][i])),
+            "output": output,
+            "eval_prompt": columns["eval_prompt"][i],
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the candidate-acronym Parquet index")
+    parser.add_argument("input", help="golden_data_20k.json or sampled_20000_queries.json")
+    parser.add_argument("output", help="Destination .parquet file")
+    args = parser.parse_args()
+
+    rows = build_index(args.input, args.output)
+    print(f"✅ Indexed {rows} rows into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+# app/services/dictionary.py
+"""
+Acronym dictionary compiler.
+Drops unreachable keys and deduplicates each key's expansions by normalized form; case-variant keys keep their own expansion lists unless folding is requested.
+
+Compile:
+    python -m app.services.dictionary data/acronyms_list_cleaned.json --stats dictionary_stats.json
+"""
+
+import argparse
+import re
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from app.services.json_io import PathLike, dumps, read_json, write_json
+
+COMPILED_SUFFIX = ".compiled.json"
+# 2: keys are no longer case-folded by default
+COMPILED_VERSION = 2
+
+# extract_acronyms only looks up alphabetic words, so any other key is unreachable
+KEY_PATTERN = re.compile(r"^[A-Za-z]+$")
+NON_WORD_PATTERN = re.compile(r"[\W_]+")
+
+
+class CompiledDictionary(NamedTuple):
+    """Acronyms by key plus the original key spellings that map to them (identity unless case-folded)."""
+    acronyms: Dict[str, List[str]]
+    aliases: Dict[str, str]
+
+    def lookup(self, word: str) -> Optional[List[str]]:
+        """Expansions for a word exactly as written, or None if it was not a dictionary key."""
+        canonical = self.aliases.get(word)
+        return self.acronyms[canonical] if canonical is not None else None
+
+
+def normalize_expansion(expansion: str) -> str:
+    """Comparison form: casefolded, punctuation and whitespace runs collapsed ("C.A. Frost" == "c. a. frost")."""
+    return NON_WORD_PATTERN.sub(" ", expansion.casefold()).strip()
+
+
+def compiled_path_for(source: PathLike) -> Path:
+    """Default compiled file next to the source dictionary."""
+    source = Path(source)
+    return source.with_name(source.stem + COMPILED_SUFFIX)
+
+
+def compile_dictionary(raw: Dict[str, List[str]], fold_case: bool = False) -> Tuple[CompiledDictionary, Dict[str, Any]]:
+    """
+    Drop unreachable keys and deduplicate expansions within each key.
+
+    By default every key keeps its own expansion list, so a lookup returns the
+    same expansions as the raw dictionary minus duplicates ("AI" and "ai" stay
+    separate entries). With fold_case, case variants are merged into one
+    casefolded key and every spelling returns the merged list; this shrinks the
+    file but enlarges the prompts of the merged acronyms.
+
+    Args:
+        raw: Acronym to expansions as exported by the extraction notebook
+        fold_case: Merge case-variant keys
+
+    Returns:
+        Tuple of (compiled dictionary, stats)
+    """
+    acronyms: Dict[str, List[str]] = {}
+    aliases: Dict[str, str] = {}
+    seen: Dict[str, set] = {}
+    stats = {
+        "fold_case": fold_case,
+        "keys_in": len(raw),
+        "expansions_in": sum(len(values) for values in raw.values()),
+        "unreachable_keys": 0,
+        "duplicate_expansions": 0,
+        "empty_expansions": 0,
+    }
+
+    for key, values in raw.items():
+        key = key.strip()
+        if not KEY_PATTERN.match(key):
+            stats["unreachable_keys"] += 1
+            continue
+        canonical = key.casefold() if fold_case else key
+        aliases[key] = canonical
+        expansions = acronyms.setdefault(canonical, [])
+        normalized = seen.setdefault(canonical, set())
+        for expansion in values:
+            expansion = expansion.strip()
+            form = normalize_expansion(expansion)
+            if not form:
+                stats["empty_expansions"] += 1
+            elif form in normalized:
+                stats["duplicate_expansions"] += 1
+            else:
+                normalized.add(form)
+                expansions.append(expansion)
+
+    compiled = CompiledDictionary(acronyms, aliases)
+    stats.update({
+        "keys_out": len(acronyms),
+        "aliases": len(aliases),
+        "merged_keys": len(aliases) - len(acronyms),
+        "expansions_out": sum(len(values) for values in acronyms.values()),
+        "bytes_in": len(dumps(raw)),
+        "bytes_out": len(dumps(to_json(compiled))),
+    })
+    stats["bytes_saved"] = stats["bytes_in"] - stats["bytes_out"]
+    return compiled, stats
+
+
+def to_json(compiled: CompiledDictionary) -> Dict[str, Any]:
+    return {"version": COMPILED_VERSION, "acronyms": compiled.acronyms, "aliases": compiled.aliases}
+
+
+def from_json(data: Dict[str, Any]) -> CompiledDictionary:
+    if data.get("version") != COMPILED_VERSION:
+        raise ValueError(f"Unsupported compiled dictionary version {data.get('version')!r}")
+    return CompiledDictionary(data["acronyms"], data["aliases"])
+
+
+def load_dictionary(path: PathLike) -> CompiledDictionary:
+    """
+    Load the compiled form of a dictionary.
+
+    A *.compiled.json path is read directly. For a raw dictionary, the compiled
+    file next to it is used when it is at least as new as the source;
+    otherwise the raw file is compiled in memory.
+
+    Args:
+        path: Raw acronyms_list_cleaned.json or its compiled output
+
+    Returns:
+        Compiled dictionary
+    """
+    path = Path(path)
+    if path.name.endswith(COMPILED_SUFFIX):
+        return from_json(read_json(path))
+    compiled_path = compiled_path_for(path)
+    if compiled_path.exists() and compiled_path.stat().st_mtime >= path.stat().st_mtime:
+        try:
+            return from_json(read_json(compiled_path))
+        except ValueError:
+            # Written by an older compiler version; recompile from the source
+            pass
+    return compile_dictionary(read_json(path))[0]
+
+
+def format_stats(stats: Dict[str, Any]) -> str:
+    return "\n".join([
+        f"Keys:        {stats['keys_in']} -> {stats['keys_out']} "
+        f"({stats['merged_keys']} case variants merged, {stats['unreachable_keys']} unreachable dropped, "
+        f"{stats['aliases']} aliases)",
+        f"Expansions:  {stats['expansions_in']} -> {stats['expansions_out']} "
+        f"({stats['duplicate_expansions']} duplicates, {stats['empty_expansions']} empty)",
+        f"Bytes:       {stats['bytes_in']} -> {stats['bytes_out']} ({stats['bytes_saved']} saved)",
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the acronym dictionary (expansion dedup, optional key folding)")
+    parser.add_argument("input", help="acronyms_list_cleaned.json")
+    parser.add_argument("--out", help=f"Compiled output (default: <input>{COMPILED_SUFFIX})")
+    parser.add_argument("--stats", help="Also write the stats report as JSON")
+    parser.add_argument("--fold-case", action="store_true",
+                        help="Merge case-variant keys (every spelling then returns the merged expansions)")
+    args = parser.parse_args()
+
+    compiled, stats = compile_dictionary(read_json(args.input), fold_case=args.fold_case)
+    out = args.out or str(compiled_path_for(args.input))
+    write_json(out, to_json(compiled))
+    if args.stats:
+        write_json(args.stats, stats, pretty=True)
+    print(format_stats(stats))
+    print(f"✅ Compiled dictionary saved to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# app/services/dictionary_manager.py
+"""
+Hot-reloadable acronym dictionary.
+Watches ACRONYM_FILE (or reloads on an admin call), compiles the new version off the event loop and swaps it in atomically.
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+from app.services.dictionary import COMPILED_SUFFIX, CompiledDictionary, compiled_path_for, load_dictionary
+from app.services.engine import get_engine
+from app.services.metrics import DICTIONARY_RELOADS
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+ACRONYM_FILE = os.getenv("ACRONYM_FILE", str(APP_ROOT / "data" / "acronyms_list_cleaned.json"))
+# How often the watcher checks the file's mtime; 0 disables watching (admin reloads still work)
+DICTIONARY_POLL_SECONDS = float(os.getenv("DICTIONARY_POLL_SECONDS", "30"))
+
+
+def _mtime(path: str) -> Tuple[Optional[float], ...]:
+    """Modification times of the source and, for a raw dictionary, its compiled sibling."""
+    paths = [path] if path.endswith(COMPILED_SUFFIX) else [path, str(compiled_path_for(path))]
+    mtimes = []
+    for candidate in paths:
+        try:
+            mtimes.append(os.stat(candidate).st_mtime)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def changed_acronyms(old: CompiledDictionary, new: CompiledDictionary) -> Set[str]:
+    """
+    Casefolded acronyms whose lookup result differs between two versions.
+
+    Covers added, removed and edited entries, and aliases that were added,
+    removed or re-pointed.
+    """
+    changed = {
+        key.casefold() for key in old.acronyms.keys() | new.acronyms.keys()
+        if old.acronyms.get(key) != new.acronyms.get(key)
+    }
+    changed |= {
+        alias.casefold() for alias in old.aliases.keys() | new.aliases.keys()
+        if old.aliases.get(alias) != new.aliases.get(alias)
+    }
+    return changed
+
+
+class DictionaryManager:
+    """
+    Holds the current compiled dictionary.
+
+    Readers take `current` once per request; a reload builds the new version
+    on a worker thread and replaces the reference in one assignment, so a
+    request never sees a half-built dictionary and is never blocked by a
+    reload.
+    """
+
+    def __init__(self, path: str = ACRONYM_FILE):
+        self.path = path
+        self.current = load_dictionary(path)
+        self.version = 1
+        self.loaded_at = time.time()
+        self._mtime = _mtime(path)
+        self._lock = asyncio.Lock()
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def reload(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Rebuild the dictionary if the file changed (or always, with force).
+
+        Response-cache entries of changed acronyms are invalidated; the rest of
+        the cache stays warm.
+
+        Args:
+            force: Reload even if the file's mtime is unchanged
+
+        Returns:
+            Dict with reloaded, version, changed_acronyms and invalidated_cache_entries
+        """
+        async with self._lock:
+            mtime = _mtime(self.path)
+            if not force and mtime == self._mtime:
+                return {"reloaded": False, "version": self.version, "changed_acronyms": 0, "invalidated_cache_entries": 0}
+
+            try:
+                new = await asyncio.to_thread(load_dictionary, self.path)
+            except Exception:
+                DICTIONARY_RELOADS.labels("error").inc()
+                raise
+            changed = await asyncio.to_thread(changed_acronyms, self.current, new)
+
+            self.current = new
+            self.version += 1
+            self.loaded_at = time.time()
+            self._mtime = mtime
+
+            invalidated = get_engine().cache.invalidate_tags(changed)
+            DICTIONARY_RELOADS.labels("reloaded").inc()
+            return {
+                "reloaded": True,
+                "version": self.version,
+                "changed_acronyms": len(changed),
+                "invalidated_cache_entries": invalidated,
+            }
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload()
+            except Exception:
+                # Keep serving the previous version; the error is counted in DICTIONARY_RELOADS
+                pass
+
+    def start_watching(self, interval: float = DICTIONARY_POLL_SECONDS) -> Optional[asyncio.Task]:
+        """Start the mtime watcher on the running loop (no-op if interval is 0)."""
+        if interval <= 0:
+            return None
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch(interval))
+        return self._watcher
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "acronyms": len(self.current.acronyms),
+            "aliases": len(self.current.aliases),
+            "watching": self._watcher is not None and not self._watcher.done(),
+        }
+
+
+_manager: Optional[DictionaryManager] = None
+
+
+def get_dictionary_manager() -> DictionaryManager:
+    """Process-wide manager; the first call loads ACRONYM_FILE."""
+    global _manager
+    if _manager is None:
+        _manager = DictionaryManager(ACRONYM_FILE)
+    return _manager
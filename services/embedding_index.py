@@ -0,0 +1,301 @@
+# app/services/embedding_index.py
+"""
+Embedding index over dictionary expansions for context disambiguation.
+Expansion vectors are built offline, memory-mapped at query time, and candidates are ranked by cosine similarity to the query context.
+
+Build:
+    python -m app.services.embedding_index --dictionary data/acronyms_list_cleaned.json \
+        --out data/expansion_index --model all-MiniLM-L6-v2
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sklearn.utils import murmurhash3_32
+from app.services.candidate_index import parse_prompt
+from app.services.dictionary import load_dictionary
+from app.services.json_io import dumps, read_json, write_json
+from app.services.text_tokens import STOPWORDS, words
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+EMBEDDING_INDEX_DIR = os.getenv("EMBEDDING_INDEX_DIR", str(APP_ROOT / "data" / "expansion_index"))
+# sentence-transformers model name, or "hashing" for the dependency-free fallback
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+# Acronyms written in lowercase are only resolved when their best expansion is at least this similar
+MIN_SIMILARITY = float(os.getenv("EMBEDDING_MIN_SIMILARITY", "0.3"))
+
+HASHING_DIM = 384
+
+Candidates = Dict[str, List[str]]
+Scored = Dict[str, List[Tuple[str, float]]]
+
+
+def _context(query: str, acronym: str) -> str:
+    """Query text without the acronym itself and filler words."""
+    acro = acronym.lower()
+    return " ".join(w for w in words(query) if w != acro and w not in STOPWORDS)
+
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of words and character trigrams, L2-normalized.
+
+    No model download and no extra dependency; captures lexical and sub-word
+    overlap only, so it is a fallback for hosts without sentence-transformers.
+    """
+
+    name = "hashing"
+    dim = HASHING_DIM
+
+    @staticmethod
+    @lru_cache(maxsize=1 << 16)
+    def _features(word: str) -> Tuple[Tuple[int, float], ...]:
+        padded = f" {word} "
+        tokens = [(f"w:{word}", 1.0)] + [(f"c:{padded[i:i + 3]}", 0.5) for i in range(len(padded) - 2)]
+        features = []
+        for token, weight in tokens:
+            h = murmurhash3_32(token, seed=0)
+            features.append((h % HASHING_DIM, weight if h >= 0 else -weight))
+        return tuple(features)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in words(text):
+                for column, weight in self._features(word):
+                    vectors[row, column] += weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder:
+    """Small local transformer (e.g. all-MiniLM-L6-v2) via sentence-transformers."""
+
+    def __init__(self, name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = name
+        self._model = SentenceTransformer(name, device="cpu")
+        self.dim = self._model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        return self._model.encode(list(texts), batch_size=256, normalize_embeddings=True,
+                                  convert_to_numpy=True).astype(np.float32)
+
+
+def get_embedder(name: str = EMBEDDING_MODEL):
+    """
+    Create the embedder for a model name.
+
+    Args:
+        name: "hashing" or a sentence-transformers model name
+
+    Returns:
+        Object with name, dim and encode(texts) -> L2-normalized float32 matrix
+    """
+    if name == HashingEmbedder.name:
+        return HashingEmbedder()
+    try:
+        return SentenceTransformerEmbedder(name)
+    except ImportError as e:
+        raise RuntimeError(f"sentence-transformers is not installed ({e}); use the 'hashing' embedder") from e
+
+
+class ExpansionIndex:
+    """
+    Flat cosine index: one normalized row per distinct (lowercased) expansion.
+
+    Files in the index directory:
+        vectors.npy      float32 matrix, memory-mapped on load (shared by worker processes)
+        expansions.json  row order of the expansions
+        meta.json        embedder name, dimension and row count
+    """
+
+    def __init__(self, vectors: np.ndarray, expansions: List[str], embedder):
+        self.vectors = vectors
+        self.expansions = expansions
+        self.embedder = embedder
+        self.rows = {expansion: row for row, expansion in enumerate(expansions)}
+
+    @classmethod
+    def build(cls, dictionary: Candidates, out_dir: str, embedder, batch_size: int = 4096) -> "ExpansionIndex":
+        """
+        Embed every distinct expansion of the dictionary and write the index.
+
+        Args:
+            dictionary: Acronym to expansions
+            out_dir: Destination directory
+            embedder: Embedder from get_embedder
+            batch_size: Expansions encoded per call
+
+        Returns:
+            The loaded (memory-mapped) index
+        """
+        expansions = sorted({e.strip().lower() for values in dictionary.values() for e in values if e.strip()})
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+
+        vectors = np.lib.format.open_memmap(out / "vectors.npy", mode="w+", dtype=np.float32,
+                                            shape=(len(expansions), embedder.dim))
+        for start in range(0, len(expansions), batch_size):
+            vectors[start:start + batch_size] = embedder.encode(expansions[start:start + batch_size])
+        vectors.flush()
+        del vectors
+
+        write_json(out / "expansions.json", expansions)
+        write_json(out / "meta.json", {"model": embedder.name, "dim": embedder.dim, "count": len(expansions)}, pretty=True)
+        return cls.load(out_dir, embedder)
+
+    @classmethod
+    def load(cls, index_dir: str = EMBEDDING_INDEX_DIR, embedder=None) -> "ExpansionIndex":
+        """Memory-map an index; the embedder defaults to the one it was built with."""
+        path = Path(index_dir)
+        meta = read_json(path / "meta.json")
+        if embedder is None:
+            embedder = get_embedder(meta["model"])
+        elif embedder.name != meta["model"]:
+            raise ValueError(f"index was built with '{meta['model']}', not '{embedder.name}'")
+        vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        return cls(vectors, read_json(path / "expansions.json"), embedder)
+
+    def _candidate_vectors(self, expansions: List[str]) -> np.ndarray:
+        """Gather rows for the candidates, embedding any that are not in the index."""
+        keys = [e.strip().lower() for e in expansions]
+        missing = [key for key in keys if key not in self.rows]
+        if not missing:
+            return self.vectors[[self.rows[key] for key in keys]]
+        extra = dict(zip(missing, self.embedder.encode(missing)))
+        return np.stack([
+            self.vectors[self.rows[key]] if key in self.rows else extra[key]
+            for key in keys
+        ])
+
+    def score_batch(self, items: Sequence[Tuple[str, Candidates]]) -> List[Scored]:
+        """
+        Rank candidates by cosine similarity to their query context, for many queries.
+
+        The context of each (query, acronym) pair is the query without the
+        acronym; all contexts are encoded in a single embedder call.
+
+        Args:
+            items: (query, candidates) pairs
+
+        Returns:
+            One acronym -> [(expansion, similarity)] dict per item, best first
+        """
+        pairs = [(i, acronym) for i, (_, candidates) in enumerate(items) for acronym in candidates]
+        contexts = [_context(items[i][0], acronym) for i, acronym in pairs]
+        context_vectors = self.embedder.encode(contexts) if contexts else np.zeros((0, 0), dtype=np.float32)
+
+        results: List[Scored] = [{} for _ in items]
+        for (i, acronym), context, vector in zip(pairs, contexts, context_vectors):
+            expansions = items[i][1][acronym]
+            if not expansions:
+                results[i][acronym] = []
+                continue
+            similarities = self._candidate_vectors(expansions) @ vector if context else np.zeros(len(expansions))
+            order = np.argsort(-similarities, kind="stable")
+            results[i][acronym] = [(expansions[j], float(similarities[j])) for j in order]
+        return results
+
+    def score(self, query: str, candidates: Candidates) -> Scored:
+        """Rank one query's candidates; see score_batch."""
+        return self.score_batch([(query, candidates)])[0]
+
+    def search(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Nearest expansions in the whole index (exact flat scan).
+
+        Args:
+            text: Free text to match
+            k: Number of results
+
+        Returns:
+            (expansion, similarity) pairs, best first
+        """
+        similarities = self.vectors @ self.embedder.encode([text])[0]
+        k = min(k, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [(self.expansions[j], float(similarities[j])) for j in top]
+
+
+def prefilter(scored: Scored, top_k: int) -> Candidates:
+    """Keep the top_k most similar candidates per acronym (for a smaller LLM prompt)."""
+    return {acronym: [expansion for expansion, _ in pairs[:top_k]] for acronym, pairs in scored.items()}
+
+
+def resolve(scored: Scored, min_similarity: float = MIN_SIMILARITY) -> Dict[str, List[str]]:
+    """
+    Standalone answer: the most similar expansion per acronym.
+
+    Uppercase acronyms are always resolved; lowercase dictionary words
+    ("team", "who") only when the best match clears min_similarity.
+
+    Args:
+        scored: Output of ExpansionIndex.score
+        min_similarity: Threshold for lowercase acronyms
+
+    Returns:
+        Answer in the model output format
+    """
+    answer = {}
+    for acronym, pairs in scored.items():
+        if pairs and (acronym.isupper() or pairs[0][1] >= min_similarity):
+            answer[acronym] = [pairs[0][0]]
+    return answer
+
+
+_index: Optional[ExpansionIndex] = None
+
+
+def get_index() -> ExpansionIndex:
+    """Process-wide index loaded from EMBEDDING_INDEX_DIR."""
+    global _index
+    if _index is None:
+        _index = ExpansionIndex.load(EMBEDDING_INDEX_DIR)
+    return _index
+
+
+async def call_embedding(user_query: str) -> str:
+    """
+    Model-client shaped entry point for the service layer.
+
+    Encoding runs on a worker thread, since a transformer embedder takes milliseconds.
+
+    Args:
+        user_query: Formatted query with candidate acronyms
+
+    Returns:
+        Answer as a JSON string or error message
+    """
+    try:
+        query, candidates = parse_prompt(user_query)
+        index = get_index()
+        scored = await asyncio.to_thread(index.score, query, candidates)
+        return dumps(resolve(scored)).decode()
+    except Exception as e:
+        return f"[Error - Embedding]: {e}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the expansion embedding index")
+    parser.add_argument("--dictionary", default=str(APP_ROOT / "data" / "acronyms_list_cleaned.json"),
+                        help="Raw or compiled dictionary")
+    parser.add_argument("--out", default=EMBEDDING_INDEX_DIR)
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="sentence-transformers model name or 'hashing'")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = ExpansionIndex.build(load_dictionary(args.dictionary).acronyms, args.out, get_embedder(args.model))
+    print(f"✅ Indexed {len(index.expansions)} expansions with '{index.embedder.name}' "
+          f"({index.embedder.dim} dims) in {time.perf_counter() - started:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+# app/services/engine.py
+"""
+Inference engine shared by the FastAPI service and the standalone Streamlit UI.
+Owns the pooled model clients, the response cache, per-backend concurrency limits and the sampled dataset.
+"""
+
+import asyncio
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple
+import httpx
+from app.models.openai_client import create_openai_client
+from app.models.prompt import SYSTEM_PROMPT_TOKENS, estimate_tokens
+from app.models.registry import get_registry
+from app.services.candidate_index import format_api_prompt, load_golden_json, load_golden_records, parse_prompt
+from app.services.executor import get_executor
+from app.services.metrics import IN_FLIGHT_MODEL_CALLS, MODEL_LATENCY, RESPONSE_CACHE, RESULT_STORE_LOOKUPS, time_stage
+from app.services.model_dispatch import MODEL_BACKENDS, MODEL_CALLS, ModelClients, parse_model_output
+from app.services.pruning import prune_candidates, pruning_enabled
+from app.services.result_store import ResultKey, get_result_store, model_version, prompt_version, record_hash
+from app.services.routing import route_query
+from app.services.scheduler import PriorityLimiter
+from app.services.usage import usage_tracker
+from app.services.tracing import (
+    ATTR_CACHE_STATUS,
+    ATTR_MODEL,
+    ATTR_PROMPT_TOKENS,
+    ATTR_RESPONSE_SIZE,
+    tracer,
+)
+
+DATA_FILE = os.getenv("GOLDEN_DATA_FILE", "/Users/rishabh.singh/Desktop/ai-search-retrieval-pipeline-poc-2/app/golden_data_20k.json")
+# Built with `python -m app.services.candidate_index`; falls back to parsing DATA_FILE once at load
+INDEX_FILE = os.getenv("CANDIDATE_INDEX_FILE", os.path.splitext(DATA_FILE)[0] + ".parquet")
+
+# Per-backend in-flight limits; vLLM backends use max_concurrency from models/registry.json,
+# sized to the servers' --max-num-seqs (see instruction.txt)
+DEFAULT_CONCURRENCY = {
+    **{name: backend.max_concurrency for name, backend in get_registry().backends.items()},
+    "openai": 20,
+    "cpu": 64,
+}
+DEFAULT_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "4096"))
+HTTP_TIMEOUT = 30.0
+# Version of the prompts built by format_api_prompt, for result store keys
+API_PROMPT_VERSION = prompt_version("api")
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60.0)
+
+PROMPT_QUERY_PATTERN = re.compile(r'^query: "(.*?)", candidate acronyms: ', re.DOTALL)
+WORD_PATTERN = re.compile(r"[A-Za-z]+")
+
+
+def prompt_tags(user_query: str) -> FrozenSet[str]:
+    """
+    Cache tags of a prompt: the casefolded words of its query.
+
+    Candidates are looked up per query word, so a dictionary change to an
+    acronym can only affect prompts whose query contains that word.
+    """
+    match = PROMPT_QUERY_PATTERN.match(user_query)
+    if not match:
+        return frozenset()
+    return frozenset(word.casefold() for word in WORD_PATTERN.findall(match.group(1)))
+
+
+class ResponseCache:
+    """LRU cache of parsed model outputs keyed by (model, prompt), with optional tags for selective invalidation."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._tags: Dict[Hashable, FrozenSet[str]] = {}
+        self._keys_by_tag: Dict[str, Set[Hashable]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: Hashable, value: Any, tags: Iterable[str] = ()) -> None:
+        if self.max_size <= 0:
+            return
+        self._untag(key)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        tags = frozenset(tags)
+        if tags:
+            self._tags[key] = tags
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self._untag(evicted)
+
+    def _untag(self, key: Hashable) -> None:
+        for tag in self._tags.pop(key, ()):
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Drop every entry carrying any of the tags.
+
+        Args:
+            tags: Tags to invalidate (e.g. casefolded acronyms)
+
+        Returns:
+            Number of entries removed
+        """
+        keys = set()
+        for tag in tags:
+            keys |= self._keys_by_tag.get(tag, set())
+        for key in keys:
+            self._untag(key)
+            self._entries.pop(key, None)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._keys_by_tag.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def format_sampled_prompt(item: Dict[str, Any]) -> str:
+    """
+    Build the model prompt for a golden dataset record.
+
+    Args:
+        item: Record with "Query" and preformatted "Candidate_Acronyms",
+            optionally carrying a prebuilt "prompt" from the candidate index
+
+    Returns:
+        Formatted prompt string
+    """
+    if item.get("prompt"):
+        return item["prompt"]
+    query = item.get("Query", "")
+    candidate_acronyms = item.get("Candidate_Acronyms", "")
+    return f'query: "{query}", candidate acronyms: "{candidate_acronyms}"'
+
+
+def build_sample_prompt(item: Dict[str, Any]) -> Tuple[Dict[str, List[str]], str]:
+    """
+    Candidates and prompt of a golden record, pruned when pruning is enabled.
+
+    Args:
+        item: Golden record (see format_sampled_prompt) with parsed "candidates"
+
+    Returns:
+        Tuple of (candidates sent to the model, formatted prompt)
+    """
+    query, candidates = item.get("Query", ""), item.get("candidates", {})
+    if pruning_enabled() and candidates:
+        # The prebuilt prompt carries every candidate; rebuild it from the pruned set
+        candidates = prune_candidates(query, candidates)
+        return candidates, format_api_prompt(query, candidates)
+    return candidates, format_sampled_prompt(item)
+
+
+class InferenceEngine:
+    """
+    Pooled, cached and rate-limited access to every configured model.
+
+    Clients are created lazily on the event loop that first uses them, so one
+    instance must stay on one loop (the FastAPI loop, or the Streamlit
+    background loop).
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[Dict[str, int]] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        data_file: str = DATA_FILE,
+        index_file: str = INDEX_FILE,
+    ):
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.cache = ResponseCache(cache_size)
+        self.data_file = data_file
+        self.index_file = index_file
+        # Interactive calls are served ahead of bulk ones (see services/scheduler.py)
+        self._limits = {backend: PriorityLimiter(limit) for backend, limit in self.concurrency.items()}
+        self._clients: Optional[ModelClients] = None
+        self._dataset: Optional[List[Dict[str, Any]]] = None
+        # Persistent answers shared with the eval runners (services/result_store.py); None when disabled
+        self.result_store = get_result_store()
+
+    @property
+    def clients(self) -> ModelClients:
+        if self._clients is None:
+            http = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=HTTP_LIMITS)
+            self._clients = ModelClients(http=http, openai=create_openai_client(http_client=http))
+        return self._clients
+
+    @property
+    def dataset(self) -> List[Dict[str, Any]]:
+        if self._dataset is None:
+            if os.path.exists(self.index_file):
+                self._dataset = load_golden_records(self.index_file)
+            else:
+                self._dataset = load_golden_json(self.data_file)
+        return self._dataset
+
+    def sample_queries(self, n: int) -> List[Dict[str, Any]]:
+        """
+        Sample random records from the golden dataset.
+
+        Args:
+            n: Number of records to sample
+
+        Returns:
+            List of up to n records
+        """
+        return random.sample(self.dataset, min(n, len(self.dataset)))
+
+    def sample_indices(self, n: int) -> List[int]:
+        """Positions of n random records, for callers that must re-read the same sample later."""
+        return random.sample(range(len(self.dataset)), min(n, len(self.dataset)))
+
+    def _store_lookup(self, model_name: str, user_query: str) -> Optional[Tuple[ResultKey, str, Dict[str, List[str]]]]:
+        """Result store key of a remote model call, or None if the store is off or the prompt is not an API prompt."""
+        if self.result_store is None or MODEL_BACKENDS[model_name] == "cpu":
+            return None
+        try:
+            query, candidates = parse_prompt(user_query)
+        except ValueError:
+            return None
+        key = ResultKey(record_hash(query, candidates), model_name, *model_version(model_name),
+                        API_PROMPT_VERSION)
+        return key, query, candidates
+
+    async def call_model(self, model_name: str, user_query: str) -> Any:
+        """
+        Call one model through the cache, the result store and its backend's concurrency limit.
+
+        Args:
+            model_name: One of the keys in MODEL_CALLS
+            user_query: Formatted query with candidate acronyms
+
+        Returns:
+            Parsed model output or error/raw string
+        """
+        cache_key = (model_name, user_query)
+        with tracer.start_as_current_span("model.call") as span:
+            span.set_attribute(ATTR_MODEL, model_name)
+            span.set_attribute(ATTR_PROMPT_TOKENS, SYSTEM_PROMPT_TOKENS + estimate_tokens(user_query))
+
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                RESPONSE_CACHE.labels(model_name, "hit").inc()
+                span.set_attribute(ATTR_CACHE_STATUS, "hit")
+                return cached
+            RESPONSE_CACHE.labels(model_name, "miss").inc()
+            span.set_attribute(ATTR_CACHE_STATUS, "miss")
+
+            stored = self._store_lookup(model_name, user_query)
+            if stored is not None:
+                store_key, query, candidates = stored
+                raw_response = await asyncio.to_thread(self.result_store.get, store_key)
+                RESULT_STORE_LOOKUPS.labels(model_name, "miss" if raw_response is None else "hit").inc()
+                if raw_response is not None:
+                    span.set_attribute(ATTR_CACHE_STATUS, "stored")
+                    parsed = parse_model_output(model_name, raw_response)
+                    if isinstance(parsed, dict):
+                        self.cache.put(cache_key, parsed, prompt_tags(user_query))
+                    return parsed
+
+            async with self._limits[MODEL_BACKENDS[model_name]].slot():
+                usage: Dict[str, Any] = {}
+                started = time.perf_counter()
+                with IN_FLIGHT_MODEL_CALLS.labels(model_name).track_inprogress(), MODEL_LATENCY.labels(model_name).time():
+                    raw_response = await MODEL_CALLS[model_name](user_query, self.clients, usage)
+                # Local (CPU) models spend no tokens
+                if MODEL_BACKENDS[model_name] != "cpu":
+                    usage_tracker.record_call(model_name, user_query, raw_response, usage, time.perf_counter() - started)
+
+            span.set_attribute(ATTR_RESPONSE_SIZE, len(raw_response or ""))
+            parsed = parse_model_output(model_name, raw_response)
+            # Only well-formed answers are cached and stored; errors and unparsable text are retried
+            if isinstance(parsed, dict):
+                self.cache.put(cache_key, parsed, prompt_tags(user_query))
+                if stored is not None:
+                    await asyncio.to_thread(self.result_store.put, store_key, raw_response, query, candidates)
+            return parsed
+
+    async def run_models(self, user_query: str, model_names: List[str]) -> Dict[str, Any]:
+        """
+        Call several models concurrently on the same prompt.
+
+        Args:
+            user_query: Formatted query with candidate acronyms
+            model_names: Result keys of the models to call
+
+        Returns:
+            Dict of model name to parsed output, in the order given
+        """
+        responses = await asyncio.gather(*(self.call_model(name, user_query) for name in model_names))
+        return dict(zip(model_names, responses))
+
+    async def route(self, user_query: str, candidates: Dict[str, List[str]],
+                    chain: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Answer with the cheapest model whose output validates (see services/routing.py).
+
+        Args:
+            user_query: Formatted query with candidate acronyms
+            candidates: Acronym to candidate expansions in the prompt
+            chain: Model result keys in escalation order
+
+        Returns:
+            Dict with model, output, confidence and attempts
+        """
+        with tracer.start_as_current_span("route") as span:
+            routed = await route_query(self, user_query, candidates, chain)
+            span.set_attribute(ATTR_MODEL, routed["model"] or "none")
+            span.set_attribute("routing.attempts", len(routed["attempts"]))
+            return routed
+
+    async def _run_sample(self, item: Dict[str, Any], prepared: Tuple[Dict[str, List[str]], str],
+                          model_names: List[str], routing_chain: Optional[List[str]] = None) -> Dict[str, Any]:
+        result = {
+            "query": item.get("Query", ""),
+            "candidate_acronyms": item.get("Candidate_Acronyms", ""),
+        }
+        result["candidates"], formatted_query = prepared
+
+        if routing_chain:
+            routed = await self.route(formatted_query, result["candidates"], routing_chain)
+            result["results"] = {routed["model"] or "unresolved": routed["output"]}
+            result["routing"] = {"confidence": routed["confidence"], "attempts": routed["attempts"]}
+        else:
+            result["results"] = await self.run_models(formatted_query, model_names)
+        return result
+
+    async def run_batch(self, samples: List[Dict[str, Any]], model_names: List[str],
+                        routing_chain: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Run records through the selected models.
+
+        Samples are processed concurrently; backend limits bound the fan-out.
+        With a routing_chain, each sample gets one routed answer instead.
+
+        Args:
+            samples: Golden records (see build_sample_prompt)
+            model_names: Result keys of the models to call
+            routing_chain: Models in escalation order; enables routing mode
+
+        Returns:
+            One result dict per sample, in order
+        """
+        with tracer.start_as_current_span("build_sampled_prompt"), time_stage("prompt_build"):
+            if pruning_enabled():
+                # Pruning scores every candidate; large batches are moved off the loop
+                prepared = await get_executor().sample_prompts(samples)
+            else:
+                prepared = [build_sample_prompt(item) for item in samples]
+
+        return list(await asyncio.gather(*(
+            self._run_sample(item, item_prepared, model_names, routing_chain)
+            for item, item_prepared in zip(samples, prepared)
+        )))
+
+    async def generate_random(self, n: int, model_names: List[str],
+                              routing_chain: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Sample n records and run them through the selected models (see run_batch).
+
+        Args:
+            n: Number of records to sample
+            model_names: Result keys of the models to call
+            routing_chain: Models in escalation order; enables routing mode
+
+        Returns:
+            Dict with total_samples count and data list of results
+        """
+        with tracer.start_as_current_span("sample_queries"), time_stage("sampling"):
+            samples = self.sample_queries(n)
+        all_results = await self.run_batch(samples, model_names, routing_chain)
+        return {"total_samples": len(all_results), "data": all_results}
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._clients is not None:
+            await self._clients.http.aclose()
+            self._clients = None
+
+
+_engine: Optional[InferenceEngine] = None
+
+
+def get_engine() -> InferenceEngine:
+    """Process-wide engine used by the FastAPI service."""
+    global _engine
+    if _engine is None:
+        _engine = InferenceEngine()
+    return _engine
@@ -0,0 +1,230 @@
+# app/services/executor.py
+"""
+CPU offload for large batches.
+Extraction and sample prompt building of large batches run in a process pool whose workers preload the acronym dictionary; small batches stay on the event loop.
+
+Event-loop lag benchmark:
+    python -m app.benchmarks.loop_lag --batch 5000
+"""
+
+import asyncio
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from app.services.dictionary import CompiledDictionary, load_dictionary
+from app.services.metrics import CPU_OFFLOAD_ITEMS
+
+# "process" (default), "thread" (asyncio.to_thread; still holds the GIL) or "inline" (never offload)
+CPU_EXECUTOR = os.getenv("CPU_EXECUTOR", "process")
+CPU_EXECUTOR_WORKERS = int(os.getenv("CPU_EXECUTOR_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Smaller batches run inline: below ~1000 texts extraction blocks the loop for a few ms,
+# less than a pool round trip costs (see the loop_lag benchmark)
+CPU_OFFLOAD_MIN_ITEMS = int(os.getenv("CPU_OFFLOAD_MIN_ITEMS", "1000"))
+CPU_OFFLOAD_CHUNK_SIZE = int(os.getenv("CPU_OFFLOAD_CHUNK_SIZE", "2000"))
+# forkserver/spawn: forking the running server would copy its event loop and threads
+CPU_EXECUTOR_START_METHOD = os.getenv("CPU_EXECUTOR_START_METHOD", "forkserver")
+
+# Set in pool workers by _init_worker; in the server process tasks use the hot-reloaded dictionary
+_worker_dictionary: Optional[CompiledDictionary] = None
+
+
+def _init_worker(dictionary_path: str, prior: Optional[Counter] = None) -> None:
+    global _worker_dictionary
+    _worker_dictionary = load_dictionary(dictionary_path)
+    if prior is not None:
+        # The server's copy, so workers never load the golden dataset for pruning
+        from app.services.pruning import set_expansion_prior
+
+        set_expansion_prior(prior)
+
+
+def _worker_prior() -> Optional[Counter]:
+    """Golden-set prior the workers' lexical pruning needs, or None if pruning does not use it."""
+    from app.services.pruning import PRUNE_SCORER, PRUNE_USE_PRIOR, expansion_prior, pruning_enabled
+
+    if pruning_enabled() and PRUNE_USE_PRIOR and PRUNE_SCORER == "lexical":
+        return expansion_prior()
+    return None
+
+
+def _dictionary() -> CompiledDictionary:
+    if _worker_dictionary is not None:
+        return _worker_dictionary
+    from app.services.dictionary_manager import get_dictionary_manager
+
+    return get_dictionary_manager().current
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def extract_task(texts: Sequence[str], include_candidates: bool = True) -> Dict[str, Any]:
+    from app.services.bulk_extract import extract_batch
+
+    return extract_batch(texts, include_candidates, dictionary=_dictionary())
+
+
+def sample_prompts_task(items: Sequence[Dict[str, Any]]) -> List[Any]:
+    from app.services.engine import build_sample_prompt
+
+    return [build_sample_prompt(item) for item in items]
+
+
+# Picklable task functions by name; each takes a chunk of items and returns its results
+TASKS: Dict[str, Callable[..., Any]] = {
+    "extract": extract_task,
+    "sample_prompts": sample_prompts_task,
+}
+
+
+def merge_extract(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine extract_task results of consecutive chunks into one response."""
+    merged: Dict[str, Any] = {"count": 0, "matches": []}
+    candidates: Dict[str, List[str]] = {}
+    for part in parts:
+        merged["count"] += part["count"]
+        merged["matches"].extend(part["matches"])
+        candidates.update(part.get("candidates", {}))
+    if parts and "candidates" in parts[0]:
+        merged["candidates"] = {acronym: candidates[acronym] for acronym in sorted(candidates)}
+    return merged
+
+
+def merge_lists(parts: List[List[Any]]) -> List[Any]:
+    return [item for part in parts for item in part]
+
+
+class CpuExecutor:
+    """
+    Runs CPU-bound batch tasks inline, on a thread or in a process pool.
+
+    The decision is per call: batches below min_items run inline, since a
+    pool round trip (pickling the chunk and the result) costs more than the
+    few milliseconds they block the loop. Larger batches are split into
+    chunks and spread over the pool. The pool is rebuilt after a dictionary
+    reload, so workers never serve a stale version.
+    """
+
+    def __init__(
+        self,
+        mode: str = CPU_EXECUTOR,
+        workers: int = CPU_EXECUTOR_WORKERS,
+        min_items: int = CPU_OFFLOAD_MIN_ITEMS,
+        chunk_size: int = CPU_OFFLOAD_CHUNK_SIZE,
+        start_method: str = CPU_EXECUTOR_START_METHOD,
+    ):
+        if mode not in ("process", "thread", "inline"):
+            raise ValueError(f"Unknown CPU executor '{mode}' (expected 'process', 'thread' or 'inline')")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.min_items = min_items
+        self.chunk_size = max(1, chunk_size)
+        self.start_method = start_method
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_version: Optional[int] = None
+
+    def should_offload(self, n_items: int) -> bool:
+        return self.mode != "inline" and n_items >= self.min_items
+
+    def _pool_current(self) -> bool:
+        from app.services.dictionary_manager import get_dictionary_manager
+
+        return self._pool is not None and self._pool_version == get_dictionary_manager().version
+
+    async def _get_pool(self) -> ProcessPoolExecutor:
+        from app.services.dictionary_manager import get_dictionary_manager
+
+        if self._pool_current():
+            return self._pool
+        # Built once in the server (off the loop) and handed to every worker
+        prior = await asyncio.to_thread(_worker_prior)
+        manager = get_dictionary_manager()
+        if self._pool_current():
+            return self._pool
+        if self._pool is not None:
+            # In-flight chunks finish on the old workers, which then exit
+            self._pool.shutdown(wait=False)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(manager.path, prior),
+        )
+        self._pool_version = manager.version
+        return self._pool
+
+    def _chunks(self, items: Sequence[Any]) -> List[Sequence[Any]]:
+        # At least one chunk per worker, at most chunk_size items each
+        size = min(self.chunk_size, -(-len(items) // self.workers))
+        return [items[start:start + size] for start in range(0, len(items), size)]
+
+    async def run(self, task: str, items: Sequence[Any], *args: Any) -> List[Any]:
+        """
+        Run a task over a batch.
+
+        Args:
+            task: Name in TASKS
+            items: Batch to process
+            *args: Extra (picklable) arguments passed to every chunk
+
+        Returns:
+            One task result per chunk, in order (a single result when run inline)
+        """
+        fn = TASKS[task]
+        if not self.should_offload(len(items)):
+            CPU_OFFLOAD_ITEMS.labels(task, "inline").inc(len(items))
+            return [fn(items, *args)]
+        CPU_OFFLOAD_ITEMS.labels(task, self.mode).inc(len(items))
+        if self.mode == "thread":
+            return [await asyncio.to_thread(fn, items, *args)]
+
+        loop = asyncio.get_running_loop()
+        pool = await self._get_pool()
+        return list(await asyncio.gather(*(
+            loop.run_in_executor(pool, fn, chunk, *args) for chunk in self._chunks(list(items))
+        )))
+
+    async def extract(self, texts: Sequence[str], include_candidates: bool = True) -> Dict[str, Any]:
+        """Bulk extraction (see services/bulk_extract.py)."""
+        return merge_extract(await self.run("extract", texts, include_candidates))
+
+    async def sample_prompts(self, items: Sequence[Dict[str, Any]]) -> List[Any]:
+        """(candidates, prompt) per golden record, pruned when pruning is enabled."""
+        return merge_lists(await self.run("sample_prompts", items))
+
+    async def start(self) -> None:
+        """Spawn the pool workers now instead of on the first large batch."""
+        if self.mode != "process":
+            return
+        loop = asyncio.get_running_loop()
+        pool = await self._get_pool()
+        await asyncio.gather(*(loop.run_in_executor(pool, _ping) for _ in range(self.workers)))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "min_items": self.min_items,
+            "chunk_size": self.chunk_size,
+            "pool_started": self._pool is not None,
+            "dictionary_version": self._pool_version,
+        }
+
+
+_executor: Optional[CpuExecutor] = None
+
+
+def get_executor() -> CpuExecutor:
+    """Process-wide executor configured from the CPU_EXECUTOR* variables."""
+    global _executor
+    if _executor is None:
+        _executor = CpuExecutor()
+    return _executor
@@ -0,0 +1,170 @@
+# app/services/health.py
+"""
+Startup warm-up and backend health probes.
+Primes pooled connections and the vLLM prefix cache for SYSTEM_PROMPT, and tracks per-model availability.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from app.services.engine import InferenceEngine, get_engine
+from app.services.metrics import BACKEND_PROBE_LATENCY, BACKEND_UP, ERROR_PATTERN
+from app.services.model_dispatch import MODEL_BACKENDS, MODEL_CALLS
+from app.services.pruning import load_expansion_prior
+from app.services.usage import usage_endpoint, usage_tracker
+
+# Models warmed on startup and required by /ready. openai_gpt is left out by
+# default: Azure has no prefix cache to prime and every probe is billed.
+WARMUP_MODELS = tuple(
+    name.strip() for name in os.getenv("WARMUP_MODELS", "qwen_base,qwen_lora,tinyllama_lora").split(",") if name.strip()
+)
+# Extra models /health/backends probes besides the warm-up models (opt-in, e.g. "openai_gpt"; billed per probe)
+HEALTH_EXTRA_MODELS = tuple(
+    name.strip() for name in os.getenv("HEALTH_EXTRA_MODELS", "").split(",") if name.strip()
+)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+PROBE_TIMEOUT = float(os.getenv("PROBE_TIMEOUT", "15"))
+# /health/backends reuses results younger than this instead of re-probing
+HEALTH_CACHE_SECONDS = 5.0
+
+# Tiny request: the full SYSTEM_PROMPT is still sent, which is the prefix vLLM caches
+PROBE_QUERY = 'query: "AI", candidate acronyms: "(AI: artificial intelligence)"'
+
+
+class BackendMonitor:
+    """Warm-up state and last probe result per model."""
+
+    def __init__(self, engine: Optional[InferenceEngine] = None, warmup_models: Sequence[str] = WARMUP_MODELS):
+        self._engine = engine
+        self.warmup_models = [name for name in warmup_models if name in MODEL_CALLS]
+        self.health_models = self.warmup_models + [
+            name for name in HEALTH_EXTRA_MODELS if name in MODEL_CALLS and name not in self.warmup_models
+        ]
+        self.statuses: Dict[str, Dict[str, Any]] = {}
+        self.warmup_started = False
+        self.warmup_finished = False
+        self._last_full_check = 0.0
+        # At most one probe round of each kind runs at a time; callers share it
+        self._full_check: Optional[asyncio.Task] = None
+        self._reprobe: Optional[asyncio.Task] = None
+
+    @property
+    def engine(self) -> InferenceEngine:
+        return self._engine or get_engine()
+
+    async def probe(self, model_name: str) -> Dict[str, Any]:
+        """
+        Send PROBE_QUERY to one model, bypassing the response cache.
+
+        Args:
+            model_name: One of the keys in MODEL_CALLS
+
+        Returns:
+            Status dict with backend, available, latency_ms, error and checked_at
+        """
+        usage: Dict[str, Any] = {}
+        started = time.perf_counter()
+        try:
+            raw_response = await asyncio.wait_for(
+                MODEL_CALLS[model_name](PROBE_QUERY, self.engine.clients, usage), PROBE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            raw_response = f"[Error - Timeout]: no response within {PROBE_TIMEOUT:.0f}s"
+        latency = time.perf_counter() - started
+
+        available = isinstance(raw_response, str) and not ERROR_PATTERN.match(raw_response)
+        with usage_endpoint("health"):
+            usage_tracker.record_call(model_name, PROBE_QUERY, raw_response, usage, latency)
+        BACKEND_UP.labels(model_name).set(1 if available else 0)
+        BACKEND_PROBE_LATENCY.labels(model_name).set(latency)
+
+        status = {
+            "backend": MODEL_BACKENDS[model_name],
+            "available": available,
+            "latency_ms": round(latency * 1000, 1),
+            "error": None if available else raw_response,
+            "checked_at": time.time(),
+        }
+        self.statuses[model_name] = status
+        return status
+
+    async def probe_many(self, model_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        statuses = await asyncio.gather(*(self.probe(name) for name in model_names))
+        return dict(zip(model_names, statuses))
+
+    async def warm_up(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Open pooled connections and prime the prefix cache of every warm-up model.
+
+        Models are probed concurrently, so each gets its own keep-alive connection.
+        The speculative ranking prior is built alongside, off the event loop.
+
+        Returns:
+            Status per warm-up model
+        """
+        self.warmup_started = True
+        try:
+            prior = load_expansion_prior()
+            statuses, _ = await asyncio.gather(self.probe_many(self.warmup_models), prior)
+            return statuses
+        finally:
+            self.warmup_finished = True
+
+    def start_warm_up(self) -> "asyncio.Task":
+        """Schedule warm_up on the running loop without waiting for it."""
+        self.warmup_started = True
+        return asyncio.create_task(self.warm_up())
+
+    async def _probe_health_models(self) -> None:
+        await self.probe_many(self.health_models)
+        self._last_full_check = time.monotonic()
+
+    async def check_backends(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Probe the warm-up models plus HEALTH_EXTRA_MODELS, reusing results from the
+        last HEALTH_CACHE_SECONDS. Concurrent callers await the same probe round.
+        """
+        if time.monotonic() - self._last_full_check > HEALTH_CACHE_SECONDS:
+            if self._full_check is None or self._full_check.done():
+                self._full_check = asyncio.create_task(self._probe_health_models())
+            await asyncio.shield(self._full_check)
+        return {name: self.statuses[name] for name in self.health_models if name in self.statuses}
+
+    async def readiness(self) -> Dict[str, Any]:
+        """
+        Ready once warm-up has finished and every warm-up model answered.
+
+        Always answers from the cached statuses. Models that failed are re-probed
+        in one background task, so the service becomes ready soon after a late
+        backend comes up without the probe holding up the request. Without
+        startup warm-up (WARMUP_ON_STARTUP=0) the first call starts it.
+
+        Returns:
+            Dict with ready flag, warm-up state and status per warm-up model
+        """
+        if not self.warmup_started:
+            self.start_warm_up()
+        elif self.warmup_finished and (self._reprobe is None or self._reprobe.done()):
+            failed = [name for name in self.warmup_models if not self.statuses.get(name, {}).get("available")]
+            if failed:
+                self._reprobe = asyncio.create_task(self.probe_many(failed))
+
+        statuses = {name: self.statuses.get(name) for name in self.warmup_models}
+        ready = self.warmup_finished and all(status and status["available"] for status in statuses.values())
+        return {
+            "ready": ready,
+            "warmup": "finished" if self.warmup_finished else ("running" if self.warmup_started else "pending"),
+            "backends": statuses,
+        }
+
+
+_monitor: Optional[BackendMonitor] = None
+
+
+def get_monitor() -> BackendMonitor:
+    """Process-wide monitor bound to the shared engine."""
+    global _monitor
+    if _monitor is None:
+        _monitor = BackendMonitor()
+    return _monitor
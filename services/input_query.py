@@ -4,17 +4,9 @@ Random query sampling service for model evaluation.
 Samples queries from dataset and dispatches to multiple AI models for comparison.
 """
 
-import json
-import random
-from typing import Dict, Any, List
-from app.models.vllm_client import call_vllm
-from app.models.openai_client import call_openai
-from app.models.tinyllama_client import call_tinyllama
-
-DATA_FILE = "/Users/rishabh.singh/Desktop/ai-search-retrieval-pipeline-poc-2/app/golden_data_20k.json"
-
-with open(DATA_FILE, "r") as f:
-    DATASET = json.load(f)
+from typing import Dict, Any, List, Optional, Tuple
+from app.services.engine import get_engine
+from app.services.routing import DEFAULT_CHAIN, order_chain
 
 def sample_queries(n: int) -> List[Dict[str, Any]]:
     """
@@ -26,14 +18,18 @@ def sample_queries(n: int) -> List[Dict[str, Any]]:
     Returns:
         List of n random query entries
     """
-    return random.sample(DATASET, min(n, len(DATASET)))
+    return get_engine().sample_queries(n)
 
 async def get_all_model_responses_random(
     n: int = 5,
     use_qwen_base: bool = True,
     use_qwen_lora: bool = True,
     use_openai_gpt: bool = True,
-    use_tiny_llama_lora: bool = False
+    use_tiny_llama_lora: bool = False,
+    use_ranker: bool = False,
+    use_embedding: bool = False,
+    use_routing: bool = False,
+    models: Optional[List[str]] = None
 ) -> Dict[str, Any]:
     """
     Sample n queries and process through selected AI models.
@@ -44,56 +40,49 @@ async def get_all_model_responses_random(
         use_qwen_lora: Enable Qwen LoRA model
         use_openai_gpt: Enable OpenAI GPT model
         use_tiny_llama_lora: Enable TinyLlama LoRA model
+        use_ranker: Enable the CPU learned ranker (services/ranker.py)
+        use_embedding: Enable the embedding-similarity resolver (services/embedding_index.py)
+        use_routing: Return one routed answer per query, trying the selected
+            models cheapest-first (see services/routing.py)
+        models: Registered model ids to call instead of the use_* flags
     
     Returns:
         Dict with total_samples count and data list of results
     """
-    samples = sample_queries(n)
-    all_results = []
-
-    for item in samples:
-        query = item.get("Query", "")
-        candidate_acronyms = item.get("Candidate_Acronyms", "")
-        formatted_query = f'query: "{query}", candidate acronyms: "{candidate_acronyms}"'
-
-        result_entry = {
-            "query": query,
-            "candidate_acronyms": candidate_acronyms,
-            "results": {}
-        }
-
-        # --- Qwen base ---
-        if use_qwen_base:
-            base_resp = await call_vllm(formatted_query, use_lora=False)
-            try:
-                result_entry["results"]["qwen_base"] = json.loads(base_resp)
-            except Exception:
-                result_entry["results"]["qwen_base"] = base_resp
-
-        # --- Qwen LoRA ---
-        if use_qwen_lora:
-            lora_resp = await call_vllm(formatted_query, use_lora=True)
-            try:
-                result_entry["results"]["qwen_lora"] = json.loads(lora_resp)
-            except Exception:
-                result_entry["results"]["qwen_lora"] = lora_resp
-
-        # --- OpenAI GPT ---
-        if use_openai_gpt:
-            openai_resp = await call_openai(formatted_query)
-            try:
-                result_entry["results"]["openai_gpt"] = json.loads(openai_resp)
-            except Exception:
-                result_entry["results"]["openai_gpt"] = openai_resp
-
-        # --- TinyLlama LoRA ---
-        if use_tiny_llama_lora:
-            tinyllama_resp = await call_tinyllama(formatted_query, use_lora=True)
-            try:
-                result_entry["results"]["tinyllama_lora"] = json.loads(tinyllama_resp)
-            except Exception:
-                result_entry["results"]["tinyllama_lora"] = tinyllama_resp
-
-        all_results.append(result_entry)
+    model_names, routing_chain = select_models(
+        use_qwen_base, use_qwen_lora, use_openai_gpt, use_tiny_llama_lora, use_ranker, use_embedding, use_routing,
+        models
+    )
+    return await get_engine().generate_random(n, model_names, routing_chain=routing_chain)
 
-    return {"total_samples": len(all_results), "data": all_results}
+def select_models(
+    use_qwen_base: bool = True,
+    use_qwen_lora: bool = True,
+    use_openai_gpt: bool = True,
+    use_tiny_llama_lora: bool = False,
+    use_ranker: bool = False,
+    use_embedding: bool = False,
+    use_routing: bool = False,
+    models: Optional[List[str]] = None
+) -> Tuple[List[str], Optional[List[str]]]:
+    """
+    Result keys of the selected models and, in routing mode, their escalation chain.
+    
+    An explicit models list (any registered id, e.g. a discovered adapter
+    "vllm:acronym-lora-v3") takes precedence over the use_* flags.
+    
+    Returns:
+        Tuple of (model names, routing chain or None)
+    """
+    selected = {
+        "qwen_base": use_qwen_base,
+        "qwen_lora": use_qwen_lora,
+        "openai_gpt": use_openai_gpt,
+        "tinyllama_lora": use_tiny_llama_lora,
+        "ranker": use_ranker,
+        "embedding": use_embedding
+    }
+    model_names = list(dict.fromkeys(models)) if models else [name for name, enabled in selected.items() if enabled]
+    if use_routing:
+        return model_names, order_chain(model_names) or list(DEFAULT_CHAIN)
+    return model_names, None
@@ -0,0 +1,364 @@
+# app/services/jobs.py
+"""
+Background inference jobs for long-running evaluation batches.
+A job samples its records up front, is processed in chunks by a worker pool, and persists progress and result rows to SQLite so it survives restarts.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from app.services.engine import get_engine
+from app.services.input_query import select_models
+from app.services.json_io import dumps, loads
+from app.services.metrics import JOB_SAMPLES
+from app.services.scheduler import BULK, CURRENT_PRIORITY, Overloaded
+from app.services.usage import usage_endpoint
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+JOBS_DB = os.getenv("JOBS_DB", str(APP_ROOT / "data" / "jobs.sqlite3"))
+# Jobs processed at the same time; each runs JOB_CHUNK_SIZE samples concurrently
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "32"))
+# Queued (not yet running) jobs accepted before submissions get 429
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "20"))
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = "queued", "running", "completed", "failed", "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    client TEXT,
+    request TEXT NOT NULL,
+    sample_indices TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+JOB_COLUMNS = ("id", "status", "client", "request", "total", "completed", "failed",
+               "created_at", "started_at", "finished_at", "error")
+
+
+def has_error(result: Dict[str, Any]) -> bool:
+    """True if any model in a sample result returned an error string."""
+    return any(isinstance(output, str) and output.startswith("[Error") for output in result.get("results", {}).values())
+
+
+class JobStore:
+    """
+    SQLite persistence for jobs and their result rows.
+
+    Calls are blocking and serialized by a lock; JobManager runs them on a
+    worker thread. WAL mode lets status reads proceed while rows are written.
+    """
+
+    def __init__(self, path: str = JOBS_DB):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _job(self, row: Optional[Tuple]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(zip(JOB_COLUMNS, row))
+        job["request"] = loads(job["request"])
+        return job
+
+    def create(self, job_id: str, request: Dict[str, Any], client: str, sample_indices: List[int]) -> Dict[str, Any]:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, client, request, sample_indices, total, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, client, dumps(request).decode(), dumps(sample_indices).decode(),
+                 len(sample_indices), time.time()),
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def count(self, status: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def sample_indices(self, job_id: str) -> List[int]:
+        with self._lock:
+            row = self._conn.execute("SELECT sample_indices FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return loads(row[0]) if row else []
+
+    def unfinished(self) -> List[str]:
+        """Queued or interrupted jobs, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            if status == RUNNING:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = COALESCE(started_at, ?) WHERE id = ?",
+                    (status, now, job_id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (status, error, now if status in FINISHED else None, job_id),
+                )
+
+    def add_results(self, job_id: str, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> None:
+        """Store result rows and advance the progress counters in one transaction."""
+        rows = list(rows)
+        failed = sum(has_error(row) for _, row in rows)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO job_results (job_id, seq, row) VALUES (?, ?, ?)",
+                    [(job_id, seq, dumps(row).decode()) for seq, row in rows],
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET completed = completed + ?, failed = failed + ? WHERE id = ?",
+                    (len(rows), failed, job_id),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def done_seqs(self, job_id: str) -> Set[int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT seq FROM job_results WHERE job_id = ?", (job_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Stored result rows in sample order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row FROM job_results WHERE job_id = ? ORDER BY seq LIMIT ? OFFSET ?", (job_id, limit, offset)
+            ).fetchall()
+        return [loads(row[0]) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobManager:
+    """
+    Queue and worker pool for inference jobs.
+
+    Records are sampled when the job is submitted and their dataset positions
+    stored with it; each finished chunk is committed with its progress, so a
+    job interrupted by a restart resumes with only its missing samples.
+    Model calls run at bulk priority, behind interactive API traffic.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, workers: int = JOB_WORKERS,
+                 chunk_size: int = JOB_CHUNK_SIZE, max_queued: int = JOB_MAX_QUEUED):
+        self._store = store
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_queued = max_queued
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelled: Set[str] = set()
+        # Samples done and monotonic start of the current run, for throughput
+        self._rates: Dict[str, Tuple[int, float]] = {}
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            self._store = JobStore(JOBS_DB)
+        return self._store
+
+    async def start(self) -> None:
+        """Start the workers and requeue jobs left unfinished by a previous run."""
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue()
+        for job_id in await asyncio.to_thread(self.store.unfinished):
+            self._queue.put_nowait(job_id)
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; running jobs stay "running" in the store and resume on the next start."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def submit(self, request: Dict[str, Any], client: str) -> Dict[str, Any]:
+        """
+        Create a job and queue it.
+
+        Args:
+            request: QueryRequest fields (n, the model flags and optional model ids)
+            client: Client id, stored for reference
+
+        Returns:
+            The stored job
+
+        Raises:
+            Overloaded: JOB_MAX_QUEUED jobs are already waiting
+        """
+        queued = await asyncio.to_thread(self.store.count, QUEUED)
+        if queued >= self.max_queued:
+            raise Overloaded("jobs_queue_full", 30)
+        if self._queue is None:
+            await self.start()
+        indices = get_engine().sample_indices(request.get("n", 5))
+        job = await asyncio.to_thread(self.store.create, uuid.uuid4().hex, request, client, indices)
+        self._queue.put_nowait(job["id"])
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; finished jobs are returned unchanged."""
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["status"] in FINISHED:
+            return job
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancelled.add(job_id)
+            task.cancel()
+        await asyncio.to_thread(self.store.set_status, job_id, CANCELLED)
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            task = asyncio.create_task(self._run_job(job_id))
+            self._running[job_id] = task
+            try:
+                await task
+            except asyncio.CancelledError:
+                # Only a job cancelled through cancel() is swallowed; stop() cancels the worker itself
+                if job_id not in self._cancelled:
+                    raise
+            finally:
+                self._running.pop(job_id, None)
+                self._rates.pop(job_id, None)
+                self._cancelled.discard(job_id)
+
+    async def _run_job(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["status"] in FINISHED:
+            return
+        await asyncio.to_thread(self.store.set_status, job_id, RUNNING)
+        request = job["request"]
+        model_names, routing_chain = select_models(
+            models=request.get("models"), **{k: v for k, v in request.items() if k.startswith("use_")}
+        )
+
+        indices = await asyncio.to_thread(self.store.sample_indices, job_id)
+        done = await asyncio.to_thread(self.store.done_seqs, job_id)
+        pending = [(seq, index) for seq, index in enumerate(indices) if seq not in done]
+        self._rates[job_id] = (0, time.monotonic())
+
+        engine = get_engine()
+        priority = CURRENT_PRIORITY.set(BULK)
+        try:
+            with usage_endpoint("/inference/jobs"):
+                for start in range(0, len(pending), self.chunk_size):
+                    chunk = pending[start:start + self.chunk_size]
+                    results = await engine.run_batch([engine.dataset[index] for _, index in chunk],
+                                                     model_names, routing_chain)
+                    rows = [(seq, result) for (seq, _), result in zip(chunk, results)]
+                    await asyncio.to_thread(self.store.add_results, job_id, rows)
+                    JOB_SAMPLES.inc(len(rows))
+                    completed, began = self._rates[job_id]
+                    self._rates[job_id] = (completed + len(rows), began)
+            await asyncio.to_thread(self.store.set_status, job_id, COMPLETED)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await asyncio.to_thread(self.store.set_status, job_id, FAILED, f"[Error - Job]: {e}")
+        finally:
+            CURRENT_PRIORITY.reset(priority)
+
+    def _throughput(self, job: Dict[str, Any]) -> float:
+        if job["id"] in self._rates:
+            completed, began = self._rates[job["id"]]
+            elapsed = time.monotonic() - began
+        else:
+            completed = job["completed"]
+            end = job["finished_at"] or time.time()
+            elapsed = end - job["started_at"] if job["started_at"] else 0.0
+        return completed / elapsed if elapsed > 0 else 0.0
+
+    async def status(self, job_id: str, offset: int = 0, limit: int = 100) -> Optional[Dict[str, Any]]:
+        """
+        Job state with progress, throughput and a page of results.
+
+        Args:
+            job_id: Job id
+            offset: First result row to return
+            limit: Maximum result rows (0 for none)
+
+        Returns:
+            Job dict, or None if unknown
+        """
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None:
+            return None
+        throughput = self._throughput(job)
+        remaining = job["total"] - job["completed"]
+        job.update({
+            "job_id": job.pop("id"),
+            "progress": job["completed"] / job["total"] if job["total"] else 1.0,
+            "throughput_samples_per_second": round(throughput, 3),
+            "eta_seconds": round(remaining / throughput, 1) if throughput and job["status"] == RUNNING else None,
+            "offset": offset,
+            "results": await asyncio.to_thread(self.store.results, job_id, offset, limit) if limit else [],
+        })
+        return job
+
+    async def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        jobs = await asyncio.to_thread(self.store.list, limit)
+        for job in jobs:
+            job["job_id"] = job.pop("id")
+        return jobs
+
+
+_manager: Optional[JobManager] = None
+
+
+def get_job_manager() -> JobManager:
+    """Process-wide job manager backed by JOBS_DB."""
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+    return _manager
@@ -0,0 +1,103 @@
+# app/services/json_io.py
+"""
+orjson-backed JSON helpers for services and evaluation writers.
+Result files default to compact JSONL; pretty-printed JSON is available on request.
+"""
+
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Union
+import orjson
+
+PathLike = Union[str, Path]
+
+DUMP_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+PRETTY_OPTIONS = DUMP_OPTIONS | orjson.OPT_INDENT_2
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text (raises orjson.JSONDecodeError, a ValueError subclass)."""
+    return orjson.loads(data)
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes.
+
+    Args:
+        obj: Object to serialize
+        pretty: Indent with two spaces
+
+    Returns:
+        Encoded JSON
+    """
+    return orjson.dumps(obj, option=PRETTY_OPTIONS if pretty else DUMP_OPTIONS)
+
+
+def read_json(path: PathLike) -> Any:
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
+
+
+def write_json(path: PathLike, obj: Any, pretty: bool = False) -> None:
+    with open(path, "wb") as f:
+        f.write(dumps(obj, pretty=pretty))
+
+
+def iter_jsonl(path: PathLike) -> Iterator[Any]:
+    """Yield one parsed record per non-empty line."""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield orjson.loads(line)
+
+
+def write_jsonl(path: PathLike, rows: Iterable[Any], append: bool = False) -> int:
+    """
+    Write rows as JSON Lines.
+
+    Args:
+        path: Destination file
+        rows: Records to write
+        append: Append instead of truncating
+
+    Returns:
+        Number of rows written
+    """
+    count = 0
+    with open(path, "ab" if append else "wb") as f:
+        for row in rows:
+            f.write(orjson.dumps(row, option=DUMP_OPTIONS | orjson.OPT_APPEND_NEWLINE))
+            count += 1
+    return count
+
+
+def write_results(path: PathLike, rows: List[Any], pretty: bool = False) -> Path:
+    """
+    Write a result set: compact JSONL by default, indented JSON array if pretty.
+
+    A ".json" path is switched to ".jsonl" for the compact format so readers
+    can tell the two apart by extension.
+
+    Args:
+        path: Destination path
+        rows: Result records
+        pretty: Write an indented JSON array instead of JSONL
+
+    Returns:
+        The path actually written
+    """
+    path = Path(path)
+    if pretty:
+        path = path.with_suffix(".json")
+        write_json(path, rows, pretty=True)
+    else:
+        path = path.with_suffix(".jsonl")
+        write_jsonl(path, rows)
+    return path
+
+
+def read_results(path: PathLike) -> List[Any]:
+    """Read a result set written by write_results (JSONL or JSON array)."""
+    if Path(path).suffix == ".jsonl":
+        return list(iter_jsonl(path))
+    return read_json(path)
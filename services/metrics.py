@@ -0,0 +1,186 @@
+# app/services/metrics.py
+"""
+Prometheus metrics for the inference pipeline.
+Tracks per-stage and per-model latency, parse failures, model errors and in-flight work.
+"""
+
+import re
+from contextlib import contextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+MODEL_NAMES = ("qwen_base", "qwen_lora", "openai_gpt", "tinyllama_lora", "ranker", "embedding")
+
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MODEL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0)
+
+STAGE_LATENCY = Histogram(
+    "acronym_stage_latency_seconds",
+    "Latency of pipeline stages (sampling, extraction, prompt_build, parse, request)",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+
+MODEL_LATENCY = Histogram(
+    "acronym_model_latency_seconds",
+    "End-to-end latency of a single model call, including HTTP round trip",
+    ["model"],
+    buckets=MODEL_BUCKETS,
+)
+
+PARSE_FAILURES = Counter(
+    "acronym_model_parse_failures_total",
+    "Model responses that could not be parsed as JSON",
+    ["model"],
+)
+
+MODEL_ERRORS = Counter(
+    "acronym_model_errors_total",
+    "Model calls that returned an error string, labelled by error source",
+    ["model", "error"],
+)
+
+RESPONSE_CACHE = Counter(
+    "acronym_response_cache_total",
+    "Response cache lookups by result (hit or miss)",
+    ["model", "result"],
+)
+
+MODEL_TOKENS = Counter(
+    "acronym_model_tokens_total",
+    "Prompt and completion tokens per model (reported by the backend or estimated)",
+    ["model", "kind"],
+)
+
+IN_FLIGHT_REQUESTS = Gauge(
+    "acronym_in_flight_requests",
+    "API requests currently being processed",
+    ["endpoint"],
+)
+
+IN_FLIGHT_MODEL_CALLS = Gauge(
+    "acronym_in_flight_model_calls",
+    "Model calls currently awaiting a response",
+    ["model"],
+)
+
+ROUTING_REQUESTS = Counter(
+    "acronym_routing_requests_total",
+    "Routed queries by the model whose answer was returned (\"none\" if every model failed)",
+    ["model"],
+)
+
+ROUTING_ESCALATIONS = Counter(
+    "acronym_routing_escalations_total",
+    "Answers rejected by validation, causing escalation to the next model",
+    ["model", "reason"],
+)
+
+ROUTING_LATENCY = Counter(
+    "acronym_routing_latency_seconds_total",
+    "Model latency of routed queries (mode=routed) vs the estimated full fan-out (mode=fanout)",
+    ["mode"],
+)
+
+ROUTING_COST = Counter(
+    "acronym_routing_cost_usd_total",
+    "Token cost of routed queries (mode=routed) vs the estimated full fan-out (mode=fanout)",
+    ["mode"],
+)
+
+BACKEND_UP = Gauge(
+    "acronym_backend_up",
+    "1 if the last health probe of the model succeeded, else 0",
+    ["model"],
+)
+
+BACKEND_PROBE_LATENCY = Gauge(
+    "acronym_backend_probe_latency_seconds",
+    "Latency of the last health probe / warm-up request per model",
+    ["model"],
+)
+
+DICTIONARY_RELOADS = Counter(
+    "acronym_dictionary_reloads_total",
+    "Acronym dictionary reloads by result (reloaded or error)",
+    ["result"],
+)
+
+CPU_OFFLOAD_ITEMS = Counter(
+    "acronym_cpu_offload_items_total",
+    "Items of CPU-bound batch tasks by where they ran (inline, thread or process)",
+    ["task", "mode"],
+)
+
+SCHEDULER_QUEUED = Gauge(
+    "acronym_scheduler_queued_requests",
+    "Admitted requests waiting for a slot in their priority class",
+    ["priority"],
+)
+
+SCHEDULER_REJECTIONS = Counter(
+    "acronym_scheduler_rejections_total",
+    "Requests shed with 429 by priority class and reason (queue_full, client_requests, client_quota)",
+    ["priority", "reason"],
+)
+
+JOB_SAMPLES = Counter(
+    "acronym_job_samples_total",
+    "Samples processed by background inference jobs",
+)
+
+RESULT_STORE_LOOKUPS = Counter(
+    "acronym_result_store_lookups_total",
+    "Result store lookups per model (hit = stored answer reused, miss = model called)",
+    ["model", "result"],
+)
+
+# Client error strings look like "[Error - vLLM LoRA]: <exception>"; only the
+# bracketed source is used as a label to keep cardinality bounded.
+ERROR_PATTERN = re.compile(r"^\[Error - ([^\]]+)\]")
+
+for _model in MODEL_NAMES:
+    MODEL_LATENCY.labels(_model)
+    PARSE_FAILURES.labels(_model)
+    IN_FLIGHT_MODEL_CALLS.labels(_model)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """
+    Observe the wall time of a pipeline stage.
+
+    Args:
+        stage: Stage label (e.g. "sampling", "prompt_build", "parse")
+    """
+    with STAGE_LATENCY.labels(stage).time():
+        yield
+
+
+def record_model_error(model: str, raw_response: str) -> bool:
+    """
+    Count a model error if the response is a client error string.
+
+    Args:
+        model: Model name label
+        raw_response: Raw response returned by the model client
+
+    Returns:
+        True if the response was an error string
+    """
+    if not isinstance(raw_response, str):
+        return False
+    match = ERROR_PATTERN.match(raw_response)
+    if not match:
+        return False
+    MODEL_ERRORS.labels(model, match.group(1)).inc()
+    return True
+
+
+def render_metrics() -> tuple:
+    """
+    Render all registered metrics in Prometheus text format.
+
+    Returns:
+        Tuple of (payload bytes, content type)
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,91 @@
+# app/services/model_dispatch.py
+"""
+Model registry used by the inference engine.
+Maps result keys to model clients and backends (vLLM variants from models/registry.json), and parses raw model responses.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+import httpx
+from openai import AsyncAzureOpenAI
+from app.models.vllm_client import call_model_variant
+from app.models.openai_client import call_openai
+from app.models.registry import ModelVariant, get_registry
+from app.services.embedding_index import call_embedding
+from app.services.ranker import call_ranker
+from app.services import json_io
+from app.services.metrics import PARSE_FAILURES, record_model_error, time_stage
+from app.services.tracing import ATTR_MODEL, tracer
+
+
+class ModelClients(NamedTuple):
+    """Pooled clients handed to every model call."""
+    http: Optional[httpx.AsyncClient] = None
+    openai: Optional[AsyncAzureOpenAI] = None
+
+
+ModelCall = Callable[[str, ModelClients, Dict[str, Any]], Awaitable[str]]
+
+
+def variant_call(model_id: str) -> ModelCall:
+    """Call for a registry variant, looked up at call time so discovery updates (status, version) apply."""
+    return lambda user_query, clients, usage: call_model_variant(
+        user_query, get_registry().models[model_id], client=clients.http, usage=usage
+    )
+
+
+# Each call takes (user_query, clients, usage); the client fills usage with reported token counts
+MODEL_CALLS: Dict[str, ModelCall] = {
+    **{model_id: variant_call(model_id) for model_id in get_registry().models},
+    "openai_gpt": lambda user_query, clients, usage: call_openai(user_query, client=clients.openai, usage=usage),
+    # Local learned ranker; no tokens, so usage stays empty
+    "ranker": lambda user_query, clients, usage: call_ranker(user_query),
+    "embedding": lambda user_query, clients, usage: call_embedding(user_query),
+}
+
+# Backend each model runs on; concurrency limits are enforced per backend
+MODEL_BACKENDS: Dict[str, str] = {
+    **{model_id: variant.backend for model_id, variant in get_registry().models.items()},
+    "openai_gpt": "openai",
+    "ranker": "cpu",
+    "embedding": "cpu",
+}
+
+
+async def discover_models(http: httpx.AsyncClient) -> List[ModelVariant]:
+    """
+    Check the vLLM servers' /v1/models and make adapters they serve, but the registry file lacks, callable.
+
+    Args:
+        http: Pooled client
+
+    Returns:
+        Newly registered variants
+    """
+    added = await get_registry().discover(http)
+    for variant in added:
+        MODEL_CALLS[variant.id] = variant_call(variant.id)
+        MODEL_BACKENDS[variant.id] = variant.backend
+    return added
+
+
+def parse_model_output(model_name: str, raw_response: str) -> Any:
+    """
+    Parse a raw model response into a dict, falling back to the raw string.
+
+    Args:
+        model_name: Result key of the model that produced the response
+        raw_response: Raw response string from the client
+
+    Returns:
+        Parsed JSON value, or the raw response if it is not valid JSON
+    """
+    if record_model_error(model_name, raw_response):
+        return raw_response
+
+    with tracer.start_as_current_span("model.parse") as span, time_stage("parse"):
+        span.set_attribute(ATTR_MODEL, model_name)
+        try:
+            return json_io.loads(raw_response)
+        except Exception:
+            PARSE_FAILURES.labels(model_name).inc()
+            return raw_response
@@ -0,0 +1,275 @@
+# app/services/pruning.py
+"""
+Candidate pruning before prompt building.
+Drops case-duplicate expansions and caps each acronym's candidates at the top-k by a cheap score, shrinking prompts for every model.
+
+Report (token reduction and answer recall on the golden set):
+    python -m app.services.pruning data/golden_data_20k.json --top-k 3 5 10 20
+"""
+
+import argparse
+import asyncio
+import os
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+from app.models.prompt import SYSTEM_PROMPT_TOKENS, estimate_tokens
+from app.services.candidate_index import format_api_prompt, load_golden_json, load_golden_records
+from app.services.json_io import loads
+from app.services.text_tokens import STOPWORDS, words
+
+# 0 keeps every candidate; case dedup is controlled separately
+PRUNE_TOP_K = int(os.getenv("PRUNE_TOP_K", "0"))
+PRUNE_DEDUP = os.getenv("PRUNE_DEDUP", "0") == "1"
+# "lexical" (context overlap, initials, golden-set popularity) or "embedding" (services/embedding_index.py)
+PRUNE_SCORER = os.getenv("PRUNE_SCORER", "lexical")
+PRUNE_USE_PRIOR = os.getenv("PRUNE_USE_PRIOR", "1") == "1"
+
+Candidates = Dict[str, List[str]]
+
+_prior: Optional[Counter] = None
+
+
+def expansion_prior() -> Counter:
+    """
+    How often each (acronym, expansion) was the curated answer in the golden set.
+
+    Built once from the engine's dataset; empty if it cannot be loaded. Pool
+    workers receive the server's copy (set_expansion_prior) instead.
+    """
+    global _prior
+    if _prior is None:
+        # Imported here: the engine imports this module
+        from app.services.engine import get_engine
+
+        prior: Counter = Counter()
+        try:
+            for record in get_engine().dataset:
+                best = record.get("Best_Output") or "{}"
+                for acronym, expansions in (loads(best) if isinstance(best, str) else best).items():
+                    for expansion in expansions:
+                        prior[(acronym.lower(), expansion.lower())] += 1
+        except Exception:
+            pass
+        _prior = prior
+    return _prior
+
+
+async def load_expansion_prior() -> Counter:
+    """expansion_prior for the event loop: the first build reads the golden dataset in a worker thread."""
+    if _prior is not None:
+        return _prior
+    return await asyncio.to_thread(expansion_prior)
+
+
+def set_expansion_prior(prior: Counter) -> None:
+    global _prior
+    _prior = prior
+
+
+def score_expansion(acronym: str, expansion: str, context: set, prior: Optional[Counter] = None) -> float:
+    """
+    Cheap relevance score of one expansion.
+
+    Args:
+        acronym: Acronym as written in the query
+        expansion: Candidate expansion from the dictionary
+        context: Lowercased non-stopword query words other than the acronym
+        prior: Golden-set answer counts (see expansion_prior)
+
+    Returns:
+        Score; higher is better
+    """
+    expansion_words = words(expansion)
+    if not expansion_words:
+        return 0.0
+    overlap = len(context.intersection(expansion_words))
+    initials = "".join(word[0] for word in expansion_words if word not in STOPWORDS)
+    initials_match = initials == acronym.lower()
+    popularity = min((prior or {}).get((acronym.lower(), expansion.lower()), 0), 10) / 10
+    # Context overlap dominates, then spelled-out initials, then golden-set popularity; shorter wins ties
+    return 2.0 * overlap + (1.0 if initials_match else 0.0) + 0.5 * popularity - 0.01 * len(expansion_words)
+
+
+def pruning_enabled() -> bool:
+    return PRUNE_DEDUP or PRUNE_TOP_K > 0
+
+
+def dedupe_case(expansions: Sequence[str]) -> List[str]:
+    """Keep the first spelling of each expansion, ignoring case and surrounding whitespace."""
+    seen = set()
+    unique = []
+    for expansion in expansions:
+        key = expansion.strip().casefold()
+        if key not in seen:
+            seen.add(key)
+            unique.append(expansion)
+    return unique
+
+
+def score_candidates(query: str, candidates: Candidates, scorer: str = PRUNE_SCORER,
+                     use_prior: bool = PRUNE_USE_PRIOR) -> Dict[str, Dict[str, float]]:
+    """
+    Cheap relevance score of every candidate.
+
+    Args:
+        query: User query text
+        candidates: Acronym to candidate expansions
+        scorer: "lexical" or "embedding"
+        use_prior: Include golden-set popularity in the lexical score
+
+    Returns:
+        Acronym to {expansion: score}
+    """
+    if scorer == "embedding":
+        from app.services.embedding_index import get_index
+
+        return {acronym: dict(pairs) for acronym, pairs in get_index().score(query, candidates).items()}
+    if scorer != "lexical":
+        raise ValueError(f"Unknown pruning scorer '{scorer}' (expected 'lexical' or 'embedding')")
+
+    prior = expansion_prior() if use_prior else None
+    query_words = set(words(query)) - STOPWORDS
+    return {
+        acronym: {
+            expansion: score_expansion(acronym, expansion, query_words - {acronym.lower()}, prior)
+            for expansion in expansions
+        }
+        for acronym, expansions in candidates.items()
+    }
+
+
+def prune_candidates(
+    query: str,
+    candidates: Candidates,
+    top_k: int = PRUNE_TOP_K,
+    dedup: bool = PRUNE_DEDUP,
+    scorer: str = PRUNE_SCORER,
+    use_prior: bool = PRUNE_USE_PRIOR,
+) -> Candidates:
+    """
+    Shrink each acronym's candidate list.
+
+    Kept expansions stay in their dictionary order, so the prompt layout the
+    fine-tuned models saw is preserved; only the losers are removed.
+
+    Args:
+        query: User query text
+        candidates: Acronym to candidate expansions
+        top_k: Maximum candidates per acronym (0 = no cap)
+        dedup: Drop case variants first
+        scorer: Scorer used for the cap (see score_candidates)
+        use_prior: Include golden-set popularity in the lexical score
+
+    Returns:
+        Pruned acronym to candidate expansions
+    """
+    pruned = {acronym: dedupe_case(expansions) if dedup else list(expansions)
+              for acronym, expansions in candidates.items()}
+    oversized = {acronym: expansions for acronym, expansions in pruned.items() if top_k and len(expansions) > top_k}
+    if not oversized:
+        return pruned
+
+    scores = score_candidates(query, oversized, scorer, use_prior)
+    for acronym, expansions in oversized.items():
+        ranked = sorted(range(len(expansions)), key=lambda i: scores[acronym].get(expansions[i], 0.0), reverse=True)
+        keep = set(ranked[:top_k])
+        pruned[acronym] = [expansion for i, expansion in enumerate(expansions) if i in keep]
+    return pruned
+
+
+def evaluate(records: List[Dict], top_k: int, dedup: bool, scorer: str, use_prior: bool) -> Dict[str, float]:
+    """
+    Token reduction and answer recall of one pruning configuration.
+
+    User tokens are the query and candidate section; prompt tokens add SYSTEM_PROMPT.
+
+    Recall is measured against the curated Best_Output: a pruned-away correct
+    expansion can no longer be chosen by any model. Some curated answers are
+    not among the candidates at all, so answer_retention (relative to the
+    unpruned candidates) is the accuracy cost of pruning itself, and
+    fully_answerable is the share of queries whose whole answer is offered.
+
+    Args:
+        records: Golden records with Query, candidates and Best_Output
+        top_k: Candidate cap (0 = none)
+        dedup: Drop case variants
+        scorer: Pruning scorer
+        use_prior: Use golden-set popularity (optimistic on the golden set itself)
+
+    Returns:
+        Summary metrics
+    """
+    tokens_before = tokens_after = candidates_before = candidates_after = 0
+    expected_total = expected_offered = expected_kept = answerable = 0
+    for record in records:
+        query, candidates = record["Query"], record["candidates"]
+        pruned = prune_candidates(query, candidates, top_k, dedup, scorer, use_prior)
+        tokens_before += estimate_tokens(format_api_prompt(query, candidates))
+        tokens_after += estimate_tokens(format_api_prompt(query, pruned))
+        candidates_before += sum(len(v) for v in candidates.values())
+        candidates_after += sum(len(v) for v in pruned.values())
+
+        best = record.get("Best_Output") or "{}"
+        try:
+            expected = loads(best) if isinstance(best, str) else best
+        except ValueError:
+            continue
+        offered = {acronym.lower(): {e.strip().lower() for e in values} for acronym, values in candidates.items()}
+        kept = {acronym.lower(): {e.strip().lower() for e in values} for acronym, values in pruned.items()}
+        missing = 0
+        for acronym, expansions in (expected if isinstance(expected, dict) else {}).items():
+            for expansion in expansions if isinstance(expansions, list) else []:
+                key = expansion.strip().lower()
+                expected_total += 1
+                expected_offered += key in offered.get(acronym.lower(), set())
+                if key in kept.get(acronym.lower(), set()):
+                    expected_kept += 1
+                else:
+                    missing += 1
+        answerable += missing == 0
+
+    system_tokens = SYSTEM_PROMPT_TOKENS * len(records)
+    return {
+        "top_k": top_k,
+        "dedup": dedup,
+        "scorer": scorer,
+        "use_prior": use_prior,
+        "user_tokens_before": tokens_before,
+        "user_tokens_after": tokens_after,
+        "user_token_reduction": 1 - tokens_after / tokens_before if tokens_before else 0.0,
+        # Including the fixed SYSTEM_PROMPT sent with every call
+        "prompt_token_reduction": 1 - (tokens_after + system_tokens) / (tokens_before + system_tokens)
+        if tokens_before else 0.0,
+        "candidate_reduction": 1 - candidates_after / candidates_before if candidates_before else 0.0,
+        "answer_recall": expected_kept / expected_total if expected_total else 1.0,
+        # Share of the correct expansions present before pruning that survive it
+        "answer_retention": expected_kept / expected_offered if expected_offered else 1.0,
+        "fully_answerable": answerable / len(records) if records else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token reduction and golden-set recall of candidate pruning")
+    parser.add_argument("golden", help="golden_data_20k.json or its .parquet candidate index")
+    parser.add_argument("--top-k", type=int, nargs="+", default=[3, 5, 10, 20])
+    parser.add_argument("--scorer", default="lexical", choices=("lexical", "embedding"))
+    parser.add_argument("--no-prior", action="store_true",
+                        help="Score without golden-set popularity (avoids optimism when evaluating on the golden set)")
+    parser.add_argument("--no-dedup", action="store_true")
+    args = parser.parse_args()
+
+    records = load_golden_records(args.golden) if args.golden.endswith(".parquet") else load_golden_json(args.golden)
+    dedup, use_prior = not args.no_dedup, not args.no_prior
+
+    print(f"{'top_k':>5} {'dedup':>5} {'user tokens':>12} {'user -%':>8} {'prompt -%':>9} "
+          f"{'cand -%':>7} {'recall':>7} {'retained':>8} {'answerable':>10}")
+    configs = [(0, dedup)] + [(top_k, dedup) for top_k in args.top_k]
+    for top_k, use_dedup in configs:
+        summary = evaluate(records, top_k, use_dedup, args.scorer, use_prior)
+        print(f"{top_k:>5} {str(use_dedup):>5} {summary['user_tokens_after']:>12} "
+              f"{summary['user_token_reduction']:>8.1%} {summary['prompt_token_reduction']:>9.1%} {summary['candidate_reduction']:>7.1%} "
+              f"{summary['answer_recall']:>7.1%} {summary['answer_retention']:>8.1%} {summary['fully_answerable']:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
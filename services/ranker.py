@@ -0,0 +1,358 @@
+# app/services/ranker.py
+"""
+CPU fast path: a learned ranker that selects expansions without calling an LLM.
+Hashed query/expansion cross features + logistic regression, trained from golden labels and GPT judge verdicts.
+
+Train:
+    python -m app.services.ranker --golden data/golden_data_20k.json \
+        --judged "evaluation_v1/results/mismatched_evaluation_results_gpt_qwen(ft)1.json" \
+        --out data/ranker.npz
+"""
+
+import argparse
+import math
+import os
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sklearn.utils import murmurhash3_32
+from app.services.candidate_index import parse_prompt
+from app.services.dictionary import load_dictionary
+from app.services.json_io import dumps, loads, read_json
+from app.services.text_tokens import STOPWORDS, words
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+RANKER_MODEL_FILE = os.getenv("RANKER_MODEL_FILE", str(APP_ROOT / "data" / "ranker.npz"))
+
+N_HASHED = 2 ** 18
+DENSE_FEATURES = ("overlap", "initials", "inv_candidates", "length", "trigram_jaccard", "upper")
+N_FEATURES = N_HASHED + len(DENSE_FEATURES)
+
+Candidates = Dict[str, List[str]]
+Example = Tuple[str, Candidates, Dict[str, List[str]]]
+
+
+def _trigrams(tokens: Iterable[str]) -> set:
+    text = f" {' '.join(tokens)} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+@lru_cache(maxsize=1 << 18)
+def _index(token: str) -> int:
+    return murmurhash3_32(token, positive=True) % N_HASHED
+
+
+def pair_features(context: List[str], acronym: str, expansion: str, n_candidates: int,
+                  context_grams: Optional[set] = None) -> Tuple[List[int], List[float]]:
+    """
+    Features of one (query, acronym, expansion) pair.
+
+    Args:
+        context: Lowercased query words other than the acronym
+        acronym: Acronym as written in the query
+        expansion: Candidate expansion
+        n_candidates: Number of candidates for this acronym
+        context_grams: Precomputed _trigrams(context), shared across an acronym's candidates
+
+    Returns:
+        Tuple of (hashed feature indices, dense feature values)
+    """
+    acro = acronym.lower()
+    exp_words = words(expansion)
+    tokens = [f"a:{acro}", f"id:{acro}|{expansion.lower()}"]
+    tokens += [f"ew:{w}" for w in exp_words]
+    tokens += [f"x:{q}|{w}" for q in context for w in exp_words]
+    tokens += [f"qa:{q}|{acro}" for q in context]
+
+    initials = "".join(w[0] for w in exp_words if w not in STOPWORDS)
+    if context_grams is None:
+        context_grams = _trigrams(context)
+    exp_grams = _trigrams(exp_words)
+    union = len(context_grams | exp_grams)
+    dense = [
+        float(len(set(context).intersection(exp_words))),
+        1.0 if initials == acro else 0.0,
+        1.0 / max(n_candidates, 1),
+        math.log1p(len(exp_words)),
+        len(context_grams & exp_grams) / union if union else 0.0,
+        1.0 if acronym.isupper() else 0.0,
+    ]
+    return [_index(token) for token in tokens], dense
+
+
+def _query_pairs(query: str, candidates: Candidates) -> List[Tuple[str, str, List[int], List[float]]]:
+    query_words = words(query)
+    pairs = []
+    for acronym, expansions in candidates.items():
+        context = [w for w in query_words if w != acronym.lower()]
+        context_grams = _trigrams(context)
+        for expansion in expansions:
+            indices, dense = pair_features(context, acronym, expansion, len(expansions), context_grams)
+            pairs.append((acronym, expansion, indices, dense))
+    return pairs
+
+
+def _to_matrix(pairs: Sequence[Tuple[str, str, List[int], List[float]]]):
+    from scipy.sparse import csr_matrix
+
+    data, indices, indptr = [], [], [0]
+    for _, _, hashed, dense in pairs:
+        indices.extend(hashed)
+        data.extend([1.0] * len(hashed))
+        indices.extend(range(N_HASHED, N_FEATURES))
+        data.extend(dense)
+        indptr.append(len(indices))
+    return csr_matrix((data, indices, indptr), shape=(len(pairs), N_FEATURES), dtype=np.float32)
+
+
+class AcronymRanker:
+    """Logistic-regression ranker over hashed pair features."""
+
+    def __init__(self, coef: np.ndarray, intercept: float, threshold: float = 0.5):
+        self.coef = coef.astype(np.float32)
+        self.intercept = float(intercept)
+        self.threshold = threshold
+        self._dense_coef = self.coef[N_HASHED:].tolist()
+
+    @classmethod
+    def load(cls, path: str = RANKER_MODEL_FILE) -> "AcronymRanker":
+        with np.load(path) as stored:
+            return cls(stored["coef"], float(stored["intercept"]), float(stored["threshold"]))
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, coef=self.coef, intercept=self.intercept, threshold=self.threshold)
+
+    def score(self, query: str, candidates: Candidates) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Probability that each candidate expansion is relevant, best first.
+
+        Pure-Python dot products over the hashed indices; no sparse matrix is built.
+
+        Args:
+            query: User query text
+            candidates: Acronym to candidate expansions
+
+        Returns:
+            Acronym to (expansion, probability) pairs
+        """
+        coef = self.coef
+        scored: Dict[str, List[Tuple[str, float]]] = {acronym: [] for acronym in candidates}
+        for acronym, expansion, hashed, dense in _query_pairs(query, candidates):
+            z = self.intercept + float(coef[hashed].sum()) + sum(w * x for w, x in zip(self._dense_coef, dense))
+            scored[acronym].append((expansion, 1.0 / (1.0 + math.exp(-z))))
+        for acronym in scored:
+            scored[acronym].sort(key=lambda pair: pair[1], reverse=True)
+        return scored
+
+    def _select(self, scored: Dict[str, List[Tuple[str, float]]]) -> Dict[str, List[str]]:
+        answer = {}
+        for acronym, pairs in scored.items():
+            selected = [expansion for expansion, p in pairs if p >= self.threshold]
+            if selected:
+                answer[acronym] = selected
+        return answer
+
+    def predict(self, query: str, candidates: Candidates) -> Dict[str, List[str]]:
+        """Answer in the model output format: expansions above threshold per acronym."""
+        return self._select(self.score(query, candidates))
+
+    def predict_batch(self, items: Sequence[Tuple[str, Candidates]]) -> List[Dict[str, List[str]]]:
+        """
+        Score many queries with one sparse matrix product.
+
+        Args:
+            items: (query, candidates) pairs
+
+        Returns:
+            One answer per item, in order
+        """
+        per_item = [_query_pairs(query, candidates) for query, candidates in items]
+        flat = [pair for pairs in per_item for pair in pairs]
+        if not flat:
+            return [{} for _ in items]
+        z = _to_matrix(flat) @ self.coef + self.intercept
+        probabilities = 1.0 / (1.0 + np.exp(-z))
+
+        answers, offset = [], 0
+        for (_, candidates), pairs in zip(items, per_item):
+            scored: Dict[str, List[Tuple[str, float]]] = {acronym: [] for acronym in candidates}
+            for (acronym, expansion, _, _), p in zip(pairs, probabilities[offset:offset + len(pairs)]):
+                scored[acronym].append((expansion, float(p)))
+            offset += len(pairs)
+            for acronym in scored:
+                scored[acronym].sort(key=lambda pair: pair[1], reverse=True)
+            answers.append(self._select(scored))
+        return answers
+
+
+_ranker: Optional[AcronymRanker] = None
+
+
+def get_ranker() -> AcronymRanker:
+    """Process-wide ranker loaded from RANKER_MODEL_FILE."""
+    global _ranker
+    if _ranker is None:
+        _ranker = AcronymRanker.load(RANKER_MODEL_FILE)
+    return _ranker
+
+
+async def call_ranker(user_query: str) -> str:
+    """
+    Model-client shaped entry point for the service layer.
+
+    Args:
+        user_query: Formatted query with candidate acronyms
+
+    Returns:
+        Answer as a JSON string or error message
+    """
+    try:
+        query, candidates = parse_prompt(user_query)
+        return dumps(get_ranker().predict(query, candidates)).decode()
+    except Exception as e:
+        return f"[Error - Ranker]: {e}"
+
+
+# --- training ---------------------------------------------------------------
+
+def _lookup(dictionary: Candidates, acronym: str) -> Optional[List[str]]:
+    return dictionary.get(acronym) or dictionary.get(acronym.lower()) or dictionary.get(acronym.upper())
+
+
+def load_golden_examples(path: str) -> List[Example]:
+    """(query, candidates, answer) from golden_data_20k.json or its candidate index."""
+    if path.endswith(".parquet"):
+        from app.services.candidate_index import load_golden_records
+        records = load_golden_records(path)
+    else:
+        from app.services.candidate_index import load_golden_json
+        records = load_golden_json(path)
+
+    examples = []
+    for record in records:
+        try:
+            answer = loads(record["Best_Output"]) if record.get("Best_Output") else {}
+        except ValueError:
+            continue
+        if isinstance(answer, dict) and record["candidates"]:
+            examples.append((record["Query"], record["candidates"], answer))
+    return examples
+
+
+def load_judged_examples(path: str, dictionary: Candidates) -> List[Example]:
+    """
+    (query, candidates, answer) from GPT judge results, using the winning output.
+
+    Candidates are looked up in the dictionary, because the judge files only
+    store the acronym keys. Ties use the first model's output.
+    """
+    examples = []
+    for row in read_json(path):
+        outputs = {key[:7]: value for key, value in row.items() if key.startswith(("model_1", "model_2"))}
+        winner = "model_2" if row.get("better_model") == "Model 2" else "model_1"
+        answer = outputs.get(winner)
+        if not isinstance(answer, dict):
+            continue
+        candidates = {}
+        for acronym in row.get("candidate_acronyms", []):
+            expansions = _lookup(dictionary, acronym)
+            if expansions:
+                candidates[acronym] = expansions
+        if candidates:
+            examples.append((row["query"], candidates, answer))
+    return examples
+
+
+def _labels(candidates: Candidates, answer: Dict[str, List[str]]) -> List[int]:
+    chosen = {acronym.lower(): {e.lower() for e in expansions} for acronym, expansions in answer.items()
+              if isinstance(expansions, list)}
+    return [
+        int(expansion.lower() in chosen.get(acronym.lower(), set()))
+        for acronym, expansions in candidates.items() for expansion in expansions
+    ]
+
+
+def _exact_match(predicted: Dict[str, List[str]], expected: Dict[str, List[str]]) -> bool:
+    def normalize(answer):
+        return {k.lower(): sorted(e.lower() for e in v) for k, v in answer.items() if isinstance(v, list)}
+    return normalize(predicted) == normalize(expected)
+
+
+def train(examples: List[Example], c: float = 1.0, holdout: float = 0.1, seed: int = 0) -> Tuple[AcronymRanker, Dict[str, Any]]:
+    """
+    Fit the ranker and pick the decision threshold on a holdout split.
+
+    Args:
+        examples: (query, candidates, answer) triples
+        c: Inverse L2 regularization strength
+        holdout: Fraction of examples held out for threshold tuning/reporting
+        seed: Shuffle seed
+
+    Returns:
+        Tuple of (ranker, holdout stats)
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    examples = list(examples)
+    random.Random(seed).shuffle(examples)
+    split = int(len(examples) * (1 - holdout))
+    train_set, test_set = examples[:split], examples[split:] or examples[:1]
+
+    pairs, labels = [], []
+    for query, candidates, answer in train_set:
+        pairs.extend(_query_pairs(query, candidates))
+        labels.extend(_labels(candidates, answer))
+
+    model = LogisticRegression(C=c, solver="liblinear", max_iter=200)
+    model.fit(_to_matrix(pairs), np.array(labels))
+    ranker = AcronymRanker(model.coef_[0], model.intercept_[0])
+
+    items = [(query, candidates) for query, candidates, _ in test_set]
+    best = (0.0, 0.5)
+    for threshold in (0.2, 0.25, 0.3, 0.35, 0.4, 0.45, 0.5, 0.55, 0.6):
+        ranker.threshold = threshold
+        predictions = ranker.predict_batch(items)
+        accuracy = sum(_exact_match(p, e[2]) for p, e in zip(predictions, test_set)) / len(test_set)
+        best = max(best, (accuracy, threshold))
+    ranker.threshold = best[1]
+
+    return ranker, {
+        "train_examples": len(train_set),
+        "train_pairs": len(pairs),
+        "holdout_examples": len(test_set),
+        "holdout_exact_match": best[0],
+        "threshold": best[1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the CPU expansion ranker")
+    parser.add_argument("--golden", action="append", default=[], help="golden_data_20k.json or .parquet index")
+    parser.add_argument("--judged", action="append", default=[], help="mismatched_evaluation_results_*.json")
+    parser.add_argument("--dictionary", default=str(APP_ROOT / "data" / "acronyms_list_cleaned.json"),
+                        help="Raw or compiled dictionary")
+    parser.add_argument("--out", default=RANKER_MODEL_FILE)
+    parser.add_argument("--c", type=float, default=1.0)
+    args = parser.parse_args()
+
+    examples: List[Example] = []
+    for path in args.golden:
+        examples.extend(load_golden_examples(path))
+    if args.judged:
+        dictionary = load_dictionary(args.dictionary).acronyms
+        for path in args.judged:
+            examples.extend(load_judged_examples(path, dictionary))
+    if not examples:
+        parser.error("no training examples; pass --golden and/or --judged")
+
+    ranker, stats = train(examples, c=args.c)
+    ranker.save(args.out)
+    print(f"✅ Ranker saved to {args.out}")
+    for key, value in stats.items():
+        print(f"  {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# app/services/result_diff.py
+"""
+Mismatch diff between two model result sets.
+Rows are joined by index or by query + candidates, answers are normalized (case, order, duplicates) and compared by hash; only mismatches are streamed out, classified for the judge step.
+
+Runner output vs expected labels (one file, two columns):
+    python -m app.services.result_diff base_results_20000.parquet \
+        --left-column expected_output --right-column qwen_lora_response --out mismatched_outputs_qwen_base.jsonl
+Two runs:
+    python -m app.services.result_diff gpt_results.jsonl base_results_20000.parquet \
+        --left-column gpt_response --right-column qwen_lora_response --out mismatched.jsonl
+"""
+
+import argparse
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Tuple
+from app.services.json_io import dumps, loads, read_results, write_jsonl
+from app.services.sinks import SINKS, read_rows
+
+# Difference classes, relative to the left (model_1) answer
+SUPERSET = "superset"      # left has every right expansion and more
+SUBSET = "subset"          # left is missing some right expansions
+OVERLAP = "overlap"        # both sides have expansions the other lacks
+DISJOINT = "disjoint"      # no expansion in common (empty expansion lists count as empty sets)
+PARSE_FAILED = "parse_failed"  # either side is not a JSON dict (error string, free text)
+KINDS = (SUPERSET, SUBSET, OVERLAP, DISJOINT, PARSE_FAILED)
+
+# Normalized answer: lowercased acronym -> deduplicated lowercased expansions, first-seen order
+Answer = Dict[str, Tuple[str, ...]]
+
+
+def normalize(value: Any) -> Optional[Answer]:
+    """
+    Comparison form of a response cell.
+
+    Keys and expansions are lowercased and stripped and duplicate expansions
+    dropped. An acronym listed with no expansion is kept, as the mismatch
+    notebook did ({"AI": []} differs from {}).
+
+    Args:
+        value: Parsed dict or JSON text
+
+    Returns:
+        Normalized answer, or None if the value is not a JSON dict
+    """
+    if isinstance(value, (str, bytes)):
+        try:
+            value = loads(value)
+        except ValueError:
+            return None
+    if not isinstance(value, dict):
+        return None
+    answer: Dict[str, Dict[str, None]] = {}
+    for acronym, expansions in value.items():
+        if isinstance(expansions, str):
+            expansions = [expansions]
+        elif not isinstance(expansions, list):
+            return None
+        seen = answer.setdefault(str(acronym).strip().lower(), {})
+        for expansion in expansions:
+            seen[str(expansion).strip().lower()] = None
+    return {acronym: tuple(seen) for acronym, seen in answer.items()}
+
+
+def answer_pairs(answer: Answer) -> FrozenSet[Tuple[str, str]]:
+    """(acronym, expansion) pairs only; an empty expansion list contributes nothing."""
+    return frozenset((acronym, expansion) for acronym, expansions in answer.items() for expansion in expansions)
+
+
+def pair_set(answer: Answer) -> FrozenSet[Tuple[str, Optional[str]]]:
+    """
+    (acronym, expansion) pairs plus an (acronym, None) presence marker per acronym.
+
+    The marker keeps {"AI": []} distinct from {} while making it a subset of
+    any answer for the same acronym.
+    """
+    return answer_pairs(answer) | {(acronym, None) for acronym in answer}
+
+
+def classify(left: Optional[Answer], right: Optional[Answer]) -> Optional[str]:
+    """
+    Difference class of two normalized answers, or None if they are equal.
+
+    Args:
+        left: Normalized model_1 answer (None = parse failure)
+        right: Normalized model_2 answer (None = parse failure)
+    """
+    if left is None or right is None:
+        return PARSE_FAILED
+    left_pairs, right_pairs = pair_set(left), pair_set(right)
+    # Hashed sets: equality and containment without sorting
+    if left_pairs == right_pairs:
+        return None
+    if left_pairs > right_pairs:
+        return SUPERSET
+    if left_pairs < right_pairs:
+        return SUBSET
+    if answer_pairs(left).isdisjoint(answer_pairs(right)):
+        return DISJOINT
+    return OVERLAP
+
+
+def as_output(answer: Optional[Answer], raw: Any) -> Any:
+    """Mismatch-file form: the normalized dict, or the raw cell if it did not parse."""
+    if answer is None:
+        return raw
+    return {acronym: list(expansions) for acronym, expansions in answer.items()}
+
+
+def diff_pairs(pairs: Iterable[Tuple[Any, str, Any, Any]], summary: Optional[Counter] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Mismatches among already-joined answers.
+
+    Args:
+        pairs: (index, query, model_1 value, model_2 value)
+        summary: Counter updated with "compared", "equal" and one count per difference class
+
+    Yields:
+        Rows with index, Query, model_1, model_2 (the mismatched_outputs_*.json format) and kind
+    """
+    summary = summary if summary is not None else Counter()
+    for index, query, left_raw, right_raw in pairs:
+        summary["compared"] += 1
+        # Identical cells need one parse (most rows in a model-vs-model diff); malformed ones still count as parse failures
+        left = normalize(left_raw)
+        if left is not None and left_raw == right_raw:
+            summary["equal"] += 1
+            continue
+        right = normalize(right_raw)
+        kind = classify(left, right)
+        if kind is None:
+            summary["equal"] += 1
+            continue
+        summary[kind] += 1
+        yield {"index": index, "Query": query, "model_1": as_output(left, left_raw),
+               "model_2": as_output(right, right_raw), "kind": kind}
+
+
+def join_key(row: Dict[str, Any], on: str) -> Hashable:
+    if on == "index":
+        return row["index"]
+    candidates = row.get("candidate_acronyms")
+    if isinstance(candidates, dict):
+        candidates = dumps({acronym: candidates[acronym] for acronym in sorted(candidates)})
+    return row.get("query", row.get("Query")), candidates
+
+
+def join_rows(left: Iterable[Dict[str, Any]], right: Iterable[Dict[str, Any]], left_column: str, right_column: str,
+              on: str = "query", summary: Optional[Counter] = None) -> Iterator[Tuple[Any, str, Any, Any]]:
+    """
+    Join two result sets, streaming the left one.
+
+    Only the right side's key and answer cell are held in memory. Repeated keys
+    (the same query sampled twice) are matched in file order.
+
+    Args:
+        left: Rows of the model_1 result set
+        right: Rows of the model_2 result set
+        left_column: Answer column on the left (e.g. expected_output)
+        right_column: Answer column on the right (e.g. qwen_lora_response)
+        on: "index" or "query" (query + candidate acronyms; runner sinks are in completion order)
+        summary: Counter updated with "left_only" / "right_only"
+
+    Yields:
+        (index, query, left value, right value)
+    """
+    summary = summary if summary is not None else Counter()
+    pending: Dict[Hashable, Deque[Any]] = {}
+    for row in right:
+        pending.setdefault(join_key(row, on), deque()).append(row.get(right_column))
+    for position, row in enumerate(left):
+        matches = pending.get(join_key(row, on))
+        if not matches:
+            summary["left_only"] += 1
+            continue
+        yield row.get("index", position), row.get("query", row.get("Query")), row.get(left_column), matches.popleft()
+    summary["right_only"] += sum(len(matches) for matches in pending.values())
+
+
+def load_result_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Rows of a result sink (.parquet/.jsonl/.csv, streamed) or a JSON array file."""
+    if Path(path).suffix in SINKS:
+        return read_rows(path)
+    return iter(read_results(path))
+
+
+def diff_files(left_path: str, right_path: Optional[str], left_column: str, right_column: str, out: str,
+               on: str = "query", kinds: Optional[List[str]] = None) -> Counter:
+    """
+    Write the mismatches of two result files as JSONL.
+
+    Args:
+        left_path: model_1 result file
+        right_path: model_2 result file; None compares two columns of left_path
+        left_column: Answer column of the left file
+        right_column: Answer column of the right file
+        out: Destination .jsonl
+        on: Join key, "index" or "query"
+        kinds: Difference classes to write (default all)
+
+    Returns:
+        Summary counter
+    """
+    summary: Counter = Counter()
+    if right_path is None:
+        pairs = ((row.get("index", position), row.get("query", row.get("Query")), row.get(left_column),
+                  row.get(right_column)) for position, row in enumerate(load_result_rows(left_path)))
+    else:
+        pairs = join_rows(load_result_rows(left_path), load_result_rows(right_path), left_column, right_column,
+                          on, summary)
+    rows = diff_pairs(pairs, summary)
+    if kinds:
+        rows = (row for row in rows if row["kind"] in kinds)
+    write_jsonl(out, rows)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two model result sets and write the mismatches")
+    parser.add_argument("left", help="model_1 results (.parquet/.jsonl/.csv/.json)")
+    parser.add_argument("right", nargs="?", help="model_2 results; omit to compare two columns of left")
+    parser.add_argument("--left-column", required=True)
+    parser.add_argument("--right-column", required=True)
+    parser.add_argument("--on", choices=("query", "index"), default="query")
+    parser.add_argument("--kind", action="append", choices=KINDS, help="Only write these classes (repeatable)")
+    parser.add_argument("--out", required=True, help="Mismatch rows (.jsonl)")
+    args = parser.parse_args()
+
+    summary = diff_files(args.left, args.right, args.left_column, args.right_column, args.out, args.on, args.kind)
+    mismatched = sum(summary[kind] for kind in KINDS)
+    print(f"✅ {mismatched} of {summary['compared']} joined rows differ; saved to {args.out}")
+    print("   " + ", ".join(f"{kind}: {summary[kind]}" for kind in KINDS))
+    if summary["left_only"] or summary["right_only"]:
+        print(f"   unmatched: left {summary['left_only']}, right {summary['right_only']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,499 @@
+# app/services/result_store.py
+"""
+Persistent result store shared by the eval runners and the API.
+Model responses are keyed by (record hash, model, base model, adapter version, prompt version), so a repeated experiment only infers the missing cells and mismatch files become queries.
+
+Mismatched pairs (same format as evaluation_v1/results/mismatched_outputs_*.json):
+    python -m app.services.result_store mismatches --model-1 expected --model-2 qwen_base \
+        --out mismatched_outputs_qwen_base.json
+Import a runner output written before the store existed:
+    python -m app.services.result_store import lora_results_20000.parquet --model qwen_lora \
+        --column qwen_lora_response --prompt-format eval
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from app.models.openai_client import OPENAI_MODEL
+from app.models.prompt import SYSTEM_PROMPT
+from app.models.registry import get_registry
+from app.services.json_io import dumps, loads, write_results
+from app.services.metrics import RESULT_STORE_LOOKUPS
+from app.services.result_diff import diff_pairs
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+# Empty string disables the store
+RESULT_STORE = os.getenv("RESULT_STORE", str(APP_ROOT / "data" / "results.sqlite3"))
+# Adapter version overrides per model id; by default the registry's adapter_version (models/registry.json),
+# so retraining an adapter and bumping its version stops old answers from being reused
+ADAPTER_VERSIONS = loads(os.getenv("ADAPTER_VERSIONS", "{}"))
+# Served model of ids outside the vLLM registry; registry ids use their variant's base_model
+BASE_MODELS = {"openai_gpt": OPENAI_MODEL}
+# Pseudo model id for the records' expected outputs in pairs/mismatches
+EXPECTED = "expected"
+# Rows per IN (...) lookup; SQLite's default variable limit is 999
+LOOKUP_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    record_hash TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    candidates TEXT NOT NULL,
+    expected TEXT,
+    source_index INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    record_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    base_model TEXT NOT NULL,
+    adapter_version TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (record_hash, model, base_model, adapter_version, prompt_version)
+);
+CREATE INDEX IF NOT EXISTS results_by_model ON results (model, base_model, adapter_version, prompt_version);
+"""
+# 1: base_model added to the results key
+SCHEMA_VERSION = 1
+
+# Version 0 stores keep their answers under an empty base model, so no lookup replays them
+MIGRATE_V0 = """
+DROP INDEX IF EXISTS results_by_model;
+ALTER TABLE results RENAME TO results_v0;
+""" + SCHEMA + """
+INSERT INTO results SELECT record_hash, model, '', adapter_version, prompt_version, response, created_at FROM results_v0;
+DROP TABLE results_v0;
+"""
+
+Candidates = Dict[str, List[str]]
+
+
+class ResultKey(NamedTuple):
+    record_hash: str
+    model: str
+    base_model: str
+    adapter_version: str
+    prompt_version: str
+
+
+def record_hash(query: str, candidates: Candidates) -> str:
+    """
+    Content address of a dataset record: its query and candidates.
+
+    Candidate keys are sorted; expansion order is kept, since it is part of the prompt.
+    """
+    payload = dumps([query, [[acronym, candidates[acronym]] for acronym in sorted(candidates)]])
+    return hashlib.sha256(payload).hexdigest()
+
+
+def prompt_version(prompt_format: str, system_prompt: str = SYSTEM_PROMPT) -> str:
+    """
+    Version of a prompt: its user-prompt format and a digest of the system prompt.
+
+    Args:
+        prompt_format: "api" (query: "...", candidate acronyms: "...") or "eval" (Query:/Candidate Acronyms:)
+        system_prompt: System prompt text sent with every call
+
+    Returns:
+        e.g. "api-3f2a9c1b7d4e"
+    """
+    return f"{prompt_format}-{hashlib.sha256(system_prompt.encode()).hexdigest()[:12]}"
+
+
+def model_version(model: str) -> Tuple[str, str]:
+    """
+    (base model, adapter version) a model id currently resolves to.
+
+    Both are part of the key, so swapping the base model in models/registry.json,
+    or retraining an adapter and bumping its version, stops old answers from
+    being reused.
+    """
+    variant = get_registry().models.get(model)
+    base = variant.base_model if variant is not None else BASE_MODELS.get(model, "")
+    if model in ADAPTER_VERSIONS:
+        return base, ADAPTER_VERSIONS[model]
+    return base, variant.adapter_version if variant is not None else ""
+
+
+def is_storable(response: Any) -> bool:
+    """
+    Only responses that parse to a JSON dict are stored; error strings and
+    free text are retried on the next run instead of being replayed forever.
+    """
+    if not isinstance(response, str) or response.startswith("[Error"):
+        return False
+    try:
+        return isinstance(loads(response), dict)
+    except ValueError:
+        return False
+
+
+def parse_answer(response: str) -> Any:
+    try:
+        return loads(response)
+    except ValueError:
+        return response
+
+
+class ResultStore:
+    """
+    SQLite store of model responses and the records they answer.
+
+    Calls are blocking and serialized by a lock; async callers run them on a
+    worker thread (see StoredCalls). WAL mode lets readers proceed during writes.
+    """
+
+    def __init__(self, path: str = RESULT_STORE):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self) -> None:
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}
+        if columns and "base_model" not in columns:
+            self._conn.executescript("BEGIN;" + MIGRATE_V0 + "COMMIT;")
+        else:
+            self._conn.executescript(SCHEMA)
+        if version != SCHEMA_VERSION:
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def get(self, key: ResultKey) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM results WHERE record_hash = ? AND model = ? AND base_model = ? "
+                "AND adapter_version = ? AND prompt_version = ?", key,
+            ).fetchone()
+        # Rows written before unparsable answers were filtered count as misses
+        return row[0] if row and is_storable(row[0]) else None
+
+    def get_many(self, hashes: Iterable[str], model: str, base: str, adapter: str, prompt: str) -> Dict[str, str]:
+        """Stored responses of one model/base/adapter/prompt version, by record hash."""
+        hashes = list(dict.fromkeys(hashes))
+        found: Dict[str, str] = {}
+        with self._lock:
+            for start in range(0, len(hashes), LOOKUP_CHUNK):
+                chunk = hashes[start:start + LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT record_hash, response FROM results WHERE model = ? AND base_model = ? "
+                    f"AND adapter_version = ? AND prompt_version = ? AND record_hash IN ({', '.join('?' * len(chunk))})",
+                    (model, base, adapter, prompt, *chunk),
+                ).fetchall()
+                found.update(row for row in rows if is_storable(row[1]))
+        return found
+
+    def put_many(self, rows: Sequence[Tuple[ResultKey, str, Dict[str, Any]]]) -> int:
+        """
+        Store responses and their records in one transaction.
+
+        Args:
+            rows: (key, response, record) with record holding query, candidates and
+                optionally expected and source_index; responses that do not
+                parse to a dict are skipped
+
+        Returns:
+            Number of responses stored
+        """
+        rows = [row for row in rows if is_storable(row[1])]
+        if not rows:
+            return 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO records (record_hash, query, candidates, expected, source_index) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (record_hash) DO UPDATE SET expected = COALESCE(excluded.expected, expected), "
+                    "source_index = COALESCE(source_index, excluded.source_index)",
+                    [
+                        (key.record_hash, record["query"], dumps(record["candidates"]).decode(),
+                         None if record.get("expected") is None else dumps(record["expected"]).decode(),
+                         record.get("source_index"))
+                        for key, _, record in rows
+                    ],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(*key, response, now) for key, response, _ in rows],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def put(self, key: ResultKey, response: str, query: str, candidates: Candidates) -> bool:
+        return self.put_many([(key, response, {"query": query, "candidates": candidates})]) == 1
+
+    def _latest(self, model: str, base: Optional[str], adapter: Optional[str], prompt: Optional[str]) -> Tuple[str, Tuple]:
+        """Subquery of the newest response per record for a model, optionally pinned to versions."""
+        if model == EXPECTED:
+            return "SELECT record_hash, expected AS response FROM records WHERE expected IS NOT NULL", ()
+        where, params = ["model = ?"], [model]
+        if base is not None:
+            where.append("base_model = ?")
+            params.append(base)
+        if adapter is not None:
+            where.append("adapter_version = ?")
+            params.append(adapter)
+        if prompt is not None:
+            where.append("prompt_version = ?")
+            params.append(prompt)
+        return (
+            f"SELECT record_hash, response FROM ("
+            f"SELECT record_hash, response, ROW_NUMBER() OVER (PARTITION BY record_hash ORDER BY created_at DESC) AS n "
+            f"FROM results WHERE {' AND '.join(where)}) WHERE n = 1",
+            tuple(params),
+        )
+
+    def pairs(self, model_1: str, model_2: str, base_1: Optional[str] = None, adapter_1: Optional[str] = None,
+              prompt_1: Optional[str] = None, base_2: Optional[str] = None, adapter_2: Optional[str] = None,
+              prompt_2: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Records answered by both models, with both raw responses.
+
+        Without explicit versions, each model's newest response per record is used;
+        the model id "expected" stands for the records' expected outputs.
+
+        Yields:
+            Dicts with record_hash, query, candidates, expected, source_index, response_1, response_2
+        """
+        first, first_params = self._latest(model_1, base_1, adapter_1, prompt_1)
+        second, second_params = self._latest(model_2, base_2, adapter_2, prompt_2)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT r.record_hash, r.query, r.candidates, r.expected, r.source_index, a.response, b.response "
+                f"FROM records r JOIN ({first}) a ON a.record_hash = r.record_hash "
+                f"JOIN ({second}) b ON b.record_hash = r.record_hash "
+                f"ORDER BY COALESCE(r.source_index, r.rowid)",
+                first_params + second_params,
+            ).fetchall()
+        for record, query, candidates, expected, source_index, response_1, response_2 in rows:
+            yield {
+                "record_hash": record,
+                "query": query,
+                "candidates": loads(candidates),
+                "expected": None if expected is None else loads(expected),
+                "source_index": source_index,
+                "response_1": response_1,
+                "response_2": response_2,
+            }
+
+    def mismatches(self, model_1: str, model_2: str, summary: Optional[Counter] = None,
+                   **versions: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Records where the two models' answers differ (see services/result_diff.py).
+
+        Yields:
+            Rows in the mismatched_outputs_*.json format (index, Query, model_1, model_2) plus kind
+        """
+        pairs = ((pair["source_index"], pair["query"], pair["response_1"], pair["response_2"])
+                 for pair in self.pairs(model_1, model_2, **versions))
+        return diff_pairs(pairs, summary)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Stored responses per model, base model, adapter version and prompt version."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, base_model, adapter_version, prompt_version, COUNT(*), MAX(created_at) FROM results "
+                "GROUP BY model, base_model, adapter_version, prompt_version ORDER BY model"
+            ).fetchall()
+        return [
+            {"model": model, "base_model": base, "adapter_version": adapter, "prompt_version": prompt,
+             "responses": count, "updated_at": updated}
+            for model, base, adapter, prompt, count, updated in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class StoredCalls:
+    """
+    Read-through, write-behind model calls for one model/base/adapter/prompt version.
+
+    The base model and adapter version are resolved once, at construction, so
+    a registry refresh during the run cannot split its answers over two keys.
+
+    preload fetches every stored answer of a run in one query; get_or_call
+    returns a stored answer or runs the call once per record (duplicates in
+    the same run await the first call), and buffers new answers for a batched
+    write. Use as an async context manager so the last batch is written.
+    """
+
+    def __init__(self, store: ResultStore, model: str, prompt_format: str, system_prompt: str = SYSTEM_PROMPT,
+                 batch_size: int = 200):
+        self.store = store
+        self.model = model
+        self.base_model, self.adapter_version = model_version(model)
+        self.prompt_version = prompt_version(prompt_format, system_prompt)
+        self.batch_size = batch_size
+        self.hits = 0
+        self.calls = 0
+        self._known: Dict[str, str] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[ResultKey, str, Dict[str, Any]]] = []
+        self._lock = asyncio.Lock()
+
+    async def preload(self, records: Iterable[Tuple[str, Candidates]]) -> int:
+        """Load stored answers for (query, candidates) records; returns how many were found."""
+        hashes = [record_hash(query, candidates) for query, candidates in records]
+        found = await asyncio.to_thread(self.store.get_many, hashes, self.model, self.base_model,
+                                        self.adapter_version, self.prompt_version)
+        self._known.update(found)
+        return len(found)
+
+    async def get_or_call(self, query: str, candidates: Candidates, call: Callable[[], Awaitable[str]],
+                          expected: Any = None, source_index: Optional[int] = None) -> str:
+        """
+        Stored answer for the record, or the result of call() (stored unless it is an error).
+
+        Args:
+            query: Record query
+            candidates: Record candidates
+            call: Coroutine factory performing the inference
+            expected: Expected output kept with the record
+            source_index: Position of the record in its dataset file
+
+        Returns:
+            Raw response string
+        """
+        key_hash = record_hash(query, candidates)
+        if key_hash in self._known:
+            self.hits += 1
+            RESULT_STORE_LOOKUPS.labels(self.model, "hit").inc()
+            return self._known[key_hash]
+        if key_hash in self._inflight:
+            self.hits += 1
+            return await asyncio.shield(self._inflight[key_hash])
+
+        RESULT_STORE_LOOKUPS.labels(self.model, "miss").inc()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key_hash] = future
+        try:
+            self.calls += 1
+            response = await call()
+            if is_storable(response):
+                self._known[key_hash] = response
+                key = ResultKey(key_hash, self.model, self.base_model, self.adapter_version, self.prompt_version)
+                self._pending.append((key, response, {"query": query, "candidates": candidates,
+                                                      "expected": expected, "source_index": source_index}))
+                if len(self._pending) >= self.batch_size:
+                    await self.flush()
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            # Retrieved here so a failure nobody else awaited is not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key_hash, None)
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if self._pending:
+                batch, self._pending = self._pending, []
+                await asyncio.to_thread(self.store.put_many, batch)
+
+    async def __aenter__(self) -> "StoredCalls":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.flush()
+
+
+_store: Optional[ResultStore] = None
+
+
+def get_result_store() -> Optional[ResultStore]:
+    """Process-wide store at RESULT_STORE, or None if it is disabled."""
+    global _store
+    if _store is None and RESULT_STORE:
+        _store = ResultStore(RESULT_STORE)
+    return _store
+
+
+def import_rows(store: ResultStore, rows: Iterable[Dict[str, Any]], model: str, column: str,
+                prompt_format: str) -> int:
+    """
+    Load a runner output file (query, candidate_acronyms, expected_output, <column>) into the store.
+
+    Returns:
+        Number of responses stored
+    """
+    key_args = (model, *model_version(model), prompt_version(prompt_format))
+    batch = []
+    for index, row in enumerate(rows):
+        candidates = row.get("candidate_acronyms") or {}
+        if isinstance(candidates, str):
+            candidates = loads(candidates)
+        expected = row.get("expected_output")
+        if isinstance(expected, str):
+            expected = parse_answer(expected)
+        response = row.get(column)
+        if isinstance(response, dict):
+            # Sinks decode JSON cells on read; the store keeps the raw text
+            response = dumps(response).decode()
+        key = ResultKey(record_hash(row["query"], candidates), *key_args)
+        batch.append((key, response, {"query": row["query"], "candidates": candidates,
+                                             "expected": expected, "source_index": row.get("index", index)}))
+    return store.put_many(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query and load the persistent result store")
+    parser.add_argument("--store", default=RESULT_STORE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    mismatches = commands.add_parser("mismatches", help="Export records where two models disagree")
+    mismatches.add_argument("--model-1", required=True, help=f"Model id, or '{EXPECTED}' for the expected outputs")
+    mismatches.add_argument("--model-2", required=True)
+    for side in ("1", "2"):
+        mismatches.add_argument(f"--base-{side}", help="Pin a base model (default: newest answer)")
+        mismatches.add_argument(f"--adapter-{side}", help="Pin an adapter version (default: newest answer)")
+        mismatches.add_argument(f"--prompt-{side}", help="Pin a prompt version (default: newest answer)")
+    mismatches.add_argument("--out", required=True, help=".json or .jsonl")
+
+    importer = commands.add_parser("import", help="Load a runner output file (.parquet/.jsonl/.csv/.json)")
+    importer.add_argument("input")
+    importer.add_argument("--model", required=True)
+    importer.add_argument("--column", required=True, help="Response column, e.g. qwen_lora_response")
+    importer.add_argument("--prompt-format", default="eval", choices=("eval", "api"))
+
+    commands.add_parser("stats", help="Stored responses per model and version")
+    args = parser.parse_args()
+
+    store = ResultStore(args.store)
+    if args.command == "mismatches":
+        rows = list(store.mismatches(args.model_1, args.model_2, base_1=args.base_1, adapter_1=args.adapter_1,
+                                     prompt_1=args.prompt_1, base_2=args.base_2, adapter_2=args.adapter_2,
+                                     prompt_2=args.prompt_2))
+        out = write_results(args.out, rows, pretty=args.out.endswith(".json"))
+        print(f"✅ {len(rows)} mismatched records saved to {out}")
+    elif args.command == "import":
+        from app.evaluation_v1.ranker_evaluation import load_rows
+
+        stored = import_rows(store, load_rows(args.input), args.model, args.column, args.prompt_format)
+        print(f"✅ Stored {stored} responses from {args.input}")
+    else:
+        for row in store.stats():
+            print(f"{row['model']:<16} {row['base_model'] or '-':<36} {row['adapter_version'] or '-':<20} "
+                  f"{row['prompt_version']:<20} {row['responses']:>8}")
+
+
+if __name__ == "__main__":
+    main()
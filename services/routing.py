@@ -0,0 +1,161 @@
+# app/services/routing.py
+"""
+Cascade routing: cheapest sufficient model first.
+Each answer is validated against the candidates; the query escalates to the next model only on failure or low confidence.
+"""
+
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+from app.services.metrics import ROUTING_COST, ROUTING_ESCALATIONS, ROUTING_LATENCY, ROUTING_REQUESTS
+from app.services.json_io import dumps
+from app.services.usage import call_cost, count_tokens, system_prompt_tokens, usage_tracker
+
+if TYPE_CHECKING:
+    from app.services.engine import InferenceEngine
+
+# Cheapest first; GPT is the last resort
+DEFAULT_CHAIN = tuple(
+    name.strip() for name in os.getenv("ROUTING_CHAIN", "tinyllama_lora,qwen_lora,openai_gpt").split(",") if name.strip()
+)
+# Relative cost of each model, cheapest first; used to order an arbitrary selection
+MODEL_COST_ORDER = ("ranker", "embedding", "tinyllama_lora", "qwen_lora", "qwen_base", "openai_gpt")
+MIN_CONFIDENCE = float(os.getenv("ROUTING_MIN_CONFIDENCE", "0.6"))
+
+# An acronym answered with every one of at least this many candidates looks copied, not selected
+COPIED_LIST_MIN_CANDIDATES = 3
+
+
+def order_chain(model_names: Sequence[str]) -> List[str]:
+    """Order selected models cheapest-first for routing."""
+    rank = {name: i for i, name in enumerate(MODEL_COST_ORDER)}
+    return sorted(model_names, key=lambda name: rank.get(name, len(rank)))
+
+
+def _normalize_candidates(candidates: Dict[str, List[str]]) -> Dict[str, set]:
+    normalized: Dict[str, set] = {}
+    for acronym, expansions in candidates.items():
+        normalized.setdefault(acronym.lower(), set()).update(e.strip().lower() for e in expansions)
+    return normalized
+
+
+def validate_output(output: Any, candidates: Dict[str, List[str]]) -> Tuple[bool, str, float]:
+    """
+    Check a parsed model answer against the candidates it was given.
+
+    Keys must be candidate acronyms and every expansion must come from that
+    acronym's candidate list (case-insensitive); candidates are dictionary
+    entries, so this also checks the expansion is in the dictionary.
+
+    Args:
+        output: Parsed model output (dict on success, string on error/parse failure)
+        candidates: Acronym to candidate expansions sent in the prompt
+
+    Returns:
+        Tuple of (valid, reason, confidence); reason is "ok" when valid
+    """
+    if isinstance(output, str) and output.startswith("[Error"):
+        return False, "error", 0.0
+    if not isinstance(output, dict):
+        return False, "unparsable", 0.0
+
+    allowed = _normalize_candidates(candidates)
+    confidence = 1.0
+    for acronym, expansions in output.items():
+        key = str(acronym).lower()
+        if key not in allowed:
+            return False, "unknown_acronym", 0.0
+        if not isinstance(expansions, list) or not expansions:
+            return False, "malformed", 0.0
+        if any(not isinstance(e, str) or e.strip().lower() not in allowed[key] for e in expansions):
+            return False, "unknown_expansion", 0.0
+        if len(allowed[key]) >= COPIED_LIST_MIN_CANDIDATES and len(set(e.lower() for e in expansions)) == len(allowed[key]):
+            confidence = min(confidence, 0.5)
+
+    # "{}" is a legitimate answer, but a small model returning it with candidates present is a weak signal
+    if not output and allowed:
+        confidence = min(confidence, 0.5)
+
+    if confidence < MIN_CONFIDENCE:
+        return False, "low_confidence", confidence
+    return True, "ok", confidence
+
+
+async def route_query(
+    engine: "InferenceEngine",
+    user_query: str,
+    candidates: Dict[str, List[str]],
+    chain: Optional[Sequence[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Try models cheapest-first and return the first answer that validates.
+
+    If every model fails validation, the last parsed dict answer (or the last
+    response) is returned with model set to None.
+
+    Args:
+        engine: Inference engine used for the (cached, rate-limited) calls
+        user_query: Formatted query with candidate acronyms
+        candidates: Acronym to candidate expansions in the prompt
+        chain: Model result keys in escalation order (default DEFAULT_CHAIN)
+
+    Returns:
+        Dict with model, output, confidence and attempts (model, reason, latency_ms)
+    """
+    chain = list(chain or DEFAULT_CHAIN)
+    attempts: List[Dict[str, Any]] = []
+    routed_latency = 0.0
+    fallback: Any = None
+    answer: Optional[Dict[str, Any]] = None
+
+    for model_name in chain:
+        started = time.perf_counter()
+        output = await engine.call_model(model_name, user_query)
+        latency = time.perf_counter() - started
+        routed_latency += latency
+
+        valid, reason, confidence = validate_output(output, candidates)
+        attempts.append({"model": model_name, "reason": reason, "latency_ms": round(latency * 1000, 1)})
+        if valid:
+            answer = {"model": model_name, "output": output, "confidence": confidence}
+            break
+        if model_name != chain[-1]:
+            ROUTING_ESCALATIONS.labels(model_name, reason).inc()
+        if isinstance(output, dict) or fallback is None:
+            fallback = output
+
+    if answer is None:
+        answer = {"model": None, "output": fallback, "confidence": 0.0}
+
+    _record_savings(chain, attempts, routed_latency, user_query, answer["output"])
+    ROUTING_REQUESTS.labels(answer["model"] or "none").inc()
+    return {**answer, "attempts": attempts}
+
+
+def _record_savings(chain: List[str], attempts: List[Dict[str, Any]], routed_latency: float,
+                    user_query: str, output: Any) -> None:
+    """
+    Compare the routed call with an estimated full fan-out over the chain.
+
+    Fan-out latency is the slowest model (calls run concurrently) and its cost
+    is the sum over all models. Called models use their measured latency;
+    the others use their observed average from the usage tracker (0 until
+    they have been called, which under-reports the saving). Costs are priced
+    from this prompt's tokens and the returned answer's size. An empty chain
+    (ROUTING_CHAIN empty or fully filtered out) has nothing to compare.
+    """
+    if not chain:
+        return
+    called = {attempt["model"]: attempt["latency_ms"] / 1000 for attempt in attempts}
+    prompt_tokens = system_prompt_tokens() + count_tokens(user_query)
+    completion_tokens = count_tokens(dumps(output).decode() if output is not None else "")
+    costs = {name: call_cost(name, prompt_tokens, completion_tokens) for name in chain}
+
+    fanout_latency = max(called.get(name, usage_tracker.model_averages(name)[0]) for name in chain)
+    fanout_cost = sum(costs.values())
+    routed_cost = sum(costs[name] for name in called)
+
+    ROUTING_LATENCY.labels("routed").inc(routed_latency)
+    ROUTING_LATENCY.labels("fanout").inc(fanout_latency)
+    ROUTING_COST.labels("routed").inc(routed_cost)
+    ROUTING_COST.labels("fanout").inc(fanout_cost)
@@ -0,0 +1,310 @@
+# app/services/scheduler.py
+"""
+Request admission control and priority scheduling.
+Interactive requests are admitted and given backend slots ahead of bulk ones; per-client quotas and bounded queues shed load with 429 + Retry-After.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from app.services.json_io import loads
+from app.services.metrics import SCHEDULER_QUEUED, SCHEDULER_REJECTIONS
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+# Lower rank is served first
+PRIORITY_RANK = {INTERACTIVE: 0, BULK: 1}
+
+# (max active requests, max queued requests) per class; requests beyond both get 429
+DEFAULT_CLASS_LIMITS: Dict[str, Tuple[int, int]] = {INTERACTIVE: (64, 256), BULK: (2, 8)}
+CLASS_LIMITS = {**DEFAULT_CLASS_LIMITS, **{k: tuple(v) for k, v in loads(os.getenv("SCHEDULER_LIMITS", "{}")).items()}}
+# Requests with at least this many samples are bulk unless the client says otherwise
+BULK_MIN_SAMPLES = int(os.getenv("BULK_MIN_SAMPLES", "50"))
+# Active + queued requests per client
+CLIENT_MAX_REQUESTS = int(os.getenv("CLIENT_MAX_REQUESTS", "8"))
+# Work units (samples x models) per client per minute; 0 = unlimited
+CLIENT_QUOTA_PER_MINUTE = float(os.getenv("CLIENT_QUOTA_PER_MINUTE", "0"))
+# Share of each backend's concurrency bulk calls may hold, so an interactive call never waits for a full backend
+BULK_BACKEND_SHARE = float(os.getenv("BULK_BACKEND_SHARE", "0.75"))
+
+PRIORITY_HEADER = "x-priority"
+CLIENT_HEADER = "x-client-id"
+
+CURRENT_PRIORITY: ContextVar[str] = ContextVar("request_priority", default=INTERACTIVE)
+
+
+class Overloaded(Exception):
+    """Request shed by admission control; the API answers 429 with Retry-After."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"{reason}, retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+def classify_request(headers: Mapping[str, str], client_host: Optional[str], samples: int = 1) -> Tuple[str, str]:
+    """
+    Client id and priority class of a request.
+
+    Args:
+        headers: Request headers (X-Client-Id, X-Priority)
+        client_host: Peer address, used when X-Client-Id is absent
+        samples: Queries in the request; large batches are always bulk
+
+    Returns:
+        Tuple of (client id, priority class)
+    """
+    client = headers.get(CLIENT_HEADER) or client_host or "anonymous"
+    priority = BULK if samples >= BULK_MIN_SAMPLES else INTERACTIVE
+    # X-Priority can only demote a request; it never lifts a large batch to interactive
+    if (headers.get(PRIORITY_HEADER) or "").lower() == BULK:
+        priority = BULK
+    return client, priority
+
+
+class PriorityLimiter:
+    """
+    Concurrency limit whose waiters are served by priority, then arrival.
+
+    Bulk holders are capped at bulk_limit, so free slots stay available for
+    interactive calls even while a large batch is queued.
+    """
+
+    def __init__(self, limit: int, bulk_share: float = BULK_BACKEND_SHARE):
+        self.limit = limit
+        self.bulk_limit = max(1, int(limit * bulk_share))
+        self.active = {priority: 0 for priority in PRIORITY_RANK}
+        self._waiters: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def _can_start(self, priority: str) -> bool:
+        if sum(self.active.values()) >= self.limit:
+            return False
+        return priority != BULK or self.active[BULK] < self.bulk_limit
+
+    def _wake(self) -> None:
+        while self._waiters:
+            _, _, priority, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_start(priority):
+                return
+            heapq.heappop(self._waiters)
+            self.active[priority] += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: str) -> None:
+        rank = PRIORITY_RANK[priority]
+        ahead = any(r <= rank and not f.done() for r, _, _, f in self._waiters)
+        if not ahead and self._can_start(priority):
+            self.active[priority] += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (rank, next(self._seq), priority, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the cancellation: hand the slot on
+                self.release(priority)
+            raise
+
+    def release(self, priority: str) -> None:
+        self.active[priority] -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None):
+        """Hold one slot; the priority defaults to the current request's class."""
+        priority = priority or CURRENT_PRIORITY.get()
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+
+@dataclass
+class _ClassState:
+    max_active: int
+    max_queued: int
+    active: int = 0
+    queue: List[asyncio.Future] = field(default_factory=list)
+    # Moving average of admitted request duration, for Retry-After
+    avg_seconds: float = 1.0
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    updated: float
+
+
+@dataclass
+class Ticket:
+    """An admitted request; release it exactly once when the request is done."""
+    client: str
+    priority: str
+    started: float
+    released: bool = False
+
+
+class Scheduler:
+    """
+    Admission control in front of the inference engine.
+
+    Each priority class has a bounded number of active requests and a bounded
+    FIFO queue behind them; when both are full, or a client exceeds its
+    request count or work quota, the request is rejected with a Retry-After
+    estimate instead of piling up. Admitted requests carry their class in a
+    context variable, which the engine's backend limiters use to serve
+    interactive model calls first.
+    """
+
+    def __init__(
+        self,
+        class_limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        client_max_requests: int = CLIENT_MAX_REQUESTS,
+        client_quota_per_minute: float = CLIENT_QUOTA_PER_MINUTE,
+    ):
+        limits = class_limits or CLASS_LIMITS
+        self.classes = {priority: _ClassState(*limits[priority]) for priority in PRIORITY_RANK}
+        self.client_max_requests = client_max_requests
+        self.client_quota_per_minute = client_quota_per_minute
+        self._client_requests: Dict[str, int] = {}
+        self._buckets: Dict[str, _Bucket] = {}
+
+    def _reject(self, priority: str, reason: str, retry_after: float) -> Overloaded:
+        SCHEDULER_REJECTIONS.labels(priority, reason).inc()
+        return Overloaded(reason, retry_after)
+
+    def _take_quota(self, client: str, priority: str, cost: float) -> None:
+        if self.client_quota_per_minute <= 0:
+            return
+        capacity = self.client_quota_per_minute
+        rate = capacity / 60.0
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(client, _Bucket(capacity, now))
+        bucket.tokens = min(capacity, bucket.tokens + (now - bucket.updated) * rate)
+        bucket.updated = now
+        # A request larger than the whole quota is admitted once the bucket is full
+        cost = min(cost, capacity)
+        if bucket.tokens < cost:
+            raise self._reject(priority, "client_quota", (cost - bucket.tokens) / rate)
+        bucket.tokens -= cost
+
+    async def acquire(self, client: str, priority: str, cost: float = 1) -> Ticket:
+        """
+        Admit a request, waiting in its class queue if the class is busy.
+
+        Args:
+            client: Client id (see classify_request)
+            priority: "interactive" or "bulk"
+            cost: Work units (samples x models) charged to the client's quota
+
+        Returns:
+            Ticket to pass to release
+
+        Raises:
+            Overloaded: Client limit or quota exceeded, or the class queue is full
+        """
+        state = self.classes[priority]
+        if self._client_requests.get(client, 0) >= self.client_max_requests:
+            raise self._reject(priority, "client_requests", state.avg_seconds)
+        if state.active >= state.max_active and len(state.queue) >= state.max_queued:
+            # Time for the queue ahead to drain at the current request rate
+            raise self._reject(priority, "queue_full",
+                               state.avg_seconds * (len(state.queue) + 1) / state.max_active)
+        self._take_quota(client, priority, cost)
+
+        self._client_requests[client] = self._client_requests.get(client, 0) + 1
+        try:
+            if state.active >= state.max_active or state.queue:
+                future = asyncio.get_running_loop().create_future()
+                state.queue.append(future)
+                SCHEDULER_QUEUED.labels(priority).inc()
+                try:
+                    await future
+                except asyncio.CancelledError:
+                    if future.done() and not future.cancelled():
+                        self._finish(priority)
+                    elif future in state.queue:
+                        state.queue.remove(future)
+                    raise
+                finally:
+                    SCHEDULER_QUEUED.labels(priority).dec()
+            else:
+                state.active += 1
+        except BaseException:
+            self._drop_client(client)
+            raise
+        return Ticket(client, priority, time.monotonic())
+
+    def _drop_client(self, client: str) -> None:
+        remaining = self._client_requests.get(client, 1) - 1
+        if remaining:
+            self._client_requests[client] = remaining
+        else:
+            self._client_requests.pop(client, None)
+
+    def _finish(self, priority: str) -> None:
+        state = self.classes[priority]
+        state.active -= 1
+        while state.queue:
+            future = state.queue.pop(0)
+            if not future.done():
+                state.active += 1
+                future.set_result(None)
+                break
+
+    def release(self, ticket: Ticket) -> None:
+        """Finish an admitted request (idempotent)."""
+        if ticket.released:
+            return
+        ticket.released = True
+        state = self.classes[ticket.priority]
+        state.avg_seconds = 0.8 * state.avg_seconds + 0.2 * (time.monotonic() - ticket.started)
+        self._drop_client(ticket.client)
+        self._finish(ticket.priority)
+
+    @asynccontextmanager
+    async def admit(self, client: str, priority: str, cost: float = 1):
+        """acquire/release around a block, with the request's class set for backend scheduling."""
+        ticket = await self.acquire(client, priority, cost)
+        token = CURRENT_PRIORITY.set(priority)
+        try:
+            yield ticket
+        finally:
+            CURRENT_PRIORITY.reset(token)
+            self.release(ticket)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            priority: {
+                "active": state.active,
+                "queued": len(state.queue),
+                "max_active": state.max_active,
+                "max_queued": state.max_queued,
+                "avg_seconds": round(state.avg_seconds, 3),
+            }
+            for priority, state in self.classes.items()
+        }
+
+
+_scheduler: Optional[Scheduler] = None
+
+
+def get_scheduler() -> Scheduler:
+    """Process-wide scheduler configured from SCHEDULER_LIMITS and the CLIENT_* variables."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler()
+    return _scheduler
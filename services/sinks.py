@@ -0,0 +1,241 @@
+# app/services/sinks.py
+"""
+Incremental result sinks for the bulk eval runners.
+Rows are buffered and flushed in batches on a worker thread, so writing never blocks the event loop.
+
+Excel export (post-processing):
+    python -m app.services.sinks results.parquet results.xlsx
+"""
+
+import argparse
+import asyncio
+import csv
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from app.services.json_io import PathLike, dumps, iter_jsonl, loads
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _cell(value: Any) -> Optional[str]:
+    """Flatten a value for columnar/CSV output: nested values become JSON text."""
+    if value is None or isinstance(value, str):
+        return value
+    return dumps(value).decode()
+
+
+class ResultSink(ABC):
+    """
+    Base class for batched, append-only result writers.
+
+    Subclasses implement _open, _write_batch and _close; they run on a worker
+    thread and are never called concurrently (guarded by an asyncio.Lock).
+    Use as an async context manager so the last batch is flushed.
+    """
+
+    def __init__(self, path: PathLike, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.rows_written = 0
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+        self._opened = False
+
+    async def write(self, row: Dict[str, Any]) -> None:
+        """Buffer one row and flush once batch_size rows are pending."""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write all pending rows off the event loop."""
+        async with self._lock:
+            if not self._buffer:
+                return
+            batch, self._buffer = self._buffer, []
+            if not self._opened:
+                await asyncio.to_thread(self._open, batch[0])
+                self._opened = True
+            await asyncio.to_thread(self._write_batch, batch)
+            self.rows_written += len(batch)
+
+    async def close(self) -> None:
+        await self.flush()
+        async with self._lock:
+            if self._opened:
+                await asyncio.to_thread(self._close)
+                self._opened = False
+
+    async def __aenter__(self) -> "ResultSink":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @abstractmethod
+    def _open(self, first_row: Dict[str, Any]) -> None:
+        """Create the file; the first row fixes the columns of CSV and Parquet sinks."""
+
+    @abstractmethod
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Append one batch of rows."""
+
+    @abstractmethod
+    def _close(self) -> None:
+        """Finish and close the file."""
+
+
+class JsonlSink(ResultSink):
+    """One JSON object per line; nested values are kept as-is."""
+
+    def _open(self, first_row: Dict[str, Any]) -> None:
+        self._file = open(self.path, "wb")
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        self._file.write(b"".join(dumps(row) + b"\n" for row in batch))
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class CsvSink(ResultSink):
+    """CSV with the first row's keys as header; nested values are JSON text."""
+
+    def _open(self, first_row: Dict[str, Any]) -> None:
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=list(first_row.keys()), extrasaction="ignore")
+        self._writer.writeheader()
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        self._writer.writerows({key: _cell(value) for key, value in row.items()} for row in batch)
+        self._file.flush()
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink(ResultSink):
+    """
+    Parquet with one row group per batch (pyarrow).
+
+    Every column is stored as a string (nested values as JSON text), because
+    model responses and candidate dicts vary in shape from row to row.
+    """
+
+    def _open(self, first_row: Dict[str, Any]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._columns = list(first_row.keys())
+        self._schema = pa.schema([(name, pa.string()) for name in self._columns])
+        self._writer = pq.ParquetWriter(self.path, self._schema, compression="zstd")
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        import pyarrow as pa
+
+        table = pa.table(
+            {name: [_cell(row.get(name)) for row in batch] for name in self._columns},
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+
+    def _close(self) -> None:
+        self._writer.close()
+
+
+SINKS = {
+    ".jsonl": JsonlSink,
+    ".csv": CsvSink,
+    ".parquet": ParquetSink,
+}
+
+
+def open_sink(path: PathLike, batch_size: int = DEFAULT_BATCH_SIZE) -> ResultSink:
+    """
+    Create a sink for the file extension of path.
+
+    Args:
+        path: Destination ending in .jsonl, .csv or .parquet
+        batch_size: Rows per flush (and per Parquet row group)
+
+    Returns:
+        Sink instance; use with "async with"
+    """
+    suffix = Path(path).suffix
+    if suffix not in SINKS:
+        raise ValueError(f"Unsupported result format '{suffix}' (expected one of {', '.join(SINKS)})")
+    return SINKS[suffix](path, batch_size)
+
+
+def read_rows(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """
+    Read rows back from any sink format, decoding JSON-text cells.
+
+    String cells that hold JSON objects or arrays (e.g. a raw model response)
+    are decoded the same way for every format, so a result set reads back
+    identically from .jsonl, .csv and .parquet.
+
+    Args:
+        path: File written by a ResultSink
+
+    Returns:
+        Iterator of row dicts
+    """
+    suffix = Path(path).suffix
+    if suffix == ".jsonl":
+        for row in iter_jsonl(path):
+            yield {key: _decode_cell(value) if isinstance(value, str) else value for key, value in row.items()}
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                yield {key: _decode_cell(value) for key, value in row.items()}
+    elif suffix == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                yield {key: _decode_cell(value) for key, value in row.items()}
+    else:
+        raise ValueError(f"Unsupported result format '{suffix}'")
+
+
+def _decode_cell(value: Optional[str]) -> Any:
+    if not value or value[0] not in "{[":
+        return value
+    try:
+        return loads(value)
+    except ValueError:
+        return value
+
+
+def export_excel(input_path: PathLike, output_path: PathLike) -> int:
+    """
+    Convert a sink file to .xlsx (nested values are written as JSON text).
+
+    Args:
+        input_path: .jsonl, .csv or .parquet results
+        output_path: Destination .xlsx
+
+    Returns:
+        Number of rows exported
+    """
+    import pandas as pd
+
+    df = pd.DataFrame([{key: _cell(value) for key, value in row.items()} for row in read_rows(input_path)])
+    df.to_excel(output_path, index=False)
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a results file (.jsonl/.csv/.parquet) to Excel")
+    parser.add_argument("input", help="Results written by a ResultSink")
+    parser.add_argument("output", help="Destination .xlsx file")
+    args = parser.parse_args()
+
+    rows = export_excel(args.input, args.output)
+    print(f"✅ Exported {rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# app/services/speculative.py
+"""
+Speculative expansion for interactive search.
+Ranks dictionary candidates locally for an instant provisional answer, then refines it with a model call.
+"""
+
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.services.acronyms_service import build_structured_prompt, extract_acronyms
+from app.services.engine import get_engine
+from app.services.metrics import time_stage
+from app.services.pruning import load_expansion_prior, prune_candidates, pruning_enabled, score_expansion
+from app.services.text_tokens import STOPWORDS, words
+
+
+def rank_candidates(query: str, found_acronyms: Dict[str, List[str]],
+                    prior: Optional[Counter] = None) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Rank every candidate expansion of every acronym in the query.
+
+    Args:
+        query: Original user query
+        found_acronyms: Output of extract_acronyms
+        prior: Golden-set answer counts (see services/pruning.py expansion_prior)
+
+    Returns:
+        Acronym to (expansion, score) pairs, best first
+    """
+    query_words = set(words(query)) - STOPWORDS
+    ranked = {}
+    for acronym, expansions in found_acronyms.items():
+        context = query_words - {acronym.lower()}
+        scored = [(expansion, score_expansion(acronym, expansion, context, prior)) for expansion in expansions]
+        ranked[acronym] = sorted(scored, key=lambda pair: pair[1], reverse=True)
+    return ranked
+
+
+def provisional_answer(query: str, ranked: Dict[str, List[Tuple[str, float]]]) -> Dict[str, List[str]]:
+    """
+    Pick the top expansion per acronym, keeping only likely acronyms.
+
+    Lowercase stopwords that happen to be dictionary keys ("is", "what") are
+    dropped; other lowercase words are kept only if their best expansion
+    matches the query context or initials.
+
+    Args:
+        query: Original user query
+        ranked: Output of rank_candidates
+
+    Returns:
+        Answer in the model output format
+    """
+    answer = {}
+    for acronym, scored in ranked.items():
+        if not scored:
+            continue
+        best, score = scored[0]
+        if acronym.isupper() or (acronym.lower() not in STOPWORDS and score > 0.5):
+            answer[acronym] = [best]
+    return answer
+
+
+async def stream_expansion(query: str, model: Optional[str] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Yield a provisional local answer, then the model's refined answer.
+
+    Args:
+        query: User query text
+        model: Model result key to refine with; None routes cheapest-first
+
+    Yields:
+        ("provisional", payload) immediately, then ("refined", payload)
+    """
+    # Built off the event loop on first use (warm-up may be disabled)
+    prior = await load_expansion_prior()
+    with time_stage("provisional"):
+        found_acronyms = extract_acronyms(query)
+        ranked = rank_candidates(query, found_acronyms, prior)
+        answer = provisional_answer(query, ranked)
+
+    yield "provisional", {
+        "query": query,
+        "answer": answer,
+        "candidates": {acronym: [expansion for expansion, _ in scored] for acronym, scored in ranked.items()},
+    }
+
+    if not found_acronyms:
+        yield "refined", {"query": query, "model": None, "answer": {}, "changed": False}
+        return
+
+    if pruning_enabled():
+        with time_stage("pruning"):
+            found_acronyms = prune_candidates(query, found_acronyms)
+
+    with time_stage("prompt_build"):
+        user_query = build_structured_prompt(query, found_acronyms)
+
+    engine = get_engine()
+    if model:
+        output = await engine.call_model(model, user_query)
+        refined = {"model": model, "answer": output}
+    else:
+        routed = await engine.route(user_query, found_acronyms)
+        refined = {"model": routed["model"], "answer": routed["output"], "attempts": routed["attempts"]}
+
+    yield "refined", {"query": query, **refined, "changed": refined["answer"] != answer}
@@ -0,0 +1,21 @@
+# app/services/text_tokens.py
+"""
+Word tokenizer and stopwords shared by the local scorers.
+Speculative ranking, candidate pruning, the embedding index and the CPU ranker all match query context against expansions with these.
+"""
+
+import re
+from typing import List
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Filler words ignored when matching query context against an expansion
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "the", "to", "what", "when", "where", "who", "why", "with",
+})
+
+
+def words(text: str) -> List[str]:
+    """Lowercased alphanumeric words of text, in order."""
+    return WORD_PATTERN.findall(text.lower())
@@ -0,0 +1,105 @@
+# app/services/tracing.py
+"""
+OpenTelemetry tracing setup for the API, service and model client layers.
+Configures the tracer provider, exporter selection and httpx context propagation.
+"""
+
+import os
+from typing import Optional
+from opentelemetry import trace
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+SERVICE_NAME = "acronym-expansion-api"
+
+# One of: "none", "console", "otlp", "memory"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+
+# Span attribute keys shared by the service and client layers
+ATTR_MODEL = "llm.model"
+ATTR_PROMPT_TOKENS = "llm.prompt_tokens_estimate"
+ATTR_RESPONSE_SIZE = "llm.response_size"
+ATTR_CACHE_STATUS = "llm.cache_status"
+ATTR_ACRONYM_COUNT = "acronyms.count"
+
+tracer = trace.get_tracer("app")
+
+_provider: Optional[TracerProvider] = None
+_memory_exporter: Optional[InMemorySpanExporter] = None
+
+
+def _build_exporter(name: str) -> Optional[SpanExporter]:
+    """
+    Create a span exporter by name.
+
+    Args:
+        name: Exporter name from TRACING_EXPORTER
+
+    Returns:
+        SpanExporter instance, or None when tracing output is disabled
+    """
+    if name == "console":
+        return ConsoleSpanExporter()
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if name == "memory":
+        return InMemorySpanExporter()
+    return None
+
+
+def configure_tracing(exporter: Optional[SpanExporter] = None) -> TracerProvider:
+    """
+    Install the global tracer provider and instrument httpx.
+
+    Safe to call more than once; only the first call installs the provider,
+    later calls attach the given exporter to it.
+
+    Args:
+        exporter: Explicit exporter; defaults to the one named by TRACING_EXPORTER
+
+    Returns:
+        The active TracerProvider
+    """
+    global _provider, _memory_exporter
+
+    if exporter is None and _provider is None:
+        exporter = _build_exporter(TRACING_EXPORTER)
+
+    if _provider is None:
+        _provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+        trace.set_tracer_provider(_provider)
+        # Injects W3C traceparent headers into every outgoing httpx request,
+        # including the ones made by the OpenAI SDK.
+        HTTPXClientInstrumentor().instrument()
+
+    if exporter is not None:
+        if isinstance(exporter, InMemorySpanExporter):
+            _memory_exporter = exporter
+            _provider.add_span_processor(SimpleSpanProcessor(exporter))
+        else:
+            _provider.add_span_processor(BatchSpanProcessor(exporter))
+
+    return _provider
+
+
+def get_memory_exporter() -> InMemorySpanExporter:
+    """
+    Return an in-memory exporter attached to the tracer provider.
+
+    Intended for tests that assert on span names, parents and attributes.
+
+    Returns:
+        InMemorySpanExporter collecting every finished span
+    """
+    if _memory_exporter is None:
+        configure_tracing(InMemorySpanExporter())
+    return _memory_exporter
@@ -0,0 +1,301 @@
+# app/services/usage.py
+"""
+Token accounting per model and per endpoint.
+Aggregates reported (or locally estimated) prompt/completion tokens and derives throughput and cost.
+
+Report:
+    python -m app.services.usage --url http://localhost:8090/inference/usage
+    python -m app.services.usage --file usage_snapshot.json
+"""
+
+import argparse
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from app.models.prompt import SYSTEM_PROMPT, estimate_tokens
+from app.services.json_io import loads, read_json
+from app.services.metrics import ERROR_PATTERN, MODEL_TOKENS
+
+# USD per 1M (prompt, completion) tokens. vLLM models are self-hosted and default to 0;
+# set TOKEN_PRICES='{"qwen_lora": [0.02, 0.06]}' to charge amortized GPU cost.
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "qwen_base": (0.0, 0.0),
+    "qwen_lora": (0.0, 0.0),
+    "openai_gpt": (0.15, 0.60),
+    "tinyllama_lora": (0.0, 0.0),
+    "ranker": (0.0, 0.0),
+    "embedding": (0.0, 0.0),
+}
+PRICES: Dict[str, Tuple[float, float]] = {
+    **DEFAULT_PRICES,
+    **{model: tuple(price) for model, price in loads(os.getenv("TOKEN_PRICES", "{}")).items()},
+}
+
+# Endpoint label for usage recorded in the current request/task
+CURRENT_ENDPOINT: ContextVar[str] = ContextVar("usage_endpoint", default="direct")
+
+_encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with tiktoken (o200k_base) when installed, else estimate_tokens.
+
+    Only used when a backend does not report usage; Qwen/TinyLlama tokenizers
+    differ from o200k, so treat the result as an estimate either way.
+    """
+    global _encoding
+    if not text:
+        return 0
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding is False:
+        return estimate_tokens(text)
+    return len(_encoding.encode(text))
+
+
+_system_prompt_tokens: Optional[int] = None
+
+
+def system_prompt_tokens() -> int:
+    """Token count of the shared SYSTEM_PROMPT, computed once."""
+    global _system_prompt_tokens
+    if _system_prompt_tokens is None:
+        _system_prompt_tokens = count_tokens(SYSTEM_PROMPT)
+    return _system_prompt_tokens
+
+
+@contextmanager
+def usage_endpoint(endpoint: str):
+    """Attribute usage recorded inside the block to an endpoint."""
+    token = CURRENT_ENDPOINT.set(endpoint)
+    try:
+        yield
+    finally:
+        CURRENT_ENDPOINT.reset(token)
+
+
+@dataclass
+class UsageTotals:
+    """Running totals for one (model, endpoint) pair."""
+    calls: int = 0
+    estimated_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_seconds: float = 0.0
+
+    def add(self, other: "UsageTotals") -> None:
+        self.calls += other.calls
+        self.estimated_calls += other.estimated_calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.latency_seconds += other.latency_seconds
+
+
+def call_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost of the given tokens at the model's PRICES entry."""
+    prompt_price, completion_price = PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+def summarize(model: str, totals: UsageTotals, wall_seconds: float) -> Dict[str, Any]:
+    """
+    Derive throughput, cost and prompt share from running totals.
+
+    Args:
+        model: Model result key (used for the price lookup)
+        totals: Aggregated totals
+        wall_seconds: Wall time covered by the totals
+
+    Returns:
+        Flat dict suitable for the API and the report table
+    """
+    total_tokens = totals.prompt_tokens + totals.completion_tokens
+    cost = call_cost(model, totals.prompt_tokens, totals.completion_tokens)
+    return {
+        "calls": totals.calls,
+        "estimated_calls": totals.estimated_calls,
+        "prompt_tokens": totals.prompt_tokens,
+        "completion_tokens": totals.completion_tokens,
+        "total_tokens": total_tokens,
+        "prompt_share": totals.prompt_tokens / total_tokens if total_tokens else 0.0,
+        # Per-call throughput (tokens over time spent waiting on the model)
+        "tokens_per_second": total_tokens / totals.latency_seconds if totals.latency_seconds else 0.0,
+        "completion_tokens_per_second": totals.completion_tokens / totals.latency_seconds if totals.latency_seconds else 0.0,
+        # Aggregate throughput across concurrent calls
+        "wall_tokens_per_second": total_tokens / wall_seconds if wall_seconds else 0.0,
+        "cost_usd": cost,
+        "cost_per_1k_calls_usd": cost / totals.calls * 1000 if totals.calls else 0.0,
+    }
+
+
+class UsageTracker:
+    """Thread-safe token totals keyed by (model, endpoint)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], UsageTotals] = {}
+        self._started = time.time()
+
+    def record(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency_seconds: float,
+        estimated: bool = False,
+        endpoint: Optional[str] = None,
+    ) -> None:
+        """
+        Add one model call.
+
+        Args:
+            model: Model result key
+            prompt_tokens: Prompt tokens (reported or estimated)
+            completion_tokens: Completion tokens (reported or estimated)
+            latency_seconds: Duration of the model call
+            estimated: True if the backend did not report usage
+            endpoint: Endpoint label; defaults to CURRENT_ENDPOINT
+        """
+        key = (model, endpoint or CURRENT_ENDPOINT.get())
+        with self._lock:
+            totals = self._totals.setdefault(key, UsageTotals())
+            totals.calls += 1
+            totals.estimated_calls += int(estimated)
+            totals.prompt_tokens += prompt_tokens
+            totals.completion_tokens += completion_tokens
+            totals.latency_seconds += latency_seconds
+        MODEL_TOKENS.labels(model, "prompt").inc(prompt_tokens)
+        MODEL_TOKENS.labels(model, "completion").inc(completion_tokens)
+
+    def record_call(
+        self,
+        model: str,
+        user_query: str,
+        raw_response: Any,
+        usage: Dict[str, Any],
+        latency_seconds: float,
+        endpoint: Optional[str] = None,
+    ) -> None:
+        """
+        Record a call from its reported usage, estimating tokens when none was reported.
+
+        Calls that returned a client error string are not counted.
+
+        Args:
+            model: Model result key
+            user_query: User message sent with SYSTEM_PROMPT
+            raw_response: Raw response text
+            usage: Usage dict filled by the client (may be empty)
+            latency_seconds: Duration of the model call
+            endpoint: Endpoint label; defaults to CURRENT_ENDPOINT
+        """
+        if isinstance(raw_response, str) and ERROR_PATTERN.match(raw_response):
+            return
+        if usage.get("prompt_tokens") is not None:
+            self.record(model, int(usage["prompt_tokens"]), int(usage.get("completion_tokens") or 0),
+                        latency_seconds, endpoint=endpoint)
+            return
+        self.record(model, system_prompt_tokens() + count_tokens(user_query), count_tokens(raw_response or ""),
+                    latency_seconds, estimated=True, endpoint=endpoint)
+
+    def model_averages(self, model: str) -> Tuple[float, float]:
+        """
+        Average latency and cost per call of a model, across endpoints.
+
+        Args:
+            model: Model result key
+
+        Returns:
+            Tuple of (seconds per call, USD per call); (0.0, 0.0) before the first call
+        """
+        totals = UsageTotals()
+        with self._lock:
+            for (name, _), endpoint_totals in self._totals.items():
+                if name == model:
+                    totals.add(endpoint_totals)
+        if not totals.calls:
+            return 0.0, 0.0
+        summary = summarize(model, totals, 0.0)
+        return totals.latency_seconds / totals.calls, summary["cost_usd"] / totals.calls
+
+    def reset(self) -> None:
+        with self._lock:
+            self._totals.clear()
+            self._started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current totals per (model, endpoint) and per model.
+
+        Returns:
+            Dict with window_seconds, by_endpoint rows and by_model rows
+        """
+        with self._lock:
+            items = [(key, UsageTotals(**vars(totals))) for key, totals in self._totals.items()]
+            wall_seconds = time.time() - self._started
+
+        by_model: Dict[str, UsageTotals] = {}
+        by_endpoint: List[Dict[str, Any]] = []
+        for (model, endpoint), totals in sorted(items):
+            by_model.setdefault(model, UsageTotals()).add(totals)
+            by_endpoint.append({"model": model, "endpoint": endpoint, **summarize(model, totals, wall_seconds)})
+        return {
+            "window_seconds": wall_seconds,
+            "by_model": [{"model": model, **summarize(model, totals, wall_seconds)} for model, totals in by_model.items()],
+            "by_endpoint": by_endpoint,
+        }
+
+
+usage_tracker = UsageTracker()
+
+
+def format_report(snapshot: Dict[str, Any]) -> str:
+    """
+    Render a usage snapshot as a plain-text table.
+
+    Args:
+        snapshot: Output of UsageTracker.snapshot() or GET /inference/usage
+
+    Returns:
+        Table with one row per model, then per (model, endpoint)
+    """
+    header = (f"{'model':<16} {'endpoint':<22} {'calls':>7} {'prompt':>10} {'completion':>11} "
+              f"{'prompt%':>8} {'tok/s':>8} {'cmpl tok/s':>10} {'$/1k call':>9} {'est.':>5}")
+    lines = [f"Window: {snapshot.get('window_seconds', 0.0):.1f}s", header, "-" * len(header)]
+    rows = [dict(row, endpoint="(all)") for row in snapshot.get("by_model", [])] + snapshot.get("by_endpoint", [])
+    for row in rows:
+        lines.append(
+            f"{row['model']:<16} {row['endpoint']:<22} {row['calls']:>7} {row['prompt_tokens']:>10} "
+            f"{row['completion_tokens']:>11} {row['prompt_share']:>7.1%} {row['tokens_per_second']:>8.1f} "
+            f"{row['completion_tokens_per_second']:>10.1f} {row['cost_per_1k_calls_usd']:>9.4f} "
+            f"{row['estimated_calls']:>5}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token usage, throughput and cost report")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--url", help="Usage endpoint, e.g. http://localhost:8090/inference/usage")
+    source.add_argument("--file", help="Saved usage snapshot (JSON)")
+    args = parser.parse_args()
+
+    if args.url:
+        import httpx
+        snapshot = httpx.get(args.url, timeout=10.0).raise_for_status().json()
+    else:
+        snapshot = read_json(args.file)
+    print(format_report(snapshot))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,13 @@ Takes user query, extracts acronyms from dictionary, and displays model response
 Requires FastAPI server running on port 8090.
 """
 
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
 import streamlit as st
-import requests
+import httpx
+from http_client import get_http_client
 
 API_URL = "http://localhost:8090/inference/generate"
 
@@ -36,7 +41,7 @@ if st.button("🧠 Generate Explanation", use_container_width=True):
     else:
         with st.spinner("Thinking... 🤔"):
             try:
-                response = requests.post(
+                response = get_http_client().post(
                     API_URL,
                     json={
                         "query": query,
@@ -80,7 +85,7 @@ if st.button("🧠 Generate Explanation", use_container_width=True):
                     st.error(f"❌ API Error: {response.status_code}")
                     st.text(response.text)
 
-            except requests.exceptions.RequestException as e:
+            except httpx.HTTPError as e:
                 st.error("🔌 Could not connect to the API.")
                 st.exception(e)
 
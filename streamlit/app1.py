@@ -5,13 +5,19 @@ Samples random queries from dataset and compares responses across multiple AI mo
 Requires FastAPI server running on port 8090.
 """
 
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
 import streamlit as st
-import requests
+import httpx
 import json
 from typing import Dict, Any, List
 import time
+from http_client import get_background_loop
 
-API_URL = "http://localhost:8090/inference/generate"
+JOBS_URL = "http://localhost:8090/inference/jobs"
+JOB_POLL_SECONDS = 0.5
 
 st.set_page_config(
     page_title="Acronym Expansion Assistant",
@@ -242,7 +248,7 @@ with st.sidebar:
     n_samples = st.number_input(
         "Number of Random Samples", 
         min_value=1, 
-        max_value=50, 
+        max_value=1000, 
         value=3, 
         step=1,
         help="Number of random queries to evaluate"
@@ -281,11 +287,13 @@ if run_evaluation:
     
     with st.spinner("🔄 Processing evaluation request..."):
         try:
-            status_text.text("📡 Sending request to API...")
-            progress_bar.progress(20)
+            status_text.text("📡 Submitting evaluation job...")
+            progress_bar.progress(5)
             
-            response = requests.post(
-                API_URL,
+            # Submitted as a background job and polled, so large batches never hit the HTTP timeout
+            background = get_background_loop()
+            response = background.run(background.client.post(
+                JOBS_URL,
                 json={
                     "n": n_samples,
                     "use_qwen_base": use_qwen_base,
@@ -293,18 +301,32 @@ if run_evaluation:
                     "use_openai_gpt": use_openai_gpt,
                     "use_tiny_llama_lora": use_tiny_llama_lora
                 },
-                timeout=120
-            )
-            
-            progress_bar.progress(60)
-            status_text.text("🧠 Models are generating responses...")
+                timeout=30
+            ))
+
+            if response.status_code == 202:
+                job_url = f"{JOBS_URL}/{response.json()['job_id']}"
+                while True:
+                    job = background.run(background.client.get(job_url, params={"limit": 0}, timeout=30)).json()
+                    elapsed_time = time.time() - start_time
+                    progress_bar.progress(min(5 + int(job["progress"] * 95), 100))
+                    status_text.text(
+                        f"🧠 {job['completed']}/{job['total']} queries "
+                        f"({job['throughput_samples_per_second']:.1f}/s, {elapsed_time:.0f}s)"
+                    )
+                    if job["status"] in ("completed", "failed", "cancelled"):
+                        break
+                    time.sleep(JOB_POLL_SECONDS)
+                response = background.run(background.client.get(job_url, params={"limit": n_samples}, timeout=60))
 
             if response.status_code == 200:
                 progress_bar.progress(100)
                 elapsed_time = time.time() - start_time
                 data = response.json()
-                total = data.get("total_samples", 0)
-                all_results = data.get("data", [])
+                total = data.get("completed", 0)
+                all_results = data.get("results", [])
+                if data.get("error"):
+                    st.warning(f"Job {data['status']}: {data['error']}")
                 
                 progress_bar.empty()
                 status_text.empty()
@@ -313,7 +335,8 @@ if run_evaluation:
                 
                 for idx, item in enumerate(all_results, start=1):
                     query = item.get('query', '')
-                    candidate_acronyms = item.get('candidate_acronyms', '')
+                    # Pre-parsed by the candidate index; older API responses only carry the string
+                    candidate_acronyms = item.get('candidates') or item.get('candidate_acronyms', '')
                     results = item.get("results", {})
                     
                     with st.expander(f"📋 Query {idx}: {query}", expanded=(idx == 1)):
@@ -341,7 +364,7 @@ if run_evaluation:
                 </div>
                 """, unsafe_allow_html=True)
 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             progress_bar.empty()
             status_text.empty()
             st.markdown("""
@@ -351,7 +374,7 @@ if run_evaluation:
             </div>
             """, unsafe_allow_html=True)
             
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             progress_bar.empty()
             status_text.empty()
             st.markdown("""
@@ -361,7 +384,7 @@ if run_evaluation:
             </div>
             """, unsafe_allow_html=True)
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             progress_bar.empty()
             status_text.empty()
             st.markdown(f"""
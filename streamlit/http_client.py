@@ -0,0 +1,72 @@
+# app/streamlit/http_client.py
+"""
+Shared HTTP clients for the Streamlit interfaces.
+Pooled httpx clients and a background event loop kept in st.cache_resource,
+so reruns reuse connections instead of rebuilding clients and event loops.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional
+import httpx
+import streamlit as st
+
+POOL_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60.0)
+DEFAULT_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+
+
+class BackgroundLoop:
+    """
+    Event loop running in a daemon thread, shared across Streamlit reruns.
+
+    Coroutines are submitted from the script thread and run on this loop, which
+    also owns a pooled httpx.AsyncClient so connections survive between reruns.
+    """
+
+    def __init__(self, timeout: httpx.Timeout = DEFAULT_TIMEOUT, limits: httpx.Limits = POOL_LIMITS):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="streamlit-async-loop", daemon=True)
+        self.thread.start()
+        self.client: httpx.AsyncClient = self.run(self._create_client(timeout, limits))
+
+    @staticmethod
+    async def _create_client(timeout: httpx.Timeout, limits: httpx.Limits) -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=timeout, limits=limits)
+
+    def submit(self, coro: Coroutine) -> Future:
+        """
+        Schedule a coroutine without blocking the script thread.
+
+        Args:
+            coro: Coroutine to run on the background loop
+
+        Returns:
+            concurrent.futures.Future that can be polled with done()
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        Run a coroutine on the background loop and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait before raising TimeoutError
+
+        Returns:
+            The coroutine's result
+        """
+        return self.submit(coro).result(timeout)
+
+
+@st.cache_resource
+def get_http_client() -> httpx.Client:
+    """Pooled synchronous client shared by every session and rerun."""
+    return httpx.Client(timeout=DEFAULT_TIMEOUT, limits=POOL_LIMITS)
+
+
+@st.cache_resource
+def get_background_loop() -> BackgroundLoop:
+    """Background event loop + pooled async client shared by every session and rerun."""
+    return BackgroundLoop()
@@ -0,0 +1,12 @@
+# app/tests/conftest.py
+"""
+Test environment: no startup warm-up or discovery, no on-disk result store, CPU work inline.
+Set before any app module reads its configuration.
+"""
+
+import os
+
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+os.environ.setdefault("MODEL_DISCOVERY_ON_STARTUP", "0")
+os.environ.setdefault("RESULT_STORE", "")
+os.environ.setdefault("CPU_EXECUTOR", "inline")
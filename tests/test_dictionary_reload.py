@@ -0,0 +1,47 @@
+# app/tests/test_dictionary_reload.py
+"""
+Hot reload invalidates exactly the cached answers whose query mentions an edited acronym.
+Keys keep their case in the compiled dictionary, while cache tags are casefolded.
+"""
+
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+from app.services import dictionary_manager
+from app.services.dictionary_manager import DictionaryManager, changed_acronyms
+from app.services.dictionary import compile_dictionary
+from app.services.engine import ResponseCache, prompt_tags
+
+RAW = {"AI": ["Artificial Intelligence"], "ML": ["Machine Learning"]}
+
+
+def _prompt(query: str) -> str:
+    return f'query: "{query}", candidate acronyms: "(AI: Artificial Intelligence)"'
+
+
+def test_changed_acronyms_are_casefolded():
+    old, _ = compile_dictionary(RAW)
+    new, _ = compile_dictionary(dict(RAW, AI=["Artificial Intelligence", "Adobe Illustrator"]))
+    assert changed_acronyms(old, new) == {"ai"}
+
+
+def test_reload_invalidates_edited_uppercase_key(tmp_path, monkeypatch):
+    path = tmp_path / "acronyms.json"
+    path.write_text(json.dumps(RAW))
+    cache = ResponseCache()
+    monkeypatch.setattr(dictionary_manager, "get_engine", lambda: SimpleNamespace(cache=cache))
+    manager = DictionaryManager(str(path))
+
+    cache.put(("qwen_lora", "ai"), {"AI": ["Artificial Intelligence"]}, prompt_tags(_prompt("what is AI")))
+    cache.put(("qwen_lora", "ml"), {"ML": ["Machine Learning"]}, prompt_tags(_prompt("ML basics")))
+
+    path.write_text(json.dumps(dict(RAW, AI=["Artificial Intelligence", "Adobe Illustrator"])))
+    os.utime(path, (os.stat(path).st_atime, os.stat(path).st_mtime + 5))
+    result = asyncio.run(manager.reload())
+
+    assert result["reloaded"] and result["changed_acronyms"] == 1
+    assert result["invalidated_cache_entries"] == 1
+    assert cache.get(("qwen_lora", "ai")) is None
+    assert cache.get(("qwen_lora", "ml")) is not None
+    assert manager.current.acronyms["AI"] == ["Artificial Intelligence", "Adobe Illustrator"]
@@ -0,0 +1,32 @@
+# app/tests/test_result_diff.py
+"""
+Difference classes of the mismatch diff, including empty expansion lists and malformed cells.
+"""
+
+from collections import Counter
+from app.services.result_diff import DISJOINT, OVERLAP, PARSE_FAILED, SUBSET, SUPERSET, classify, diff_pairs, normalize
+
+
+def _classify(left, right):
+    return classify(normalize(left), normalize(right))
+
+
+def test_empty_expansion_list_is_a_subset():
+    assert _classify({"AI": []}, {"AI": ["Artificial Intelligence"]}) == SUBSET
+    assert _classify({"AI": ["Artificial Intelligence"]}, {"AI": []}) == SUPERSET
+    assert _classify({"AI": []}, {}) == SUPERSET
+    assert _classify({"AI": []}, {"ai": []}) is None
+
+
+def test_disjoint_and_overlap_compare_expansions():
+    assert _classify({"AI": ["Adobe Illustrator"]}, {"AI": ["Artificial Intelligence"]}) == DISJOINT
+    assert _classify({"AI": ["Artificial Intelligence", "Adobe Illustrator"]},
+                     {"AI": ["Artificial Intelligence", "Air India"]}) == OVERLAP
+
+
+def test_identical_malformed_cells_are_parse_failures():
+    summary = Counter()
+    cells = ["[Error - timeout]: read timed out", {"AI": 3}, '{"AI": ["Artificial Intelligence"]}']
+    rows = list(diff_pairs([(i, "", cell, cell) for i, cell in enumerate(cells)], summary))
+    assert [row["kind"] for row in rows] == [PARSE_FAILED, PARSE_FAILED]
+    assert summary["equal"] == 1 and summary[PARSE_FAILED] == 2
@@ -0,0 +1,14 @@
+# app/tests/test_routing.py
+"""
+Routing with an empty chain (ROUTING_CHAIN empty or fully filtered) returns no answer instead of failing.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from app.services import routing
+
+
+def test_empty_chain_routes_to_no_answer(monkeypatch):
+    monkeypatch.setattr(routing, "DEFAULT_CHAIN", ())
+    result = asyncio.run(routing.route_query(SimpleNamespace(), 'query: "what is AI"', {}, chain=[]))
+    assert result == {"model": None, "output": None, "confidence": 0.0, "attempts": []}
@@ -0,0 +1,34 @@
+# app/tests/test_speculative.py
+"""
+The speculative ranking prior is built off the event loop on the first /stream request.
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from app.services import pruning
+from app.services.speculative import stream_expansion
+
+
+def test_first_stream_builds_prior_in_a_thread(monkeypatch):
+    built_on = []
+
+    def fake_prior():
+        built_on.append(threading.get_ident())
+        pruning.set_expansion_prior(Counter({("ai", "artificial intelligence"): 1}))
+        return pruning._prior
+
+    monkeypatch.setattr(pruning, "_prior", None)
+    monkeypatch.setattr(pruning, "expansion_prior", fake_prior)
+
+    async def first_event():
+        events = stream_expansion("what is AI used for")
+        event = await events.__anext__()
+        await events.aclose()
+        return event, threading.get_ident()
+
+    (kind, payload), loop_thread = asyncio.run(first_event())
+    assert kind == "provisional" and "AI" in payload["candidates"]
+    assert len(built_on) == 1 and built_on[0] != loop_thread
+    assert asyncio.run(pruning.load_expansion_prior()) is pruning._prior
+    assert len(built_on) == 1
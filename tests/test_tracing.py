@@ -0,0 +1,44 @@
+# app/tests/test_tracing.py
+"""
+One /generate request yields a single trace nested as request -> model call -> parse.
+The model call is replaced by a canned response so no backend is needed.
+"""
+
+import asyncio
+import httpx
+from app.main import app
+from app.benchmarks.datasets import write_golden_file
+from app.services.engine import get_engine
+from app.services.model_dispatch import MODEL_CALLS
+from app.services.tracing import get_memory_exporter
+
+
+async def _fake_call(user_query, clients, usage):
+    return '{"AI": ["Artificial Intelligence"]}'
+
+
+async def _post_generate():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post("/inference/generate", json={"n": 1, "models": ["qwen_base"]})
+
+
+def test_generate_span_nesting(tmp_path, monkeypatch):
+    engine = get_engine()
+    monkeypatch.setitem(MODEL_CALLS, "qwen_base", _fake_call)
+    monkeypatch.setattr(engine, "data_file", str(write_golden_file(tmp_path / "golden.json", n=5)))
+    monkeypatch.setattr(engine, "index_file", str(tmp_path / "missing.parquet"))
+    monkeypatch.setattr(engine, "_dataset", None)
+    engine.cache.clear()
+    exporter = get_memory_exporter()
+    exporter.clear()
+
+    response = asyncio.run(_post_generate())
+
+    assert response.status_code == 200
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    request, call, parse = spans["inference.generate"], spans["model.call"], spans["model.parse"]
+    assert call.parent.span_id == request.context.span_id
+    assert parse.parent.span_id == call.context.span_id
+    assert {request.context.trace_id, call.context.trace_id, parse.context.trace_id} == {request.context.trace_id}
+    assert call.attributes["llm.model"] == "qwen_base"
+    assert call.attributes["llm.cache_status"] == "miss"